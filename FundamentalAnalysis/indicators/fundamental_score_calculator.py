@@ -12,7 +12,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide
+from data_loader import FinancialDataLoader, safe_divide, request_scoped
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -37,7 +37,15 @@ class FundamentalScoreCalculator:
         self.valuation = ValuationIndicators(data_loader)
         self.profitability = ProfitabilityIndicators(data_loader)
         self.leverage = LeverageIndicators(data_loader)
+    
+    def cache_stats(self):
+        """Indicator memo hits/misses across all requests so far"""
+        stats = dict(self.loader.memo_stats)
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate_percent'] = round(stats['hits'] / total * 100, 1) if total else 0.0
+        return stats
         
+    @request_scoped
     def calculate_reliability_score(self, symbol):
         """
         Calculate reliability score based on financial stability factors
@@ -239,6 +247,7 @@ class FundamentalScoreCalculator:
             print(f"Error calculating reliability score for {symbol}: {e}")
             return None
     
+    @request_scoped
     def calculate_growth_scope(self, symbol):
         """
         Calculate future growth scope based on growth indicators and market position
@@ -426,6 +435,7 @@ class FundamentalScoreCalculator:
             print(f"Error calculating growth scope for {symbol}: {e}")
             return None
     
+    @request_scoped
     def calculate_valuation_attractiveness(self, symbol):
         """
         Calculate how attractively valued the stock is
@@ -549,6 +559,7 @@ class FundamentalScoreCalculator:
             print(f"Error calculating valuation attractiveness for {symbol}: {e}")
             return None
     
+    @request_scoped
     def calculate_overall_investment_grade(self, symbol):
         """
         Calculate overall investment grade combining all factors
@@ -709,6 +720,7 @@ class FundamentalScoreCalculator:
                 'calculated_at': datetime.now().isoformat()
             }
     
+    @request_scoped
     def generate_summary_for_frontend(self, symbol):
         """
         Generate a concise summary for frontend display in stock containers
@@ -746,10 +758,11 @@ def main():
     
     # Initialize data loader
     loader = FinancialDataLoader()
+    loader.load_all_companies()
     calculator = FundamentalScoreCalculator(loader)
     
     # Test with a few companies
-    test_companies = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS']
+    test_companies = ['RELIANCE', 'TCS', 'HDFCBANK']
     
     for symbol in test_companies:
         print(f"\n📊 Analysis for {symbol}")
@@ -774,6 +787,9 @@ def main():
             print(f"\nFrontend Summary:")
             for highlight in summary['key_highlights']:
                 print(f"  • {highlight}")
+    
+    stats = calculator.cache_stats()
+    print(f"\n💾 Indicator memo: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate_percent']}% hit rate)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, calculate_percentage_change, sanitize_dict_values
+from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, calculate_percentage_change, sanitize_dict_values, memoized_indicator, request_scoped
 import pandas as pd
 import numpy as np
 
@@ -18,7 +18,10 @@ class GrowthIndicators:
     def __init__(self, data_loader):
         self.loader = data_loader
         self.output_dir = "outputs/growth"
+        # JSON/CSV names of the collect_company_results lists, in order
+        self.result_files = ["revenue_growth", "earnings_growth", "sustainable_growth_rate", "growth_quality_scores"]
         
+    @memoized_indicator
     def calculate_revenue_growth(self, symbol):
         """Calculate revenue growth trends"""
         try:
@@ -72,6 +75,7 @@ class GrowthIndicators:
             print(f"Error calculating revenue growth for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_earnings_growth(self, symbol):
         """Calculate earnings growth trends"""
         try:
@@ -142,6 +146,7 @@ class GrowthIndicators:
             print(f"Error calculating earnings growth for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_sustainable_growth_rate(self, symbol):
         """Calculate sustainable growth rate: ROE × (1 - Payout Ratio)"""
         try:
@@ -203,6 +208,7 @@ class GrowthIndicators:
             print(f"Error calculating sustainable growth rate for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_growth_quality_score(self, symbol):
         """Calculate growth quality based on consistency and sustainability"""
         try:
@@ -319,17 +325,14 @@ class GrowthIndicators:
             print(f"Error calculating growth quality for {symbol}: {e}")
             return None
     
-    def run_analysis_for_all_companies(self):
-        """Run growth analysis for all companies"""
-        print("📈 CALCULATING GROWTH INDICATORS")
-        print("=" * 60)
-        
+    def collect_company_results(self, symbols=None):
+        """Per-company growth rows for symbols (default: every loaded company)"""
         all_revenue_growth = []
         all_earnings_growth = []
         all_sustainable_growth = []
         all_quality_scores = []
         
-        for symbol in self.loader.companies_list:
+        for symbol in (self.loader.companies_list if symbols is None else symbols):
             print(f"Processing {symbol}...")
             
             company_info = self.loader.get_company_info(symbol)
@@ -370,6 +373,12 @@ class GrowthIndicators:
                 })
                 all_quality_scores.append(quality)
         
+        return all_revenue_growth, all_earnings_growth, all_sustainable_growth, all_quality_scores
+    
+    def save_analysis_results(self, results):
+        """Save collected growth rows and write the summary"""
+        all_revenue_growth, all_earnings_growth, all_sustainable_growth, all_quality_scores = results
+        
         # Convert to DataFrames
         revenue_df = pd.DataFrame(all_revenue_growth)
         earnings_df = pd.DataFrame(all_earnings_growth)
@@ -398,6 +407,14 @@ class GrowthIndicators:
         
         return revenue_df, earnings_df, sgr_df, quality_df
     
+    @request_scoped
+    def run_analysis_for_all_companies(self):
+        """Run growth analysis for all companies"""
+        print("📈 CALCULATING GROWTH INDICATORS")
+        print("=" * 60)
+        
+        return self.save_analysis_results(self.collect_company_results())
+    
     def generate_growth_summary(self, revenue_df, earnings_df, quality_df):
         """Generate growth analysis summary"""
         summary = []
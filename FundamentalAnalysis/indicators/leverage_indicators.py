@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, sanitize_dict_values
+from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, sanitize_dict_values, memoized_indicator, request_scoped
 import pandas as pd
 import numpy as np
 
@@ -19,6 +19,7 @@ class LeverageIndicators:
         self.loader = data_loader
         self.output_dir = "outputs/leverage"
         
+    @memoized_indicator
     def calculate_basic_leverage_ratios(self, symbol):
         """Calculate basic leverage and debt ratios"""
         try:
@@ -114,6 +115,7 @@ class LeverageIndicators:
             print(f"Error calculating leverage ratios for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_debt_structure_analysis(self, symbol):
         """Analyze debt maturity structure"""
         try:
@@ -168,6 +170,7 @@ class LeverageIndicators:
             print(f"Error analyzing debt structure for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_leverage_trends(self, symbol):
         """Calculate leverage trends over time"""
         try:
@@ -212,6 +215,7 @@ class LeverageIndicators:
             print(f"Error calculating leverage trends for {symbol}: {e}")
             return None
     
+    @request_scoped
     def run_analysis_for_all_companies(self):
         """Run leverage analysis for all companies"""
         print("⚖️  CALCULATING LEVERAGE INDICATORS")
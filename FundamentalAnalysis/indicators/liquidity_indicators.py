@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, calculate_percentage_change, sanitize_dict_values
+from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, calculate_percentage_change, sanitize_dict_values, memoized_indicator, request_scoped
 import pandas as pd
 import numpy as np
 
@@ -18,7 +18,10 @@ class LiquidityIndicators:
     def __init__(self, data_loader):
         self.loader = data_loader
         self.output_dir = "outputs/liquidity"
+        # JSON/CSV names of the collect_company_results lists, in order
+        self.result_files = ["basic_liquidity_ratios", "cash_conversion_cycle", "liquidity_trends"]
         
+    @memoized_indicator
     def calculate_basic_liquidity_ratios(self, symbol):
         """Calculate basic liquidity ratios"""
         try:
@@ -104,6 +107,7 @@ class LiquidityIndicators:
             print(f"Error calculating liquidity ratios for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_cash_conversion_cycle(self, symbol):
         """Calculate cash conversion cycle"""
         try:
@@ -166,6 +170,7 @@ class LiquidityIndicators:
             print(f"Error calculating cash conversion cycle for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_liquidity_trend(self, symbol):
         """Calculate liquidity trends over time"""
         try:
@@ -219,16 +224,13 @@ class LiquidityIndicators:
             print(f"Error calculating liquidity trend for {symbol}: {e}")
             return None
     
-    def run_analysis_for_all_companies(self):
-        """Run liquidity analysis for all companies"""
-        print("💧 CALCULATING LIQUIDITY INDICATORS")
-        print("=" * 60)
-        
+    def collect_company_results(self, symbols=None):
+        """Per-company liquidity rows for symbols (default: every loaded company)"""
         all_basic_liquidity = []
         all_cash_conversion = []
         all_liquidity_trends = []
         
-        for symbol in self.loader.companies_list:
+        for symbol in (self.loader.companies_list if symbols is None else symbols):
             print(f"Processing {symbol}...")
             
             company_info = self.loader.get_company_info(symbol)
@@ -260,6 +262,12 @@ class LiquidityIndicators:
                 })
                 all_liquidity_trends.append(trends)
         
+        return all_basic_liquidity, all_cash_conversion, all_liquidity_trends
+    
+    def save_analysis_results(self, results):
+        """Save collected liquidity rows and write the summary"""
+        all_basic_liquidity, all_cash_conversion, all_liquidity_trends = results
+        
         # Convert to DataFrames
         basic_df = pd.DataFrame(all_basic_liquidity)
         ccc_df = pd.DataFrame(all_cash_conversion)
@@ -283,6 +291,14 @@ class LiquidityIndicators:
         
         return basic_df, ccc_df, trends_df
     
+    @request_scoped
+    def run_analysis_for_all_companies(self):
+        """Run liquidity analysis for all companies"""
+        print("💧 CALCULATING LIQUIDITY INDICATORS")
+        print("=" * 60)
+        
+        return self.save_analysis_results(self.collect_company_results())
+    
     def generate_liquidity_summary(self, basic_df, ccc_df):
         """Generate liquidity analysis summary"""
         summary = []
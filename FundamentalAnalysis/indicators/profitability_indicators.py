@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, sanitize_dict_values
+from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, sanitize_dict_values, memoized_indicator, request_scoped
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -21,7 +21,10 @@ class ProfitabilityIndicators:
     def __init__(self, data_loader):
         self.loader = data_loader
         self.output_dir = "outputs/profitability"
+        # JSON/CSV names of the collect_company_results lists, in order
+        self.result_files = ["profitability_ratios", "dupont_analysis", "profit_growth_trends"]
         
+    @memoized_indicator
     def calculate_basic_profitability_ratios(self, symbol):
         """Calculate basic profitability ratios"""
         try:
@@ -87,6 +90,7 @@ class ProfitabilityIndicators:
             print(f"Error calculating profitability ratios for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_dupont_analysis(self, symbol):
         """Calculate DuPont analysis: ROE = Net Margin × Asset Turnover × Equity Multiplier"""
         try:
@@ -133,6 +137,7 @@ class ProfitabilityIndicators:
             print(f"Error calculating DuPont analysis for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_profit_growth_trends(self, symbol):
         """Calculate profit growth trends over time"""
         try:
@@ -189,16 +194,13 @@ class ProfitabilityIndicators:
             print(f"Error calculating profit growth trends for {symbol}: {e}")
             return None
     
-    def run_analysis_for_all_companies(self):
-        """Run profitability analysis for all companies"""
-        print("🎯 CALCULATING PROFITABILITY INDICATORS")
-        print("=" * 60)
-        
+    def collect_company_results(self, symbols=None):
+        """Per-company profitability rows for symbols (default: every loaded company)"""
         all_profitability = []
         all_dupont = []
         all_growth_trends = []
         
-        for symbol in self.loader.companies_list:
+        for symbol in (self.loader.companies_list if symbols is None else symbols):
             print(f"Processing {symbol}...")
             
             # Basic profitability ratios
@@ -234,6 +236,12 @@ class ProfitabilityIndicators:
                     })
                 all_growth_trends.extend(growth)
         
+        return all_profitability, all_dupont, all_growth_trends
+    
+    def save_analysis_results(self, results):
+        """Save collected profitability rows and write the summary"""
+        all_profitability, all_dupont, all_growth_trends = results
+        
         # Convert to DataFrames
         profitability_df = pd.DataFrame(all_profitability)
         dupont_df = pd.DataFrame(all_dupont)
@@ -257,6 +265,14 @@ class ProfitabilityIndicators:
         
         return profitability_df, dupont_df, growth_df
     
+    @request_scoped
+    def run_analysis_for_all_companies(self):
+        """Run profitability analysis for all companies"""
+        print("🎯 CALCULATING PROFITABILITY INDICATORS")
+        print("=" * 60)
+        
+        return self.save_analysis_results(self.collect_company_results())
+    
     def generate_profitability_summary(self, df):
         """Generate profitability summary analysis"""
         if df.empty:
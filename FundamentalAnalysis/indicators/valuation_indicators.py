@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 
-from data_loader import FinancialDataLoader, safe_divide, format_percentage, format_number, format_currency_inr, sanitize_dict_values
+from data_loader import FinancialDataLoader, group_by_sector, match_sector, safe_divide, format_percentage, format_number, format_currency_inr, sanitize_dict_values, memoized_indicator, request_scoped
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -19,7 +19,13 @@ class ValuationIndicators:
     def __init__(self, data_loader):
         self.loader = data_loader
         self.output_dir = "outputs/valuation"
+        # JSON/CSV names of the collect_company_results lists, in order
+        self.result_files = ["basic_valuation_ratios", "dcf_analysis", "relative_valuation"]
+        # sector -> peer medians, see get_sector_valuation_medians
+        self._sector_medians = {}
+        self._sector_medians_version = None
         
+    @memoized_indicator
     def calculate_basic_valuation_ratios(self, symbol):
         """Calculate basic valuation ratios"""
         try:
@@ -82,6 +88,7 @@ class ValuationIndicators:
             print(f"Error calculating valuation ratios for {symbol}: {e}")
             return None
     
+    @memoized_indicator
     def calculate_dcf_valuation(self, symbol, discount_rate=0.12, terminal_growth=0.03):
         """Calculate Discounted Cash Flow (DCF) valuation"""
         try:
@@ -174,6 +181,30 @@ class ValuationIndicators:
             print(f"Error calculating DCF for {symbol}: {e}")
             return None
     
+    def get_sector_valuation_medians(self, sector):
+        """
+        Median P/E, P/B and P/S of a sector's peers. Every sector is computed
+        once and reused until the loader's data_version changes.
+        """
+        if self._sector_medians_version != self.loader.data_version:
+            self._sector_medians = {}
+            self._sector_medians_version = self.loader.data_version
+        if sector in self._sector_medians:
+            return self._sector_medians[sector]
+        
+        sector_companies = self.loader.get_companies_by_sector(sector)
+        valuations = {}
+        if len(sector_companies) >= 2:
+            for comp_symbol in sector_companies:
+                valuation = self.calculate_basic_valuation_ratios(comp_symbol)
+                if valuation:
+                    valuations[comp_symbol] = valuation
+        
+        stats = sector_valuation_stats(sector_companies, valuations)
+        self._sector_medians[sector] = stats
+        return stats
+    
+    @memoized_indicator
     def calculate_relative_valuation(self, symbol):
         """Calculate relative valuation vs sector peers"""
         try:
@@ -183,67 +214,29 @@ class ValuationIndicators:
             
             sector = company_info['sector']
             
-            # Get sector companies
-            sector_companies = self.loader.get_companies_by_sector(sector)
-            
-            if len(sector_companies) < 2:
-                return None
-            
-            # Calculate sector metrics
-            sector_valuations = []
-            company_valuation = None
-            
-            for comp_symbol in sector_companies:
-                valuation = self.calculate_basic_valuation_ratios(comp_symbol)
-                if valuation:
-                    sector_valuations.append(valuation)
-                    if comp_symbol == symbol:
-                        company_valuation = valuation
+            # Sector peers and their medians are computed once per sector
+            sector_stats = self.get_sector_valuation_medians(sector)
             
-            if not sector_valuations or not company_valuation:
+            if sector_stats['companies_count'] < 2 or symbol not in sector_stats['valued_symbols']:
                 return None
             
-            # Calculate sector averages
-            sector_df = pd.DataFrame(sector_valuations)
-            
-            sector_avg_pe = sector_df['pe_ratio'].median()
-            sector_avg_pb = sector_df['pb_ratio'].median()
-            sector_avg_ps = sector_df['ps_ratio'].median()
-            
-            # Calculate relative metrics
-            pe_relative = safe_divide(company_valuation['pe_ratio'], sector_avg_pe)
-            pb_relative = safe_divide(company_valuation['pb_ratio'], sector_avg_pb)
-            ps_relative = safe_divide(company_valuation['ps_ratio'], sector_avg_ps)
-            
-            return {
-                'symbol': symbol,
-                'sector': sector,
-                'sector_companies_count': len(sector_companies),
-                'company_pe': company_valuation['pe_ratio'],
-                'sector_median_pe': round(sector_avg_pe, 2) if pd.notna(sector_avg_pe) else np.nan,
-                'pe_relative_to_sector': round(pe_relative, 2) if pd.notna(pe_relative) else np.nan,
-                'company_pb': company_valuation['pb_ratio'],
-                'sector_median_pb': round(sector_avg_pb, 2) if pd.notna(sector_avg_pb) else np.nan,
-                'pb_relative_to_sector': round(pb_relative, 2) if pd.notna(pb_relative) else np.nan,
-                'company_ps': company_valuation['ps_ratio'],
-                'sector_median_ps': round(sector_avg_ps, 2) if pd.notna(sector_avg_ps) else np.nan,
-                'ps_relative_to_sector': round(ps_relative, 2) if pd.notna(ps_relative) else np.nan
-            }
+            return relative_valuation_row(symbol, sector, self.calculate_basic_valuation_ratios(symbol), sector_stats)
             
         except Exception as e:
             print(f"Error calculating relative valuation for {symbol}: {e}")
             return None
     
-    def run_analysis_for_all_companies(self):
-        """Run valuation analysis for all companies"""
-        print("💰 CALCULATING VALUATION INDICATORS")
-        print("=" * 60)
-        
+    def collect_company_results(self, symbols=None, include_relative=True):
+        """
+        Per-company valuation rows for symbols (default: every loaded company).
+        Relative valuation needs the whole sector loaded; a shard worker skips
+        it and the coordinator derives it with relative_valuations_from_rows.
+        """
         all_valuations = []
         all_dcf = []
         all_relative = []
         
-        for symbol in self.loader.companies_list:
+        for symbol in (self.loader.companies_list if symbols is None else symbols):
             print(f"Processing {symbol}...")
             
             # Basic valuation ratios
@@ -262,6 +255,8 @@ class ValuationIndicators:
                 all_dcf.append(dcf)
             
             # Relative valuation
+            if not include_relative:
+                continue
             relative = self.calculate_relative_valuation(symbol)
             if relative:
                 company_info = self.loader.get_company_info(symbol)
@@ -270,6 +265,12 @@ class ValuationIndicators:
                 })
                 all_relative.append(relative)
         
+        return all_valuations, all_dcf, all_relative
+    
+    def save_analysis_results(self, results):
+        """Save collected valuation rows and write the summary"""
+        all_valuations, all_dcf, all_relative = results
+        
         # Convert to DataFrames
         valuations_df = pd.DataFrame(all_valuations)
         dcf_df = pd.DataFrame(all_dcf)
@@ -293,6 +294,14 @@ class ValuationIndicators:
         
         return valuations_df, dcf_df, relative_df
     
+    @request_scoped
+    def run_analysis_for_all_companies(self):
+        """Run valuation analysis for all companies"""
+        print("💰 CALCULATING VALUATION INDICATORS")
+        print("=" * 60)
+        
+        return self.save_analysis_results(self.collect_company_results())
+    
     def generate_valuation_summary(self, valuations_df, dcf_df):
         """Generate valuation summary analysis"""
         if valuations_df.empty:
@@ -362,6 +371,76 @@ class ValuationIndicators:
         self.loader.save_results(summary_text, "valuation_summary", self.output_dir, 'txt')
         print(summary_text)
 
+def sector_valuation_stats(sector_companies, valuations):
+    """Peer count and median P/E, P/B, P/S from {symbol: basic valuation ratios}"""
+    sector_df = pd.DataFrame(list(valuations.values()))
+    return {
+        'companies_count': len(sector_companies),
+        'valued_symbols': set(valuations),
+        'median_pe': sector_df['pe_ratio'].median() if valuations else np.nan,
+        'median_pb': sector_df['pb_ratio'].median() if valuations else np.nan,
+        'median_ps': sector_df['ps_ratio'].median() if valuations else np.nan
+    }
+
+def relative_valuation_row(symbol, sector, company_valuation, sector_stats):
+    """Company multiples relative to its sector medians"""
+    sector_avg_pe = sector_stats['median_pe']
+    sector_avg_pb = sector_stats['median_pb']
+    sector_avg_ps = sector_stats['median_ps']
+    
+    # Calculate relative metrics
+    pe_relative = safe_divide(company_valuation['pe_ratio'], sector_avg_pe)
+    pb_relative = safe_divide(company_valuation['pb_ratio'], sector_avg_pb)
+    ps_relative = safe_divide(company_valuation['ps_ratio'], sector_avg_ps)
+    
+    return {
+        'symbol': symbol,
+        'sector': sector,
+        'sector_companies_count': sector_stats['companies_count'],
+        'company_pe': company_valuation['pe_ratio'],
+        'sector_median_pe': round(sector_avg_pe, 2) if pd.notna(sector_avg_pe) else np.nan,
+        'pe_relative_to_sector': round(pe_relative, 2) if pd.notna(pe_relative) else np.nan,
+        'company_pb': company_valuation['pb_ratio'],
+        'sector_median_pb': round(sector_avg_pb, 2) if pd.notna(sector_avg_pb) else np.nan,
+        'pb_relative_to_sector': round(pb_relative, 2) if pd.notna(pb_relative) else np.nan,
+        'company_ps': company_valuation['ps_ratio'],
+        'sector_median_ps': round(sector_avg_ps, 2) if pd.notna(sector_avg_ps) else np.nan,
+        'ps_relative_to_sector': round(ps_relative, 2) if pd.notna(ps_relative) else np.nan
+    }
+
+def relative_valuations_from_rows(symbols, sectors, names, valuation_rows, only_sectors=None):
+    """
+    Relative valuation for every symbol from already computed basic valuation
+    rows, e.g. merged from several shard workers. symbols gives the output
+    order; sectors and names map every symbol (valued or not) to its sector
+    and company name. only_sectors limits the output to those sectors.
+    """
+    sector_index = group_by_sector(symbols, sectors)
+    valuations = {row['symbol']: row for row in valuation_rows}
+    stats_by_sector = {}
+    all_relative = []
+    for symbol in symbols:
+        sector = sectors[symbol]
+        if only_sectors is not None and sector not in only_sectors:
+            continue
+        try:
+            if sector not in stats_by_sector:
+                sector_companies = match_sector(sector_index, symbols, sector)
+                peers = {peer: valuations[peer] for peer in sector_companies if peer in valuations} if len(sector_companies) >= 2 else {}
+                stats_by_sector[sector] = sector_valuation_stats(sector_companies, peers)
+            sector_stats = stats_by_sector[sector]
+            if sector_stats['companies_count'] < 2 or symbol not in sector_stats['valued_symbols']:
+                continue
+            relative = relative_valuation_row(symbol, sector, valuations[symbol], sector_stats)
+        except Exception as e:
+            print(f"Error calculating relative valuation for {symbol}: {e}")
+            continue
+        relative.update({
+            'company_name': names[symbol]
+        })
+        all_relative.append(relative)
+    return all_relative
+
 def main():
     """Main function to run valuation analysis"""
     try:
@@ -6,6 +6,10 @@ Main script to execute all indicator calculations
 
 import sys
 import os
+import io
+import json
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +20,7 @@ sys.path.append(str(current_dir / 'indicators'))
 
 # Import data loader
 from data_loader import FinancialDataLoader
+from recompute_manifest import RecomputeManifest, code_hash, group_rows_by_symbol, read_rows_by_symbol
 
 # Import all indicator calculators
 try:
@@ -23,6 +28,7 @@ try:
     from valuation_indicators import ValuationIndicators
     from growth_indicators import GrowthIndicators
     from liquidity_indicators import LiquidityIndicators
+    from valuation_indicators import relative_valuations_from_rows
     # Import other indicators as they're created
     profitability_available = True
     valuation_available = True
@@ -133,6 +139,309 @@ def run_all_fundamental_analysis():
     print(f"⏱️  Total execution time: {execution_time}")
     print(f"📁 Results saved in: {output_base.absolute()}")
 
+# Machine-readable progress lines (--progress), parsed by the backend job queue
+PROGRESS_PREFIX = "@progress "
+
+def report_progress(**fields):
+    """Write one progress event straight to the real stdout, even from a shard worker"""
+    sys.__stdout__.write(PROGRESS_PREFIX + json.dumps(fields) + "\n")
+    sys.__stdout__.flush()
+
+def available_calculators():
+    """(analysis type, calculator class) for every indicator that imported"""
+    calculators = []
+    if profitability_available:
+        calculators.append(('profitability', ProfitabilityIndicators))
+    if valuation_available:
+        calculators.append(('valuation', ValuationIndicators))
+    if growth_available:
+        calculators.append(('growth', GrowthIndicators))
+    if liquidity_available:
+        calculators.append(('liquidity', LiquidityIndicators))
+    return calculators
+
+def shard_symbols(symbols, shard_count):
+    """Split symbols into contiguous shards, so concatenating them keeps the original order"""
+    shard_count = max(1, min(shard_count, len(symbols)))
+    size, extra = divmod(len(symbols), shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        stop = start + size + (1 if i < extra else 0)
+        shards.append(symbols[start:stop])
+        start = stop
+    return shards
+
+def analyze_shard(symbols, progress=False):
+    """
+    Worker: load only this shard's JSON and collect the per-company rows of
+    every indicator. Output is captured and returned so the coordinator can
+    print shard logs in order; with progress, every finished symbol is
+    reported as it happens.
+    """
+    log = io.StringIO()
+    with redirect_stdout(log):
+        loader = FinancialDataLoader()
+        loader.load_all_companies(symbols)
+        result = {
+            'symbols': list(loader.companies_list),
+            'sectors': {},
+            'names': {},
+            'rows': {},
+            'errors': {}
+        }
+        for symbol in loader.companies_list:
+            company_info = loader.get_company_info(symbol)
+            result['sectors'][symbol] = company_info['sector']
+            result['names'][symbol] = company_info['name']
+        
+        with loader.memo_scope():
+            for analysis_type, calculator_class in available_calculators():
+                # Relative valuation needs every sector peer; the coordinator derives it
+                options = {'include_relative': False} if analysis_type == 'valuation' else {}
+                try:
+                    calc = calculator_class(loader)
+                    # One symbol at a time only when someone is watching progress
+                    batches = [[symbol] for symbol in loader.companies_list] if progress else [loader.companies_list]
+                    rows = [[] for _ in calc.result_files]
+                    for batch in batches:
+                        for result_list, batch_rows in zip(rows, calc.collect_company_results(batch, **options)):
+                            result_list.extend(batch_rows)
+                        if progress:
+                            report_progress(event='symbol', indicator=analysis_type, symbol=batch[-1] if batch else None)
+                    result['rows'][analysis_type] = rows
+                except Exception as e:
+                    print(f"❌ Error in {analysis_type} analysis: {e}")
+                    result['errors'][analysis_type] = str(e)
+    result['log'] = log.getvalue()
+    return result
+
+def analyze_in_shards(symbols, workers, progress=False):
+    """
+    Run analyze_shard over symbols, on a process pool when workers > 1.
+    Prints the shard logs and returns the shard results in shard order.
+    """
+    if workers > 1:
+        # A few shards per worker keeps the pool busy when shards run unevenly
+        shards = shard_symbols(symbols, workers * 4)
+        print(f"📊 Analyzing {len(symbols)} companies in {len(shards)} shards...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(analyze_shard, shards, [progress] * len(shards)))
+    else:
+        print(f"📊 Analyzing {len(symbols)} companies...")
+        shard_results = [analyze_shard(symbols, progress)]
+    
+    for shard in shard_results:
+        print(shard['log'], end='')
+    return shard_results
+
+def shard_errors(shard_results, analysis_type):
+    """Errors any shard hit while collecting analysis_type"""
+    return [shard['errors'][analysis_type] for shard in shard_results if analysis_type in shard['errors']]
+
+def run_sharded_fundamental_analysis(workers, progress=False):
+    """
+    Run all indicators with symbols sharded across a process pool. Shard rows
+    are merged in shard order, so outputs match a serial run.
+    """
+    print(f"🚀 STARTING COMPREHENSIVE FUNDAMENTAL ANALYSIS ({workers} workers)")
+    print("=" * 80)
+    
+    start_time = datetime.now()
+    
+    loader = FinancialDataLoader()
+    symbols = loader.list_company_symbols()
+    
+    if not symbols:
+        print("❌ No financial data found!")
+        print("Please ensure financial data is available in '../financial_reports/data' directory")
+        return
+    
+    if progress:
+        report_progress(event='plan', indicators=[analysis_type for analysis_type, _ in available_calculators()], symbols=len(symbols))
+    shard_results = analyze_in_shards(symbols, workers, progress)
+    
+    loaded_symbols = []
+    sectors = {}
+    names = {}
+    for shard in shard_results:
+        loaded_symbols.extend(shard['symbols'])
+        sectors.update(shard['sectors'])
+        names.update(shard['names'])
+    
+    print(f"✅ Loaded data for {len(loaded_symbols)} companies")
+    print()
+    
+    output_base = Path("outputs")
+    output_base.mkdir(exist_ok=True)
+    
+    results_summary = {}
+    for analysis_type, calculator_class in available_calculators():
+        errors = shard_errors(shard_results, analysis_type)
+        if errors:
+            results_summary[analysis_type] = {'completed': False, 'error': errors[0]}
+            if progress:
+                report_progress(event='error', indicator=analysis_type, error=errors[0])
+            continue
+        try:
+            print(f"💾 Saving {analysis_type.title()} Analysis...")
+            # Concatenate each result list across shards, in shard order
+            merged = [
+                [row for shard in shard_results for row in shard['rows'][analysis_type][i]]
+                for i in range(len(shard_results[0]['rows'][analysis_type]))
+            ]
+            if analysis_type == 'valuation':
+                merged[2] = relative_valuations_from_rows(loaded_symbols, sectors, names, merged[0])
+            results = calculator_class(loader).save_analysis_results(merged)
+            results_summary[analysis_type] = {
+                'completed': True,
+                'companies': len(results[0]) if results[0] is not None else 0
+            }
+            print(f"✅ {analysis_type.title()} analysis completed\n")
+            if progress:
+                report_progress(event='saved', indicator=analysis_type)
+        except Exception as e:
+            print(f"❌ Error in {analysis_type} analysis: {e}\n")
+            results_summary[analysis_type] = {'completed': False, 'error': str(e)}
+            if progress:
+                report_progress(event='error', indicator=analysis_type, error=str(e))
+    
+    execution_time = datetime.now() - start_time
+    
+    generate_execution_summary(results_summary, execution_time, len(loaded_symbols))
+    
+    print("🎉 FUNDAMENTAL ANALYSIS COMPLETED!")
+    print("=" * 50)
+    print(f"⏱️  Total execution time: {execution_time}")
+    print(f"📁 Results saved in: {output_base.absolute()}")
+
+def run_incremental_fundamental_analysis(workers=1, progress=False):
+    """
+    Recompute only the companies whose input JSON changed since the last run
+    (per outputs/manifest.json) and patch their rows into the existing outputs.
+    Relative valuation is recomputed only for the sectors those companies
+    belong to (before or after the change).
+    """
+    print("🚀 STARTING INCREMENTAL FUNDAMENTAL ANALYSIS")
+    print("=" * 80)
+    
+    start_time = datetime.now()
+    
+    loader = FinancialDataLoader()
+    company_files = loader.list_company_files()
+    symbols = list(company_files)
+    
+    if not symbols:
+        print("❌ No financial data found!")
+        print("Please ensure financial data is available in '../financial_reports/data' directory")
+        return
+    
+    output_base = Path("outputs")
+    output_base.mkdir(exist_ok=True)
+    
+    # Existing output rows, keyed like "valuation/relative_valuation.json"
+    calculators = [(analysis_type, calculator_class(loader)) for analysis_type, calculator_class in available_calculators()]
+    output_paths = {}
+    for analysis_type, calc in calculators:
+        for filename in calc.result_files:
+            output_paths[f"{Path(calc.output_dir).name}/{filename}.json"] = Path(calc.output_dir) / f"{filename}.json"
+    previous_rows = {output_file: read_rows_by_symbol(path) for output_file, path in output_paths.items()}
+    
+    manifest = RecomputeManifest(output_base)
+    previous_companies = manifest.data['companies']
+    input_hashes = manifest.hash_inputs(company_files)
+    indicator_code_hash = code_hash(list((current_dir / 'indicators').glob('*.py')) + list((current_dir / 'utils').glob('*.py')))
+    dirty, removed = manifest.changed_symbols(input_hashes, indicator_code_hash, previous_rows)
+    
+    print(f"📊 {len(symbols)} companies: {len(dirty)} changed, {len(removed)} removed")
+    if progress:
+        report_progress(event='plan', indicators=[analysis_type for analysis_type, _ in calculators], symbols=len(dirty))
+    if not dirty and not removed:
+        print("✅ Outputs are up to date, nothing to recompute")
+        if progress:
+            # Mark every indicator done so the job reports 100%
+            for analysis_type, _ in calculators:
+                report_progress(event='saved', indicator=analysis_type)
+        return
+    
+    shard_results = analyze_in_shards(dirty, workers, progress) if dirty else []
+    
+    companies = {symbol: info for symbol, info in previous_companies.items() if symbol in input_hashes}
+    fresh_symbols = set()
+    for shard in shard_results:
+        for symbol in shard['symbols']:
+            companies[symbol] = {'sector': shard['sectors'][symbol], 'name': shard['names'][symbol]}
+            fresh_symbols.add(symbol)
+    # Inputs that failed to load are left out of the manifest, so they are retried next run
+    for symbol in set(dirty) - fresh_symbols:
+        companies.pop(symbol, None)
+        input_hashes.pop(symbol)
+    
+    loaded_symbols = [symbol for symbol in symbols if symbol in companies]
+    sectors = {symbol: companies[symbol]['sector'] for symbol in loaded_symbols}
+    names = {symbol: companies[symbol]['name'] for symbol in loaded_symbols}
+    
+    touched_sectors = {previous_companies[symbol]['sector'] for symbol in dirty + removed if symbol in previous_companies}
+    touched_sectors |= {sectors[symbol] for symbol in fresh_symbols}
+    # Peers are found by substring match, so a change in sector T also affects any sector whose name T contains
+    affected_sectors = {sector for sector in set(sectors.values()) if any(sector.lower() in touched.lower() for touched in touched_sectors)}
+    print(f"✅ Recomputed {len(fresh_symbols)} companies; {len(affected_sectors)} sector(s) touched")
+    print()
+    
+    results_summary = {}
+    for analysis_type, calc in calculators:
+        errors = shard_errors(shard_results, analysis_type)
+        if errors:
+            results_summary[analysis_type] = {'completed': False, 'error': errors[0]}
+            if progress:
+                report_progress(event='error', indicator=analysis_type, error=errors[0])
+            continue
+        try:
+            print(f"💾 Patching {analysis_type.title()} Analysis...")
+            merged = []
+            for i, filename in enumerate(calc.result_files):
+                fresh = group_rows_by_symbol(row for shard in shard_results for row in shard['rows'][analysis_type][i])
+                previous = previous_rows[f"{Path(calc.output_dir).name}/{filename}.json"]
+                merged.append([
+                    row for symbol in loaded_symbols
+                    for row in (fresh if symbol in fresh_symbols else previous).get(symbol, [])
+                ])
+            if analysis_type == 'valuation':
+                relative = group_rows_by_symbol(relative_valuations_from_rows(loaded_symbols, sectors, names, merged[0], only_sectors=affected_sectors))
+                previous = previous_rows["valuation/relative_valuation.json"]
+                merged[2] = [
+                    row for symbol in loaded_symbols
+                    for row in (relative if sectors[symbol] in affected_sectors else previous).get(symbol, [])
+                ]
+            results = calc.save_analysis_results(merged)
+            results_summary[analysis_type] = {
+                'completed': True,
+                'companies': len(results[0]) if results[0] is not None else 0
+            }
+            print(f"✅ {analysis_type.title()} analysis patched\n")
+            if progress:
+                report_progress(event='saved', indicator=analysis_type)
+        except Exception as e:
+            print(f"❌ Error in {analysis_type} analysis: {e}\n")
+            results_summary[analysis_type] = {'completed': False, 'error': str(e)}
+            if progress:
+                report_progress(event='error', indicator=analysis_type, error=str(e))
+    
+    if all(result['completed'] for result in results_summary.values()):
+        manifest.save(input_hashes, indicator_code_hash, companies,
+                      {output_file: read_rows_by_symbol(path) for output_file, path in output_paths.items()})
+    else:
+        print("⚠️  Manifest not updated; failed analyses will be recomputed next run")
+    
+    execution_time = datetime.now() - start_time
+    
+    generate_execution_summary(results_summary, execution_time, len(loaded_symbols))
+    
+    print("🎉 FUNDAMENTAL ANALYSIS COMPLETED!")
+    print("=" * 50)
+    print(f"⏱️  Total execution time: {execution_time}")
+    print(f"📁 Results saved in: {output_base.absolute()}")
+
 def generate_execution_summary(results_summary, execution_time, total_companies):
     """Generate and save execution summary"""
     summary = []
@@ -232,6 +541,13 @@ def show_help():
 USAGE:
     python run_all_indicators.py [command] [options]
 
+OPTIONS:
+    --workers N     Shard companies across N processes
+    --incremental   Recompute only companies whose input JSON changed since the
+                    last run (tracked in outputs/manifest.json)
+    --progress      Print "@progress {json}" lines per indicator and symbol
+                    (with --workers or --incremental; used by the backend)
+
 COMMANDS:
     (no command)    Run all available indicators
     profitability   Run only profitability analysis
@@ -244,6 +560,8 @@ EXAMPLES:
     python run_all_indicators.py
     python run_all_indicators.py profitability
     python run_all_indicators.py valuation
+    python run_all_indicators.py --workers 8
+    python run_all_indicators.py --incremental --workers 8
 
 OUTPUT:
     Results are saved in the 'outputs/' directory with subdirectories for each indicator type.
@@ -263,8 +581,25 @@ For more information, see README.md
 
 def main():
     """Main function"""
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    args = sys.argv[1:]
+    workers = 1
+    if '--workers' in args:
+        position = args.index('--workers')
+        try:
+            workers = int(args[position + 1])
+        except (IndexError, ValueError):
+            print("❌ --workers needs a number, e.g. --workers 8")
+            return
+        del args[position:position + 2]
+    incremental = '--incremental' in args
+    if incremental:
+        args.remove('--incremental')
+    progress = '--progress' in args
+    if progress:
+        args.remove('--progress')
+    
+    if args:
+        command = args[0].lower()
         
         if command == 'help':
             show_help()
@@ -273,6 +608,10 @@ def main():
         else:
             print(f"❌ Unknown command: {command}")
             print("Use 'python run_all_indicators.py help' for usage information")
+    elif incremental:
+        run_incremental_fundamental_analysis(workers, progress)
+    elif workers > 1:
+        run_sharded_fundamental_analysis(workers, progress)
     else:
         # Run all indicators
         run_all_fundamental_analysis()
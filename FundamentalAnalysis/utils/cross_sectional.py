@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Cross-Sectional Indicator Engine
+Computes each basic ratio family for every company in one vectorized pass over
+the loader's columnar statement table, matching the per-symbol indicator methods
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import FinancialDataLoader
+
+_MISSING = object()
+
+
+def vector_safe_divide(numerator, denominator):
+    """Element-wise safe_divide: NaN where either side is NaN or the denominator is 0"""
+    n = np.asarray(numerator, dtype=float)
+    d = np.asarray(denominator, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = n / d
+    return np.where(np.isnan(n) | np.isnan(d) | (d == 0), np.nan, out)
+
+
+def round2(values, python_float=None):
+    """
+    round(x, 2) as the per-symbol code does it: NumPy rounding for computed
+    values, and Python's correctly-rounded float rounding where the value came
+    straight from the JSON (python_float mask).
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    if python_float is not None:
+        exact = np.array([round(float(v), 2) if not np.isnan(v) else np.nan for v in values], dtype=float)
+        rounded = np.where(python_float, exact, rounded)
+    return rounded
+
+
+def _to_float(values):
+    return pd.to_numeric(pd.Series([None if v is _MISSING else v for v in values], dtype=object),
+                         errors='coerce').to_numpy(dtype=float)
+
+
+class CrossSectionalIndicators:
+    """
+    Batch versions of the basic indicator methods.
+
+    Each method returns one DataFrame row per company for which the
+    matching per-symbol method returns a result, with the same columns in
+    the same order, in loader.companies_list order.
+    """
+
+    def __init__(self, data_loader):
+        self.loader = data_loader
+        if self.loader.statement_table is None:
+            self.loader.build_statement_table()
+        self.table = self.loader.statement_table
+        self.symbols = list(self.loader.companies_list)
+
+    # ------------------------------------------------------------------
+    # Panels
+    # ------------------------------------------------------------------
+
+    def _rows(self, statement, fields, period_type='annual'):
+        t = self.table
+        return t[(t['statement'] == statement) & (t['period_type'] == period_type) & t['field'].isin(fields)]
+
+    def panel(self, statement, fields, period_type='annual'):
+        """Wide (symbol, period) x field panel of raw values"""
+        rows = self._rows(statement, fields, period_type)
+        return rows.pivot(index=['symbol', 'period'], columns='field', values='value').reindex(columns=fields)
+
+    def latest_values(self, statement, fields, period_type='annual'):
+        """
+        Last reported value of each field per symbol (the per-symbol
+        `series['value'].iloc[-1]`), plus a mask of which fields a symbol has.
+        """
+        last = self._rows(statement, fields, period_type).drop_duplicates(['symbol', 'field'], keep='last')
+        values = last.pivot(index='symbol', columns='field', values='value').reindex(index=self.symbols, columns=fields)
+        present = last.pivot(index='symbol', columns='field', values='period').reindex(index=self.symbols, columns=fields).notna()
+        return values, present
+
+    def values_at(self, statement, fields, periods, period_type='annual'):
+        """Value of each field at periods[symbol], plus a mask of which were reported for that period"""
+        rows = self._rows(statement, fields, period_type)
+        # (an empty categorical cannot be mapped onto datetimes)
+        hit = rows[rows['period'] == rows['symbol'].map(periods)] if len(rows) else rows
+        values = hit.pivot(index='symbol', columns='field', values='value').reindex(index=self.symbols, columns=fields)
+        present = hit.pivot(index='symbol', columns='field', values='period').reindex(index=self.symbols, columns=fields).notna()
+        return values, present
+
+    def _section(self, section, key):
+        """Raw per-symbol values of one key of a top-level JSON section"""
+        return [self.loader.companies_data[s].get(section, {}).get(key, _MISSING) for s in self.symbols]
+
+    def _section_nonempty(self, section):
+        return np.array([bool(self.loader.companies_data[s].get(section, {})) for s in self.symbols], dtype=bool)
+
+    # ------------------------------------------------------------------
+    # Ratio families
+    # ------------------------------------------------------------------
+
+    def basic_profitability_ratios(self):
+        """Batch ProfitabilityIndicators.calculate_basic_profitability_ratios"""
+        income_fields = ['Total Revenue', 'Net Income', 'Gross Profit', 'Operating Income', 'EBITDA']
+        balance_fields = ['Total Assets', 'Stockholders Equity']
+
+        _, income_present = self.latest_values('income_statement', income_fields)
+        _, balance_present = self.latest_values('balance_sheet', balance_fields)
+        revenue_rows = self._rows('income_statement', ['Total Revenue'])
+        latest_period = revenue_rows.groupby('symbol')['period'].max().reindex(self.symbols)
+
+        income, income_at = self.values_at('income_statement', income_fields, latest_period)
+        balance, balance_at = self.values_at('balance_sheet', balance_fields, latest_period)
+
+        # A reported item without a value for the revenue period makes the
+        # per-symbol method fail for that company
+        complete = ((income_at | ~income_present).all(axis=1) & (balance_at | ~balance_present).all(axis=1)).to_numpy()
+        keep = income_present['Total Revenue'].to_numpy() & income_present['Net Income'].to_numpy() & complete
+
+        revenue = income['Total Revenue'].to_numpy()
+        net_income = income['Net Income'].to_numpy()
+        assets = balance['Total Assets'].to_numpy()
+        equity = balance['Stockholders Equity'].to_numpy()
+
+        ratios = {
+            'roe': vector_safe_divide(net_income, equity) * 100,
+            'roa': vector_safe_divide(net_income, assets) * 100,
+            'gross_margin': vector_safe_divide(income['Gross Profit'], revenue) * 100,
+            'operating_margin': vector_safe_divide(income['Operating Income'], revenue) * 100,
+            'net_margin': vector_safe_divide(net_income, revenue) * 100,
+        }
+        ebitda_margin = vector_safe_divide(income['EBITDA'], revenue) * 100
+
+        # Pre-calculated values from financial_health win when truthy
+        has_health = self._section_nonempty('financial_health')
+        from_json = {}
+        for name, health_key in [('roe', 'return_on_equity'), ('roa', 'return_on_assets'),
+                                 ('gross_margin', 'gross_margin'), ('operating_margin', 'operating_margin'),
+                                 ('net_margin', 'profit_margin')]:
+            raw = self._section('financial_health', health_key)
+            use = has_health & np.array([v is not _MISSING and bool(v) for v in raw], dtype=bool)
+            ratios[name] = np.where(use, _to_float(raw) * 100, ratios[name])
+            from_json[name] = use
+
+        result = pd.DataFrame({
+            'symbol': self.symbols,
+            'period': [str(p.date()) if pd.notna(p) else 'N/A' for p in latest_period],
+            'roe_percent': round2(ratios['roe'], from_json['roe']),
+            'roa_percent': round2(ratios['roa'], from_json['roa']),
+            'gross_margin_percent': round2(ratios['gross_margin'], from_json['gross_margin']),
+            'operating_margin_percent': round2(ratios['operating_margin'], from_json['operating_margin']),
+            'net_margin_percent': round2(ratios['net_margin'], from_json['net_margin']),
+            'ebitda_margin_percent': round2(ebitda_margin),
+            'revenue': revenue,
+            'net_income': net_income,
+            'total_assets': assets,
+            'shareholders_equity': equity,
+        })
+        return result[keep].reset_index(drop=True)
+
+    def basic_liquidity_ratios(self):
+        """Batch LiquidityIndicators.calculate_basic_liquidity_ratios"""
+        fields = ['Current Assets', 'Current Liabilities', 'Cash And Cash Equivalents', 'Inventory', 'Accounts Receivable']
+        values, present = self.latest_values('balance_sheet', fields)
+        keep = (present['Current Assets'] & present['Current Liabilities']).to_numpy()
+
+        ca = values['Current Assets'].to_numpy()
+        cl = values['Current Liabilities'].to_numpy()
+        cash = values['Cash And Cash Equivalents'].to_numpy()
+        inventory = values['Inventory'].to_numpy()
+
+        current_ratio = vector_safe_divide(ca, cl)
+        quick_ratio = vector_safe_divide(ca - np.where(np.isnan(inventory), 0, inventory), cl)
+        cash_ratio = vector_safe_divide(cash, cl)
+        working_capital = np.where(np.isnan(ca) | np.isnan(cl), np.nan, ca - cl)
+
+        # financial_health overrides whenever the key is present, even if null
+        has_health = self._section_nonempty('financial_health')
+        raw = self._section('financial_health', 'current_ratio')
+        current_from_json = has_health & np.array([v is not _MISSING for v in raw], dtype=bool)
+        current_ratio = np.where(current_from_json, _to_float(raw), current_ratio)
+        raw = self._section('financial_health', 'quick_ratio')
+        quick_from_json = has_health & np.array([v is not _MISSING for v in raw], dtype=bool)
+        quick_ratio = np.where(quick_from_json, _to_float(raw), quick_ratio)
+
+        current_interpretation = np.select(
+            [np.isnan(current_ratio), current_ratio >= 2.0, current_ratio >= 1.5, current_ratio >= 1.0],
+            ['N/A', 'Excellent', 'Good', 'Adequate'], 'Poor')
+        quick_interpretation = np.select(
+            [np.isnan(quick_ratio), quick_ratio >= 1.5, quick_ratio >= 1.0, quick_ratio >= 0.8],
+            ['N/A', 'Excellent', 'Good', 'Adequate'], 'Poor')
+
+        result = pd.DataFrame({
+            'symbol': self.symbols,
+            'current_assets': ca,
+            'current_liabilities': cl,
+            'cash_and_equivalents': cash,
+            'inventory': inventory,
+            'accounts_receivable': values['Accounts Receivable'].to_numpy(),
+            'current_ratio': round2(current_ratio, current_from_json),
+            'quick_ratio': round2(quick_ratio, quick_from_json),
+            'cash_ratio': round2(cash_ratio),
+            'working_capital': working_capital,
+            'current_ratio_interpretation': current_interpretation,
+            'quick_ratio_interpretation': quick_interpretation,
+        })
+        return result[keep].reset_index(drop=True)
+
+    def basic_leverage_ratios(self):
+        """Batch LeverageIndicators.calculate_basic_leverage_ratios"""
+        balance_fields = ['Total Debt', 'Total Assets', 'Stockholders Equity', 'Long Term Debt', 'Current Debt']
+        income_fields = ['EBITDA', 'Interest Expense', 'Operating Income']
+        balance, balance_present = self.latest_values('balance_sheet', balance_fields)
+        income, income_present = self.latest_values('income_statement', income_fields)
+        keep = (balance_present['Total Assets'] & balance_present['Stockholders Equity']).to_numpy()
+
+        def latest_or(frame, present, field, default):
+            return np.where(present[field].to_numpy(), frame[field].to_numpy(), default)
+
+        total_debt = latest_or(balance, balance_present, 'Total Debt', 0)
+        assets = balance['Total Assets'].to_numpy()
+        equity = balance['Stockholders Equity'].to_numpy()
+        lt_debt = latest_or(balance, balance_present, 'Long Term Debt', 0)
+        st_debt = latest_or(balance, balance_present, 'Current Debt', 0)
+        ebitda = income['EBITDA'].to_numpy()
+        interest = np.abs(latest_or(income, income_present, 'Interest Expense', 0))
+        operating_income = income['Operating Income'].to_numpy()
+
+        debt_to_equity = vector_safe_divide(total_debt, equity)
+        debt_to_assets = vector_safe_divide(total_debt, assets)
+        equity_ratio = vector_safe_divide(equity, assets)
+
+        has_interest = interest > 0
+        interest_coverage = np.where(has_interest, vector_safe_divide(operating_income, interest), np.inf)
+        debt_to_ebitda = vector_safe_divide(total_debt, ebitda)
+        ebitda_coverage = np.where(has_interest, vector_safe_divide(ebitda, interest), np.inf)
+
+        has_health = self._section_nonempty('financial_health')
+        raw = self._section('financial_health', 'debt_to_equity')
+        de_from_json = has_health & np.array([v is not _MISSING for v in raw], dtype=bool)
+        debt_to_equity = np.where(de_from_json, _to_float(raw), debt_to_equity)
+
+        debt_interpretation = np.select(
+            [np.isnan(debt_to_equity), debt_to_equity < 0.3, debt_to_equity < 0.6,
+             debt_to_equity < 1.0, debt_to_equity < 2.0],
+            ['N/A', 'Conservative - Low debt', 'Moderate debt levels', 'Higher debt levels', 'High leverage'],
+            'Very high leverage - Risky')
+        coverage_interpretation = np.select(
+            [np.isnan(interest_coverage) | (interest_coverage == np.inf), interest_coverage > 10,
+             interest_coverage > 5, interest_coverage > 2.5, interest_coverage > 1.5],
+            ['No interest expense', 'Excellent', 'Good', 'Adequate', 'Weak'], 'Poor - High risk')
+
+        result = pd.DataFrame({
+            'symbol': self.symbols,
+            'total_debt': total_debt,
+            'long_term_debt': lt_debt,
+            'short_term_debt': st_debt,
+            'total_assets': assets,
+            'shareholders_equity': equity,
+            'debt_to_equity': round2(debt_to_equity, de_from_json),
+            'debt_to_assets': round2(debt_to_assets),
+            'equity_ratio': round2(equity_ratio),
+            'interest_coverage': np.where(np.isinf(interest_coverage), interest_coverage, round2(interest_coverage)),
+            'debt_to_ebitda': round2(debt_to_ebitda),
+            'ebitda_coverage': np.where(np.isinf(ebitda_coverage), ebitda_coverage, round2(ebitda_coverage)),
+            'debt_interpretation': debt_interpretation,
+            'interest_coverage_interpretation': coverage_interpretation,
+        })
+        return result[keep].reset_index(drop=True)
+
+    def revenue_growth(self):
+        """Batch GrowthIndicators.calculate_revenue_growth (CAGR, YoY, volatility)"""
+        revenue = self._rows('income_statement', ['Total Revenue'])[['symbol', 'period', 'value']].copy()
+        grouped = revenue.groupby('symbol', sort=False)
+        revenue['yoy_growth'] = grouped['value'].pct_change() * 100
+        yoy = revenue.groupby('symbol', sort=False)['yoy_growth']
+
+        periods_analyzed = grouped.size().reindex(self.symbols, fill_value=0)
+        recent_growth = revenue.groupby('symbol', sort=False).tail(3).groupby('symbol')['yoy_growth'].mean().reindex(self.symbols)
+        latest_yoy = yoy.last(skipna=False).reindex(self.symbols)
+        volatility = yoy.std().reindex(self.symbols)
+
+        valid = revenue[revenue['value'].notna() & (revenue['value'] > 0)].groupby('symbol', sort=False)
+        first = valid.first().reindex(self.symbols)
+        last = valid.last().reindex(self.symbols)
+        valid_count = valid.size().reindex(self.symbols, fill_value=0)
+
+        years_diff = ((last['period'] - first['period']).dt.days / 365.25).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr = ((last['value'].to_numpy() / first['value'].to_numpy()) ** (1 / years_diff) - 1) * 100
+        cagr = np.where(years_diff > 0, cagr, np.nan)
+
+        # The per-symbol method needs at least two periods and two positive values
+        keep = (periods_analyzed.to_numpy() >= 2) & (valid_count.to_numpy() >= 2)
+
+        result = pd.DataFrame({
+            'symbol': self.symbols,
+            'periods_analyzed': periods_analyzed.to_numpy(),
+            'first_revenue': first['value'].to_numpy(),
+            'latest_revenue': last['value'].to_numpy(),
+            'revenue_cagr_percent': round2(cagr),
+            'recent_avg_growth_percent': round2(recent_growth.to_numpy()),
+            'latest_yoy_growth_percent': round2(latest_yoy.to_numpy()),
+            'revenue_volatility': np.where(periods_analyzed.to_numpy() > 2, round2(volatility.to_numpy()), np.nan),
+        })
+        return result[keep].reset_index(drop=True)
+
+    def basic_valuation_ratios(self):
+        """Batch ValuationIndicators.calculate_basic_valuation_ratios"""
+        income, _ = self.latest_values('income_statement', ['Total Revenue', 'Net Income', 'Basic Average Shares'])
+        balance, _ = self.latest_values('balance_sheet', ['Stockholders Equity'])
+        keep = self._section_nonempty('valuation_metrics')
+
+        infos = [self.loader.get_company_info(s) for s in self.symbols]
+        market_cap_raw = [info.get('market_cap', 0) for info in infos]
+        price_raw = [info.get('current_price', 0) for info in infos]
+        market_cap = _to_float(market_cap_raw)
+        price = _to_float(price_raw)
+
+        revenue = income['Total Revenue'].to_numpy()
+        shares = income['Basic Average Shares'].to_numpy()
+        eps = vector_safe_divide(income['Net Income'], shares)
+        book_value_per_share = vector_safe_divide(balance['Stockholders Equity'], shares)
+        revenue_per_share = vector_safe_divide(revenue, shares)
+
+        def metric_or(key, fallback):
+            """valuation.get(key, fallback), rounded like the per-symbol code"""
+            raw = self._section('valuation_metrics', key)
+            from_json = np.array([v is not _MISSING for v in raw], dtype=bool)
+            return round2(np.where(from_json, _to_float(raw), fallback), from_json)
+
+        def metric(key):
+            return [None if v is _MISSING else v for v in self._section('valuation_metrics', key)]
+
+        result = pd.DataFrame({
+            'symbol': self.symbols,
+            'company_name': [info.get('name', 'N/A') for info in infos],
+            'sector': [info.get('sector', 'N/A') for info in infos],
+            'market_cap': market_cap,
+            'market_cap_formatted': [info.get('market_cap_formatted', 'N/A') for info in infos],
+            'current_price': price,
+            'pe_ratio': metric_or('pe_ratio', vector_safe_divide(price, eps)),
+            'forward_pe': _to_float(metric('forward_pe')),
+            'pb_ratio': metric_or('price_to_book', vector_safe_divide(price, book_value_per_share)),
+            'ps_ratio': metric_or('price_to_sales', vector_safe_divide(market_cap, revenue)),
+            'peg_ratio': _to_float(metric('peg_ratio')),
+            'enterprise_value': _to_float(metric('enterprise_value')),
+            'ev_revenue': _to_float(metric('ev_to_revenue')),
+            'ev_ebitda': _to_float(metric('ev_to_ebitda')),
+            'eps': round2(eps),
+            'book_value_per_share': round2(book_value_per_share),
+            'revenue_per_share': round2(revenue_per_share),
+        })
+        return result[keep].reset_index(drop=True)
+
+
+def compare_with_per_symbol(loader):
+    """Check every batch family against its per-symbol method; returns {family: (ok, batch_s, loop_s)}"""
+    sys.path.append(str(__import__('pathlib').Path(__file__).parent.parent / 'indicators'))
+    from profitability_indicators import ProfitabilityIndicators
+    from liquidity_indicators import LiquidityIndicators
+    from leverage_indicators import LeverageIndicators
+    from growth_indicators import GrowthIndicators
+    from valuation_indicators import ValuationIndicators
+
+    batch = CrossSectionalIndicators(loader)
+    families = {
+        'profitability': (batch.basic_profitability_ratios, ProfitabilityIndicators(loader).calculate_basic_profitability_ratios),
+        'liquidity': (batch.basic_liquidity_ratios, LiquidityIndicators(loader).calculate_basic_liquidity_ratios),
+        'leverage': (batch.basic_leverage_ratios, LeverageIndicators(loader).calculate_basic_leverage_ratios),
+        'growth': (batch.revenue_growth, GrowthIndicators(loader).calculate_revenue_growth),
+        'valuation': (batch.basic_valuation_ratios, ValuationIndicators(loader).calculate_basic_valuation_ratios),
+    }
+
+    report = {}
+    for name, (batch_fn, symbol_fn) in families.items():
+        start = time.perf_counter()
+        batch_df = batch_fn()
+        batch_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = [r for r in (symbol_fn(s) for s in loader.companies_list) if r]
+        loop_seconds = time.perf_counter() - start
+        loop_df = pd.DataFrame(rows, columns=batch_df.columns)
+
+        try:
+            pd.testing.assert_frame_equal(batch_df.infer_objects(), loop_df.fillna(np.nan).infer_objects(),
+                                          check_dtype=False, check_exact=False, rtol=1e-12)
+            ok = True
+        except AssertionError as e:
+            print(f"❌ {name} mismatch: {e}")
+            ok = False
+        report[name] = (ok, batch_seconds, loop_seconds)
+    return report
+
+
+if __name__ == "__main__":
+    # Verify the batch engine against the per-symbol methods:
+    #   python3 cross_sectional.py [data_directory]
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'financial_reports', 'data')
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else default_dir
+    loader = FinancialDataLoader(data_dir)
+    loader.load_all_companies()
+
+    print(f"\n📊 Cross-sectional engine vs per-symbol methods ({len(loader.companies_list)} companies)")
+    for name, (ok, batch_seconds, loop_seconds) in compare_with_per_symbol(loader).items():
+        status = "✅ match" if ok else "❌ differ"
+        print(f"{name:15s} {status}  batch {batch_seconds * 1000:8.1f} ms   per-symbol {loop_seconds * 1000:8.1f} ms")
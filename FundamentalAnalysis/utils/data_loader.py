@@ -1,18 +1,66 @@
 #!/usr/bin/env python3
 """
 Data Loader Utility for Fundamental Analysis
-Common functions to load and parse financial data from JSON files
+Common functions to load and parse financial data from snapshot (.npz) or JSON files
 """
 
+import copy
+import functools
 import json
 import pandas as pd
 import numpy as np
+from contextlib import contextmanager
 from pathlib import Path
 import os
+import sys
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'financial_reports'))
+from financial_snapshot import company_files, read_snapshot_parts, statement_chunks, decode_statements
+
+class IndicatorMemo:
+    """Indicator results keyed by (indicator, symbol, data_version, extra args)"""
+    
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_compute(self, key, compute):
+        if key in self._results:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._results[key] = compute()
+        # Callers decorate results in place (e.g. result.update(...)), so
+        # every caller gets its own copy
+        return copy.deepcopy(self._results[key])
+
+def memoized_indicator(method):
+    """
+    Read a per-symbol indicator method through the loader's memo while a
+    request scope is open; call straight through otherwise.
+    """
+    @functools.wraps(method)
+    def wrapper(self, symbol, *args, **kwargs):
+        memo = self.loader.memo
+        if memo is None:
+            return method(self, symbol, *args, **kwargs)
+        key = (f"{type(self).__name__}.{method.__name__}", symbol, self.loader.data_version,
+               args, tuple(sorted(kwargs.items())))
+        return memo.get_or_compute(key, lambda: method(self, symbol, *args, **kwargs))
+    return wrapper
+
+def request_scoped(method):
+    """Run a method inside the loader's memo scope (shared with any enclosing scope)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.loader.memo_scope():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class FinancialDataLoader:
     """Utility class to load and parse financial data"""
     
@@ -20,26 +68,148 @@ class FinancialDataLoader:
         self.data_dir = Path(data_directory)
         self.companies_data = {}
         self.companies_list = []
-        
-    def load_all_companies(self):
-        """Load financial data for all companies"""
+        # Statement columns of companies loaded from snapshots; their nested
+        # financial_statements dict is only built on demand
+        self._statement_columns = {}
+        # Columnar statement store, built from companies_data on first lookup
+        self.statement_table = None
+        self._item_slices = {}
+        self._item_frames = {}
+        # sector -> symbols (in companies_list order), see build_sector_index
+        self.sector_index = None
+        self._sector_index_version = None
+        # Bumped whenever the statement store is rebuilt; part of every memo key
+        self.data_version = 0
+        # Request-scoped indicator memo (see memo_scope) and its running totals
+        self.memo = None
+        self.memo_stats = {'hits': 0, 'misses': 0}
+        
+    def list_company_files(self):
+        """{symbol: data file} for the data directory (newer of snapshot and JSON), without loading any"""
+        return company_files(self.data_dir)
+    
+    def list_company_symbols(self):
+        """Symbols available in the data directory, without loading their data"""
+        return list(self.list_company_files())
+    
+    def load_all_companies(self, symbols=None):
+        """Load financial data for all companies, or only the given symbols"""
         print("📊 Loading financial data for all companies...")
         
-        json_files = list(self.data_dir.glob("*.json"))
-        print(f"Found {len(json_files)} companies")
+        files = self.list_company_files()
+        if symbols is not None:
+            files = {symbol: files.get(symbol, self.data_dir / f"{symbol}_financial_data.json") for symbol in symbols}
+        print(f"Found {len(files)} companies")
         
-        for json_file in json_files:
+        for symbol, data_file in files.items():
             try:
-                symbol = json_file.stem.replace("_financial_data", "")
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.companies_data[symbol] = data
-                    self.companies_list.append(symbol)
+                if data_file.suffix == '.npz':
+                    # Indicators never read price bars; skip decoding them
+                    data, statement_columns = read_snapshot_parts(data_file, skip_sections=('historical_prices',))
+                    if statement_columns is not None:
+                        self._statement_columns[symbol] = statement_columns
+                else:
+                    with open(data_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                self.companies_data[symbol] = data
+                self.companies_list.append(symbol)
             except Exception as e:
-                print(f"⚠️  Error loading {json_file}: {e}")
+                print(f"⚠️  Error loading {data_file}: {e}")
         
         print(f"✅ Successfully loaded {len(self.companies_data)} companies")
+        self.build_statement_table()
         return self.companies_data
+
+    def build_statement_table(self):
+        """
+        Normalize every company's statements into one long table sorted by
+        (symbol, statement, period_type, field, period), parsing all periods in
+        a single pass. Each (symbol, statement, period_type, field) series is
+        then a contiguous slice of the table.
+        """
+        # One chunk per (symbol, period_type, statement, period); fields and
+        # values are collected flat, the chunk labels are repeated afterwards
+        chunk_labels = []
+        chunk_sizes = []
+        fields = []
+        values = []
+        for symbol in self.companies_list:
+            statement_columns = self._statement_columns.get(symbol)
+            if statement_columns is not None and 'financial_statements' not in self.companies_data[symbol]:
+                # Snapshot: the columns are already flat, in the same row order
+                for period_type, statement_type, period, count in statement_chunks(statement_columns):
+                    chunk_labels.append((symbol, statement_type, period_type, period))
+                    chunk_sizes.append(count)
+                fields.extend(np.asarray(statement_columns['fields'], dtype=object)[statement_columns['field_codes']].tolist())
+                snapshot_values = statement_columns['values'].tolist()
+                for row, text in statement_columns['text_values'].items():
+                    snapshot_values[int(row)] = text
+                values.extend(snapshot_values)
+                continue
+            financial_statements = self.companies_data[symbol].get('financial_statements', {})
+            for period_type, statements_by_type in financial_statements.items():
+                for statement_type, by_period in statements_by_type.items():
+                    for period, items in by_period.items():
+                        chunk_labels.append((symbol, statement_type, period_type, period))
+                        chunk_sizes.append(len(items))
+                        fields.extend(items.keys())
+                        values.extend([field_data.get('value', np.nan) for field_data in items.values()])
+
+        key_columns = ['symbol', 'statement', 'period_type', 'field']
+        labels = list(zip(*chunk_labels)) if chunk_labels else [[], [], [], []]
+        columns = {}
+        codes = {}
+        for name, column in zip(['symbol', 'statement', 'period_type', 'period'], labels):
+            chunk_codes, uniques = pd.factorize(pd.Series(column, dtype=object))
+            codes[name] = np.repeat(chunk_codes, chunk_sizes)
+            columns[name] = uniques
+        codes['field'], columns['field'] = pd.factorize(pd.Series(fields, dtype=object))
+
+        # Parse each distinct period string once
+        period_values = pd.to_datetime(pd.Series(columns['period'], dtype=object)).to_numpy()[codes['period']]
+        order = np.lexsort((period_values, codes['field'], codes['period_type'], codes['statement'], codes['symbol']))
+
+        table = pd.DataFrame({
+            name: pd.Categorical.from_codes(codes[name][order], pd.Index(columns[name], dtype=object))
+            for name in key_columns
+        })
+        table['period'] = period_values[order]
+        table['value'] = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)[order]
+
+        # Series boundaries: rows where any key column changes
+        n = len(table)
+        change = np.zeros(n, dtype=bool)
+        if n:
+            change[0] = True
+            for name in key_columns:
+                sorted_codes = codes[name][order]
+                change[1:] |= sorted_codes[1:] != sorted_codes[:-1]
+        starts = np.flatnonzero(change)
+        stops = np.append(starts[1:], n)
+        keys = zip(*(np.asarray(columns[name], dtype=object)[codes[name][order][starts]] for name in key_columns))
+
+        self.statement_table = table
+        self._item_slices = dict(zip(keys, zip(starts.tolist(), stops.tolist())))
+        self._item_frames = {}
+        self.data_version += 1
+        return table
+
+    @contextmanager
+    def memo_scope(self):
+        """
+        Share indicator results for the duration of one request. Nested scopes
+        reuse the outer memo; it is dropped when the outermost scope exits.
+        """
+        if self.memo is not None:
+            yield self.memo
+            return
+        self.memo = IndicatorMemo()
+        try:
+            yield self.memo
+        finally:
+            self.memo_stats['hits'] += self.memo.hits
+            self.memo_stats['misses'] += self.memo.misses
+            self.memo = None
     
     def get_company_info(self, symbol):
         """Get basic company information"""
@@ -63,13 +233,19 @@ class FinancialDataLoader:
             'fetch_date': data.get('fetch_date', 'N/A')
         }
     
+    def get_financial_statements(self, symbol):
+        """Nested financial_statements dict, decoded from snapshot columns on first use"""
+        data = self.companies_data[symbol]
+        if 'financial_statements' not in data and symbol in self._statement_columns:
+            data['financial_statements'] = decode_statements(self._statement_columns[symbol])
+        return data.get('financial_statements', {})
+    
     def get_annual_income_statement(self, symbol, field_name=None):
         """Extract annual income statement data"""
         if symbol not in self.companies_data:
             return pd.DataFrame()
         
-        data = self.companies_data[symbol]
-        annual_data = data.get('financial_statements', {}).get('annual', {}).get('income_statement', {})
+        annual_data = self.get_financial_statements(symbol).get('annual', {}).get('income_statement', {})
         
         if not annual_data:
             return pd.DataFrame()
@@ -102,8 +278,7 @@ class FinancialDataLoader:
         if symbol not in self.companies_data:
             return pd.DataFrame()
         
-        data = self.companies_data[symbol]
-        annual_data = data.get('financial_statements', {}).get('annual', {}).get('balance_sheet', {})
+        annual_data = self.get_financial_statements(symbol).get('annual', {}).get('balance_sheet', {})
         
         if not annual_data:
             return pd.DataFrame()
@@ -136,8 +311,7 @@ class FinancialDataLoader:
         if symbol not in self.companies_data:
             return pd.DataFrame()
         
-        data = self.companies_data[symbol]
-        annual_data = data.get('financial_statements', {}).get('annual', {}).get('cash_flow', {})
+        annual_data = self.get_financial_statements(symbol).get('annual', {}).get('cash_flow', {})
         
         if not annual_data:
             return pd.DataFrame()
@@ -188,30 +362,25 @@ class FinancialDataLoader:
     
     def get_specific_financial_item(self, symbol, statement_type, field_name, period_type='annual'):
         """Get specific financial statement item"""
-        if symbol not in self.companies_data:
-            return pd.DataFrame()
-        
-        data = self.companies_data[symbol]
-        financial_data = data.get('financial_statements', {}).get(period_type, {}).get(statement_type, {})
-        
-        if not financial_data:
-            return pd.DataFrame()
-        
-        rows = []
-        for period, fields in financial_data.items():
-            if field_name in fields:
-                rows.append({
-                    'symbol': symbol,
-                    'period': period,
-                    'value': fields[field_name].get('value', np.nan)
-                })
-        
-        df = pd.DataFrame(rows)
-        if not df.empty:
-            df['period'] = pd.to_datetime(df['period'])
-            df = df.sort_values('period')
-        
-        return df
+        if self.statement_table is None:
+            self.build_statement_table()
+
+        key = (symbol, statement_type, period_type, field_name)
+        df = self._item_frames.get(key)
+        if df is None:
+            bounds = self._item_slices.get(key)
+            if bounds is None:
+                return pd.DataFrame()
+            start, stop = bounds
+            df = pd.DataFrame({
+                'symbol': symbol,
+                'period': self.statement_table['period'].values[start:stop],
+                'value': self.statement_table['value'].values[start:stop]
+            })
+            self._item_frames[key] = df
+
+        # Callers are free to add columns, so hand out a copy of the cached slice
+        return df.copy()
     
     def get_financial_summary(self, symbol):
         """Get financial summary for a company"""
@@ -260,23 +429,45 @@ class FinancialDataLoader:
         
         print(f"✅ Saved {file_type.upper()} output: {filepath}")
     
+    def build_sector_index(self):
+        """
+        Group symbols by sector in one pass over the companies. Rebuilt only
+        when data_version changes.
+        """
+        if self.sector_index is not None and self._sector_index_version == self.data_version:
+            return self.sector_index
+        self.sector_index = group_by_sector(
+            self.companies_list,
+            {symbol: self.companies_data[symbol].get('company_info', {}).get('sector', 'N/A')
+             for symbol in self.companies_list}
+        )
+        self._sector_index_version = self.data_version
+        return self.sector_index
+    
     def get_companies_by_sector(self, sector_name):
         """Get companies filtered by sector"""
-        companies = []
-        for symbol in self.companies_list:
-            company_info = self.get_company_info(symbol)
-            if company_info and sector_name.lower() in company_info['sector'].lower():
-                companies.append(symbol)
-        return companies
+        return match_sector(self.build_sector_index(), self.companies_list, sector_name)
     
     def get_all_sectors(self):
         """Get list of all sectors"""
-        sectors = set()
-        for symbol in self.companies_list:
-            company_info = self.get_company_info(symbol)
-            if company_info:
-                sectors.add(company_info['sector'])
-        return list(sectors)
+        return list(self.build_sector_index())
+
+# Sector lookups shared by the loader and the sharded runner
+def group_by_sector(symbols, sectors):
+    """Map each sector to its symbols, keeping the order of symbols"""
+    index = {}
+    for symbol in symbols:
+        index.setdefault(sectors[symbol], []).append(symbol)
+    return index
+
+def match_sector(sector_index, symbols, sector_name):
+    """Symbols whose sector contains sector_name (case-insensitive), in the order of symbols"""
+    matches = [sector for sector in sector_index if sector_name.lower() in sector.lower()]
+    if len(matches) == 1:
+        return list(sector_index[matches[0]])
+    # Substring match spanning several sectors: keep the original order
+    matched = {symbol for sector in matches for symbol in sector_index[sector]}
+    return [symbol for symbol in symbols if symbol in matched]
 
 # Utility functions for common calculations
 def safe_divide(numerator, denominator):
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Recompute Manifest
+Content hashes of every company data file (snapshot or JSON) and of every output row,
+so run_all_indicators.py --incremental only recomputes companies that changed
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def rows_hash(rows):
+    """SHA-256 of output rows, serialized the way save_results writes them"""
+    payload = json.dumps(rows, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def code_hash(paths):
+    """Combined hash of the indicator sources; any edit invalidates every output row"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(file_hash(path).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def group_rows_by_symbol(rows):
+    """{symbol: rows}, keeping row order within each symbol"""
+    by_symbol = {}
+    for row in rows:
+        by_symbol.setdefault(row.get('symbol'), []).append(row)
+    return by_symbol
+
+
+def read_rows_by_symbol(json_path):
+    """Rows of an output JSON file grouped by symbol, in file order"""
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return {}
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return group_rows_by_symbol(json.load(f))
+
+
+class RecomputeManifest:
+    """
+    outputs/manifest.json: input hash, sector and name per company, plus a
+    hash of each company's rows in every output file
+    """
+
+    def __init__(self, output_base="outputs"):
+        self.path = Path(output_base) / "manifest.json"
+        self.data = {'code': None, 'inputs': {}, 'companies': {}, 'outputs': {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable manifest {self.path}: {e}")
+
+    @staticmethod
+    def hash_inputs(company_files):
+        """Current input hash per symbol, from {symbol: data file}"""
+        return {symbol: file_hash(path) for symbol, path in company_files.items()}
+
+    def changed_symbols(self, input_hashes, current_code_hash, output_rows):
+        """
+        Symbols to recompute and symbols removed since the last run.
+
+        A symbol is recomputed when its input hash is new or different, when
+        the indicator code changed, or when any of its rows in output_rows
+        ({output file: {symbol: rows}}) no longer matches the recorded hash.
+        """
+        removed = [symbol for symbol in self.data['inputs'] if symbol not in input_hashes]
+        if self.data['code'] != current_code_hash:
+            return list(input_hashes), removed
+
+        dirty = []
+        for symbol, digest in input_hashes.items():
+            if self.data['inputs'].get(symbol) != digest:
+                dirty.append(symbol)
+                continue
+            for output_file, recorded in self.data['outputs'].items():
+                rows = output_rows.get(output_file, {}).get(symbol)
+                if recorded.get(symbol) != (rows_hash(rows) if rows else None):
+                    dirty.append(symbol)
+                    break
+        return dirty, removed
+
+    def save(self, input_hashes, current_code_hash, companies, output_rows):
+        """Record this run's inputs, company sectors/names and output row hashes"""
+        self.data = {
+            'code': current_code_hash,
+            'inputs': input_hashes,
+            'companies': companies,
+            'outputs': {
+                output_file: {symbol: rows_hash(rows) for symbol, rows in by_symbol.items()}
+                for output_file, by_symbol in output_rows.items()
+            }
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        tmp_path.replace(self.path)
+        print(f"✅ Saved recompute manifest: {self.path}")
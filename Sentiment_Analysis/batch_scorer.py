@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Batch Sentiment Scorer
+Scores many companies concurrently with a concurrency cap, a token-bucket
+rate limiter and retries with jittered exponential backoff
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rate_limiter import TokenBucket, backoff_delay
+
+
+class BatchSentimentScorer:
+    """
+    Run score_fn(text) for many companies in parallel.
+
+    score_fn should raise on failure; failed calls are retried up to
+    max_retries times and then fall back to fallback(text) if given, else
+    to fallback_score. Every upstream attempt, including retries, takes a
+    token from the rate limiter.
+    """
+
+    def __init__(self, score_fn, concurrency=8, rate_per_sec=5.0, max_retries=3,
+                 base_delay=0.5, max_delay=8.0, fallback_score=5, fallback=None):
+        self.score_fn = score_fn
+        self.fallback = fallback
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate_per_sec)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.fallback_score = fallback_score
+
+    def _score_one(self, company, text):
+        start = time.perf_counter()
+        attempts = 0
+        error = None
+        while True:
+            attempts += 1
+            self.limiter.acquire()
+            try:
+                score = self.score_fn(text)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if attempts > self.max_retries:
+                    score = self._fallback(text)
+                    break
+                time.sleep(backoff_delay(attempts - 1, self.base_delay, self.max_delay))
+
+        return {
+            'company': company,
+            'score': score,
+            'success': error is None,
+            'attempts': attempts,
+            'latency_seconds': time.perf_counter() - start,
+            'error': str(error) if error else None
+        }
+
+    def _fallback(self, text):
+        if self.fallback is not None:
+            try:
+                return self.fallback(text)
+            except Exception as e:
+                print(f"Fallback scorer failed: {e}")
+        return self.fallback_score
+
+    def score_all(self, texts):
+        """
+        Score a {company: text} mapping.
+
+        Returns ({company: score}, [per-company metrics]) in input order.
+        """
+        companies = list(texts)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            metrics = list(executor.map(lambda c: self._score_one(c, texts[c]), companies))
+        scores = {m['company']: m['score'] for m in metrics}
+        return scores, metrics
+
+    @staticmethod
+    def format_report(metrics, wall_seconds=None):
+        """Build a text report of per-stock latency and success metrics"""
+        lines = []
+        lines.append("📊 SENTIMENT SCORING REPORT")
+        lines.append("=" * 50)
+        if not metrics:
+            lines.append("Nothing to score")
+            return "\n".join(lines)
+
+        latencies = sorted(m['latency_seconds'] for m in metrics)
+        successes = sum(1 for m in metrics if m['success'])
+        retries = sum(m['attempts'] - 1 for m in metrics)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))]
+
+        lines.append(f"Items scored: {len(metrics)}")
+        lines.append(f"Successful: {successes} ({successes / len(metrics) * 100:.1f}%)")
+        lines.append(f"Fallback scores used: {len(metrics) - successes}")
+        lines.append(f"Retries: {retries}")
+        lines.append(f"Latency p50/p95/max: {percentile(0.5):.2f}s / {percentile(0.95):.2f}s / {latencies[-1]:.2f}s")
+        if wall_seconds is not None:
+            lines.append(f"Wall-clock time: {wall_seconds:.2f}s")
+        lines.append("")
+        lines.append("Per stock:")
+        for m in metrics:
+            status = "✅" if m['success'] else f"❌ {m['error']}"
+            lines.append(f"  {m['company']}: score={m['score']} attempts={m['attempts']} "
+                         f"latency={m['latency_seconds']:.2f}s {status}")
+        return "\n".join(lines)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Per-Headline Sentiment Store
+Keeps one model score per news row in stock_news.db, keyed by (stock, datetime),
+and rolls stored scores up into a recency-weighted company score
+"""
+
+import sqlite3
+from datetime import datetime
+
+NEWS_DB_PATH = "/home/tarun/MarketSentimentAnalysis/db/stock_news.db"
+
+# A headline this many hours old counts half as much as a brand-new one
+HALF_LIFE_HOURS = 12.0
+
+
+def connect(db_path=NEWS_DB_PATH):
+    """Open stock_news.db and make sure the headline score table exists"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS headline_sentiment (
+            stock TEXT,
+            datetime TEXT,
+            score REAL NOT NULL,
+            model TEXT,
+            scored_at TEXT,
+            PRIMARY KEY (stock, datetime)
+        )
+    ''')
+    conn.commit()
+    return conn
+
+
+def load_scores(conn, headlines, model=None):
+    """
+    Look up stored scores for {stock: {datetime: headline}}.
+
+    Returns {(stock, datetime): score} for the rows already scored (by
+    `model`, when given).
+    """
+    stored = {}
+    for stock, news_dict in headlines.items():
+        if not news_dict:
+            continue
+        query = 'SELECT datetime, score FROM headline_sentiment WHERE stock = ? AND datetime BETWEEN ? AND ?'
+        params = [stock, min(news_dict), max(news_dict)]
+        if model is not None:
+            query += ' AND model = ?'
+            params.append(model)
+        rows = conn.execute(query, params).fetchall()
+        for dt, score in rows:
+            if dt in news_dict:
+                stored[(stock, dt)] = score
+    return stored
+
+
+def save_scores(conn, scores, model):
+    """Store {(stock, datetime): score} in one transaction"""
+    scored_at = datetime.now().isoformat()
+    conn.executemany('''
+        INSERT INTO headline_sentiment (stock, datetime, score, model, scored_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(stock, datetime) DO UPDATE SET
+            score = excluded.score, model = excluded.model, scored_at = excluded.scored_at
+    ''', [(stock, dt, score, model, scored_at) for (stock, dt), score in scores.items()])
+    conn.commit()
+
+
+def aggregate_score(scored, now=None, half_life_hours=HALF_LIFE_HOURS):
+    """
+    Recency-weighted mean of [(datetime_iso, score), ...].
+
+    Each headline is weighted by 0.5 ** (age_hours / half_life_hours), with
+    age measured from `now` (default: the newest headline in the set).
+    Returns None when there is nothing to aggregate.
+    """
+    if not scored:
+        return None
+    times = [datetime.fromisoformat(dt_iso) for dt_iso, _ in scored]
+    now = now or max(times)
+    total = 0.0
+    weights = 0.0
+    for published, (_, score) in zip(times, scored):
+        age_hours = max(0.0, (now - published).total_seconds() / 3600)
+        weight = 0.5 ** (age_hours / half_life_hours)
+        total += weight * score
+        weights += weight
+    if weights == 0:
+        # Everything is so old the weights underflowed; fall back to a plain mean
+        return round(sum(score for _, score in scored) / len(scored), 2)
+    return round(total / weights, 2)
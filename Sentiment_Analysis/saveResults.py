@@ -1,7 +1,13 @@
 import sqlite3
+import sys
+import os
 from datetime import datetime
 import json
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bulk_ingest import ingest
+from sentiment_store import UPSERT_LATEST, init_latest_sentiment
+
 with open('/home/tarun/MarketSentimentAnalysis/Sentiment_Analysis/sentiment_analysis_results.json', 'r') as f:
     data = json.load(f)
 
@@ -23,31 +29,21 @@ CREATE TABLE IF NOT EXISTS sentimentResult (
 )
 ''')
 
+# Latest score per stock (backfilled from history on first run)
+init_latest_sentiment(cursor)
+conn.commit()
+
 # Prepare data for insertion
+rows = []
 for stock, value in data.items():
-    rows = []
     for key, val in value.items():
         dt_iso = datetime.fromisoformat(key).isoformat()
-        row = (dt_iso, stock, val)
-        try:
-            cursor.execute('INSERT INTO sentimentResult (datetime, stock, marketSentiment) VALUES (?, ?, ?)', (row))
-            conn.commit()
-        except sqlite3.IntegrityError as e:
-            print("Integrity error:", e)
-        rows.append(row)    
-# Insert data (if duplicate primary key, will raise error)
-# try:
-#     cursor.executemany('INSERT INTO news (datetime, stock, description, source_link) VALUES (?, ?, ?, ?)', rows)
-#     conn.commit()
-# except sqlite3.IntegrityError as e:
-    # print("Integrity error:", e)
-# print(rows)
-# print('-'*100)
-# Query to check data
-cursor.execute('SELECT * FROM sentimentResult ORDER BY datetime DESC ')
-values = cursor.fetchall()
-for row in values:
-    print(row)
+        rows.append((dt_iso, stock, val))
 
-conn.close()
+# Insert history and refresh latest_sentiment in one transaction; rows already
+# in sentimentResult are skipped, and the upsert only takes strictly newer
+# datetimes, so a re-scored duplicate cannot change latest_sentiment either
+ingest(conn, 'sentimentResult', ('datetime', 'stock', 'marketSentiment'), rows,
+       follow_up=[(UPSERT_LATEST, [(stock, dt_iso, val) for dt_iso, stock, val in rows])])
 
+conn.close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Sentiment Score Cache
+On-disk memo of model scores keyed by a content hash of
+(model, prompt template, normalized headline set), with TTL and LRU eviction
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+
+def normalize_headline(headline):
+    """Collapse whitespace and case so trivially different copies hash the same"""
+    return " ".join(str(headline).split()).casefold()
+
+
+def cache_key(model, prompt_template, headlines):
+    """Stable hash of the inputs that determine a model score"""
+    payload = json.dumps({
+        'model': model,
+        'template': prompt_template,
+        'headlines': sorted({normalize_headline(h) for h in headlines}),
+    }, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScoreCache:
+    """
+    SQLite-backed score memo.
+
+    Entries older than ttl_seconds are treated as misses and dropped. When
+    the table grows past max_entries, the least recently used rows are
+    evicted.
+    """
+
+    def __init__(self, db_path="sentiment_score_cache.db", ttl_seconds=7 * 24 * 60 * 60,
+                 max_entries=50000, clock=time.time):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS score_cache (
+                key TEXT PRIMARY KEY,
+                score REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_score_cache_last_used ON score_cache (last_used)")
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached score or None"""
+        now = self.clock()
+        row = self.conn.execute("SELECT score, created_at FROM score_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        score, created_at = row
+        if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+            self.conn.execute("DELETE FROM score_cache WHERE key = ?", (key,))
+            self.conn.commit()
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+        self.conn.execute("UPDATE score_cache SET last_used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.stats['hits'] += 1
+        return score
+
+    def put_many(self, items):
+        """Store {key: score} in one transaction, then evict down to max_entries"""
+        now = self.clock()
+        self.conn.executemany("""
+            INSERT INTO score_cache (key, score, created_at, last_used) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET score = excluded.score,
+                created_at = excluded.created_at, last_used = excluded.last_used
+        """, [(key, score, now, now) for key, score in items.items()])
+        self._evict()
+        self.conn.commit()
+
+    def put(self, key, score):
+        self.put_many({key: score})
+
+    def _evict(self):
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM score_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute("""
+                DELETE FROM score_cache WHERE key IN (
+                    SELECT key FROM score_cache ORDER BY last_used LIMIT ?
+                )
+            """, (excess,))
+            self.stats['evicted'] += excess
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Sentiment Scorers
+Pluggable scoring backends sharing one interface: the OpenAI chat model and an
+offline finance-lexicon scorer vectorized with NumPy
+"""
+
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+# Term polarity in [-3, 3], loosely following finance sentiment word lists
+FINANCE_LEXICON = {
+    # Positive
+    'gain': 1.5, 'gains': 1.5, 'gained': 1.5, 'rise': 1.5, 'rises': 1.5, 'rising': 1.5, 'rose': 1.5,
+    'surge': 2.5, 'surges': 2.5, 'surged': 2.5, 'soar': 2.5, 'soars': 2.5, 'soared': 2.5,
+    'jump': 2.0, 'jumps': 2.0, 'jumped': 2.0, 'rally': 2.0, 'rallies': 2.0, 'rallied': 2.0,
+    'climb': 1.5, 'climbs': 1.5, 'climbed': 1.5, 'up': 0.5, 'higher': 1.0, 'high': 0.5, 'record': 1.5,
+    'profit': 1.5, 'profits': 1.5, 'profitable': 2.0, 'growth': 1.5, 'grow': 1.5, 'grows': 1.5, 'grew': 1.5,
+    'beat': 2.0, 'beats': 2.0, 'outperform': 2.0, 'outperforms': 2.0, 'outperformed': 2.0,
+    'upgrade': 2.0, 'upgrades': 2.0, 'upgraded': 2.0, 'buy': 1.0, 'bullish': 2.5, 'optimistic': 1.5,
+    'strong': 1.5, 'stronger': 1.5, 'robust': 1.5, 'boost': 1.5, 'boosts': 1.5, 'boosted': 1.5,
+    'expand': 1.0, 'expands': 1.0, 'expansion': 1.0, 'wins': 1.5, 'win': 1.5, 'won': 1.5,
+    'order': 0.5, 'orders': 0.5, 'contract': 0.5, 'deal': 1.0, 'partnership': 1.0, 'approval': 1.5,
+    'approved': 1.5, 'dividend': 1.0, 'bonus': 1.0, 'buyback': 1.5, 'recovery': 1.5, 'recovers': 1.5,
+    'rebound': 1.5, 'rebounds': 1.5, 'positive': 1.5, 'improve': 1.5, 'improves': 1.5, 'improved': 1.5,
+    'improvement': 1.5, 'exceeds': 2.0, 'exceeded': 2.0, 'upbeat': 2.0, 'momentum': 1.0, 'target': 0.5,
+    'success': 1.5, 'successful': 1.5, 'launch': 0.5, 'launches': 0.5, 'stable': 0.5, 'resilient': 1.5,
+    # Negative
+    'fall': -1.5, 'falls': -1.5, 'fell': -1.5, 'falling': -1.5, 'drop': -1.5, 'drops': -1.5, 'dropped': -1.5,
+    'decline': -1.5, 'declines': -1.5, 'declined': -1.5, 'slump': -2.5, 'slumps': -2.5, 'slumped': -2.5,
+    'plunge': -2.5, 'plunges': -2.5, 'plunged': -2.5, 'crash': -3.0, 'crashes': -3.0, 'crashed': -3.0,
+    'tumble': -2.0, 'tumbles': -2.0, 'tumbled': -2.0, 'slide': -1.5, 'slides': -1.5, 'slid': -1.5,
+    'down': -0.5, 'lower': -1.0, 'low': -0.5, 'loss': -2.0, 'losses': -2.0, 'lose': -1.5, 'loses': -1.5,
+    'miss': -2.0, 'misses': -2.0, 'missed': -2.0, 'downgrade': -2.0, 'downgrades': -2.0, 'downgraded': -2.0,
+    'sell': -1.0, 'bearish': -2.5, 'pessimistic': -1.5, 'weak': -1.5, 'weaker': -1.5, 'weakness': -1.5,
+    'cut': -1.0, 'cuts': -1.0, 'layoff': -2.0, 'layoffs': -2.0, 'fraud': -3.0, 'probe': -2.0,
+    'investigation': -2.0, 'penalty': -2.0, 'fine': -1.0, 'fined': -2.0, 'lawsuit': -2.0, 'default': -3.0,
+    'debt': -1.0, 'risk': -1.0, 'risks': -1.0, 'concern': -1.5, 'concerns': -1.5, 'warning': -2.0,
+    'warns': -2.0, 'volatile': -1.0, 'volatility': -1.0, 'pressure': -1.0, 'slowdown': -1.5,
+    'negative': -1.5, 'resign': -1.5, 'resigns': -1.5, 'resigned': -1.5, 'delay': -1.0, 'delays': -1.0,
+    'delayed': -1.0, 'ban': -2.0, 'banned': -2.0, 'strike': -1.5, 'recall': -1.5, 'selloff': -2.5,
+    'sell-off': -2.5, 'underperform': -2.0, 'underperforms': -2.0, 'disappoint': -2.0,
+    'disappoints': -2.0, 'disappointing': -2.0, 'shortfall': -2.0, 'worst': -2.5, 'crisis': -2.5,
+}
+
+NEGATORS = {'no', 'not', 'never', 'without', "n't", "isn't", "wasn't", "don't", "doesn't", "didn't", 'fails', 'failed'}
+
+# Negation flips the polarity of lexicon terms within this many following tokens
+NEGATION_WINDOW = 3
+
+TOKEN_RE = re.compile(r"[a-z][a-z'-]*")
+
+
+class SentimentScorer:
+    """
+    Interface for sentiment backends.
+
+    score(text) returns a 1-10 score and raises on failure. score_batch
+    scores many texts at once; backends with a vectorized path override it.
+    Remote backends are driven through BatchSentimentScorer; local ones are
+    fast enough to run in-process via score_all.
+    """
+
+    name = "base"
+    remote = False
+
+    def score(self, text):
+        raise NotImplementedError
+
+    def score_batch(self, texts):
+        return [self.score(text) for text in texts]
+
+    def score_all(self, texts):
+        """Score a {key: text} mapping; same return shape as BatchSentimentScorer.score_all"""
+        keys = list(texts)
+        start = time.perf_counter()
+        values = self.score_batch([texts[key] for key in keys])
+        per_item = (time.perf_counter() - start) / max(len(keys), 1)
+        metrics = [{
+            'company': key,
+            'score': value,
+            'success': True,
+            'attempts': 1,
+            'latency_seconds': per_item,
+            'error': None
+        } for key, value in zip(keys, values)]
+        return dict(zip(keys, values)), metrics
+
+
+class OpenAIScorer(SentimentScorer):
+    """Chat-completions backend; honours OPENAI_BASE_URL for local stubs"""
+
+    remote = True
+
+    def __init__(self, model, prompt_template, api_key=None, base_url=None):
+        import openai
+        self.name = model
+        self.model = model
+        self.prompt_template = prompt_template
+        # Retries are handled by BatchSentimentScorer, so the client's own are disabled.
+        self.client = openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"),
+                                    base_url=base_url or os.getenv("OPENAI_BASE_URL"),
+                                    max_retries=0)
+
+    def score(self, text):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a helpful sentiment analysis assistant."},
+                {"role": "user", "content": self.prompt_template.format(text=text)}
+            ],
+            temperature=0,
+            max_tokens=5,
+        )
+        sentiment_str = response.choices[0].message.content.strip()
+        score = float(sentiment_str)
+        return max(1, min(score, 10))  # Clamp score between 1 and 10
+
+
+class LexiconScorer(SentimentScorer):
+    """
+    Offline finance-lexicon scorer.
+
+    Texts are turned into a sparse (text x term) matrix in COO form and
+    scored with one weighted bincount, so a batch costs a single pass of
+    tokenization plus a few NumPy ops.
+    """
+
+    name = "finance-lexicon-v1"
+
+    def __init__(self, lexicon=None, negators=None, scale=2.0):
+        lexicon = lexicon or FINANCE_LEXICON
+        self.vocab = {term: i for i, term in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=float)
+        self.negators = negators or NEGATORS
+        self.scale = scale
+
+    def term_matrix(self, texts):
+        """Return (rows, cols, signs) COO arrays of lexicon hits"""
+        rows, cols, signs = [], [], []
+        vocab = self.vocab
+        negators = self.negators
+        for row, text in enumerate(texts):
+            negate_until = -1
+            for pos, token in enumerate(TOKEN_RE.findall(text.lower())):
+                if token in negators:
+                    negate_until = pos + NEGATION_WINDOW
+                    continue
+                col = vocab.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    signs.append(-1.0 if pos <= negate_until else 1.0)
+        return (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64),
+                np.array(signs, dtype=float))
+
+    def raw_scores(self, texts):
+        """Polarity per text, normalized by sqrt(number of lexicon hits)"""
+        n = len(texts)
+        rows, cols, signs = self.term_matrix(texts)
+        polarity = np.bincount(rows, weights=self.weights[cols] * signs, minlength=n)
+        hits = np.bincount(rows, minlength=n)
+        return polarity / np.sqrt(np.maximum(hits, 1))
+
+    def score_batch(self, texts):
+        raw = self.raw_scores(list(texts))
+        scores = np.clip(5 + 4.5 * np.tanh(raw / self.scale), 1, 10)
+        return np.round(scores, 2).tolist()
+
+    def score(self, text):
+        return self.score_batch([text])[0]
+
+
+def get_scorer(backend, model=None, prompt_template=None):
+    """Build a scorer by backend name ('openai' or 'lexicon')"""
+    if backend == "openai":
+        return OpenAIScorer(model, prompt_template)
+    if backend == "lexicon":
+        return LexiconScorer()
+    raise ValueError(f"Unknown sentiment backend: {backend}")
+
+
+if __name__ == "__main__":
+    # Benchmark the lexicon backend, and compare with OpenAI when it is configured:
+    #   python3 scorers.py [recent_news.json] [--compare]
+    import json
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if args:
+        with open(args[0], "r") as f:
+            news_data = json.load(f)
+        headlines = [h for news_dict in news_data.values() for h in news_dict.values()]
+    else:
+        samples = [
+            "Reliance shares surge after record quarterly profit beats estimates",
+            "TCS stock falls as revenue growth misses expectations",
+            "Infosys announces buyback, analysts upgrade to buy",
+            "SEBI probe into Adani group companies deepens concerns",
+            "HDFC Bank shares flat ahead of results",
+            "Tata Motors not expected to cut prices despite weak demand",
+        ]
+        headlines = [samples[i % len(samples)] for i in range(20000)]
+
+    lexicon = LexiconScorer()
+    start = time.perf_counter()
+    lexicon_scores = lexicon.score_batch(headlines)
+    elapsed = time.perf_counter() - start
+    print(f"📊 {lexicon.name}: {len(headlines)} headlines in {elapsed:.3f}s "
+          f"({len(headlines) / max(elapsed, 1e-9):,.0f} headlines/s)")
+
+    if '--compare' in sys.argv:
+        from batch_scorer import BatchSentimentScorer
+        from sentiment_analysis import MODEL, PROMPT_TEMPLATE
+        sample = headlines[:50]
+        remote = OpenAIScorer(MODEL, PROMPT_TEMPLATE)
+        start = time.perf_counter()
+        remote_scores, metrics = BatchSentimentScorer(remote.score).score_all(dict(enumerate(sample)))
+        elapsed = time.perf_counter() - start
+        a = np.array(lexicon_scores[:len(sample)])
+        b = np.array([remote_scores[i] for i in range(len(sample))])
+        print(f"📊 {remote.name}: {len(sample)} headlines in {elapsed:.3f}s")
+        print(f"Mean absolute difference: {np.abs(a - b).mean():.2f}")
+        if a.std() > 0 and b.std() > 0:
+            print(f"Correlation: {np.corrcoef(a, b)[0, 1]:.2f}")
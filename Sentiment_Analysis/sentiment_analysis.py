@@ -1,57 +1,146 @@
 import json
 import os
 import datetime
-import openai
+import time
+from batch_scorer import BatchSentimentScorer
+from score_cache import ScoreCache, cache_key
+from scorers import LexiconScorer, get_scorer
+import headline_scores
 # from dotenv import load_dotenv
 # # Initialize OpenAI client with API key
 # load_dotenv()  # Load environment variables from .env file
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Scoring engine settings
+CONCURRENCY = int(os.getenv("SENTIMENT_CONCURRENCY", "8"))
+RATE_PER_SEC = float(os.getenv("SENTIMENT_RATE_PER_SEC", "5"))
+MAX_RETRIES = int(os.getenv("SENTIMENT_MAX_RETRIES", "3"))
+CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "sentiment_score_cache.db")
+CACHE_TTL_SECONDS = int(os.getenv("SENTIMENT_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+# "window": one prompt per company per run; "headline": score each news row once
+MODE = os.getenv("SENTIMENT_MODE", "window")
+# "openai" or "lexicon"; without an API key the offline lexicon scorer is used
+BACKEND = os.getenv("SENTIMENT_BACKEND") or ("openai" if os.getenv("OPENAI_API_KEY") else "lexicon")
+
+MODEL = "gpt-4o-mini"
+PROMPT_TEMPLATE = (
+    "Please rate the overall sentiment of the following news headlines based on their significance "
+    "and impact on a scale from 1 (very negative) to 10 (very positive), and respond only with the number:\n\n"
+    "{text}"
+)
+
+# Offline scorer used whenever the primary backend is unavailable or fails
+fallback_scorer = LexiconScorer()
+try:
+    # OPENAI_BASE_URL can point the OpenAI backend at a local stub (see stub_openai_server.py)
+    scorer_backend = get_scorer(BACKEND, MODEL, PROMPT_TEMPLATE)
+except Exception as e:
+    print(f"⚠️ Could not initialise '{BACKEND}' backend ({e}); using {fallback_scorer.name}")
+    scorer_backend = fallback_scorer
 
 def analyze_sentiment(text):
-    prompt = (
-        "Please rate the overall sentiment of the following news headlines based on their significance "
-        "and impact on a scale from 1 (very negative) to 10 (very positive), and respond only with the number:\n\n"
-        f"{text}"
-    )
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful sentiment analysis assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=5,
-        )
-        print(f"Response from OpenAI: {response.choices}")
-        sentiment_str = response.choices[0].message.content.strip()
-        score = float(sentiment_str)
-        return max(1, min(score, 10))  # Clamp score between 1 and 10
+        return scorer_backend.score(text)
     except Exception as e:
         print(f"Error analyzing sentiment: {e}")
-        return 5  # Neutral fallback
-
-# Load news data
-filepath = "/home/tarun/MarketSentimentAnalysis/insightGen/recent_news.json"
-with open(filepath, "r") as f:
-    news_data = json.load(f)
-
-# Analyze and store sentiment scores
-analysis_score = {}
-timestamp = datetime.datetime.now().isoformat()
-
-for company, news_dict in news_data.items():
-    print(f"\nAnalyzing sentiment for company: {company}")
-    headlines = list(news_dict.values())
-    if not headlines:
-        print("  No headlines found for this company.")
-        continue
-    combined_text = f"News Headlines for stock {company}:\n" + "\n".join(headlines)
-    score = analyze_sentiment(combined_text)
-    analysis_score[company] = {timestamp: score}
-
-# Save results
-with open("sentiment_analysis_results.json", "w") as f:
-    json.dump(analysis_score, f, indent=4)
-
-print("\n✅ Sentiment analysis complete. Results saved to 'sentiment_analysis_results.json'.")
+        return fallback_scorer.score(text)
+
+def make_scorer():
+    if not scorer_backend.remote:
+        print(f"Scoring offline with {scorer_backend.name}")
+        return scorer_backend
+    print(f"Scoring with {scorer_backend.name}: concurrency={CONCURRENCY}, rate={RATE_PER_SEC}/s, "
+          f"retries={MAX_RETRIES}, fallback={fallback_scorer.name}")
+    return BatchSentimentScorer(scorer_backend.score, concurrency=CONCURRENCY,
+                                rate_per_sec=RATE_PER_SEC, max_retries=MAX_RETRIES,
+                                fallback=fallback_scorer.score)
+
+def headline_text(company, headlines):
+    return f"News Headlines for stock {company}:\n" + "\n".join(headlines)
+
+def score_windows(news_data):
+    """Score each company's whole headline window in one prompt"""
+    # Build one prompt per company, skipping headline sets scored in earlier runs
+    cache = ScoreCache(CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS)
+    cached_scores = {}
+    texts = {}
+    keys = {}
+    for company, news_dict in news_data.items():
+        headlines = list(news_dict.values())
+        if not headlines:
+            print(f"  No headlines found for {company}.")
+            continue
+        # The company name is part of the prompt, so it is part of the key too
+        keys[company] = cache_key(scorer_backend.name, PROMPT_TEMPLATE, [f"stock:{company}"] + headlines)
+        cached = cache.get(keys[company])
+        if cached is not None:
+            cached_scores[company] = cached
+        else:
+            texts[company] = headline_text(company, headlines)
+    print(f"\n💾 Score cache: {len(cached_scores)} hit(s), {len(texts)} miss(es)")
+
+    # Score the misses concurrently
+    new_scores, metrics = make_scorer().score_all(texts)
+
+    # Only cache real model answers, never the neutral fallback
+    cache.put_many({keys[m['company']]: m['score'] for m in metrics if m['success']})
+    cache.close()
+
+    scores = {**cached_scores, **new_scores}
+    return {company: scores[company] for company in keys}, metrics
+
+def score_headlines(news_data):
+    """Score only headlines not yet stored in stock_news.db, then aggregate per company"""
+    conn = headline_scores.connect()
+    stored = headline_scores.load_scores(conn, news_data, scorer_backend.name)
+
+    texts = {}
+    for company, news_dict in news_data.items():
+        for dt, headline in news_dict.items():
+            if (company, dt) not in stored:
+                texts[(company, dt)] = headline_text(company, [headline])
+    print(f"\n💾 Stored headline scores: {len(stored)}, new headlines to score: {len(texts)}")
+
+    new_scores, metrics = make_scorer().score_all(texts)
+
+    # Fallback scores are not stored so those headlines are retried next run
+    headline_scores.save_scores(conn, {m['company']: m['score'] for m in metrics if m['success']}, scorer_backend.name)
+    conn.close()
+    stored.update({m['company']: m['score'] for m in metrics if m['success']})
+
+    company_scores = {}
+    for company, news_dict in news_data.items():
+        if not news_dict:
+            print(f"  No headlines found for {company}.")
+            continue
+        scored = [(dt, stored[(company, dt)]) for dt in news_dict if (company, dt) in stored]
+        score = headline_scores.aggregate_score(scored)
+        if score is None:
+            score = fallback_scorer.score(headline_text(company, list(news_dict.values())))
+        company_scores[company] = score
+    return company_scores, metrics
+
+if __name__ == "__main__":
+    # Load news data
+    filepath = "/home/tarun/MarketSentimentAnalysis/insightGen/recent_news.json"
+    with open(filepath, "r") as f:
+        news_data = json.load(f)
+
+    print(f"\nAnalyzing sentiment for {len(news_data)} companies ({MODE} mode)")
+    start = time.perf_counter()
+    if MODE == "headline":
+        scores, metrics = score_headlines(news_data)
+    else:
+        scores, metrics = score_windows(news_data)
+    wall_seconds = time.perf_counter() - start
+
+    # Analyze and store sentiment scores, keeping the input order
+    timestamp = datetime.datetime.now().isoformat()
+    analysis_score = {company: {timestamp: score} for company, score in scores.items()}
+
+    # Save results
+    with open("sentiment_analysis_results.json", "w") as f:
+        json.dump(analysis_score, f, indent=4)
+
+    print()
+    print(BatchSentimentScorer.format_report(metrics, wall_seconds))
+    print("\n✅ Sentiment analysis complete. Results saved to 'sentiment_analysis_results.json'.")
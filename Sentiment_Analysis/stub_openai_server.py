@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Stub Chat Completions Server
+Local stand-in for the OpenAI chat-completions endpoint, for exercising
+sentiment_analysis.py without network access or API spend.
+
+Usage:
+    python3 stub_openai_server.py --port 8765 --latency 0.3 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python3 sentiment_analysis.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    request_count = 0
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send(404, {'error': {'message': f'Unknown path {self.path}'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        type(self).request_count += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if random.random() < self.error_rate:
+            self._send(429, {'error': {'message': 'Rate limit reached (stub)', 'type': 'rate_limit_error'}})
+            return
+
+        # Deterministic score derived from the prompt so repeated runs agree
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        score = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16) % 10 + 1
+
+        self._send(200, {
+            'id': f'chatcmpl-stub-{self.request_count}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': str(score)},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': len(prompt.split()), 'completion_tokens': 1,
+                      'total_tokens': len(prompt.split()) + 1}
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub OpenAI chat-completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to sleep per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    StubChatHandler.latency = args.latency
+    StubChatHandler.error_rate = args.error_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), StubChatHandler)
+    print(f"Stub chat-completions server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import sqlite3
 import os
-import yfinance as yf
 from datetime import datetime, timedelta
 import pandas as pd
 import csv
@@ -14,7 +12,12 @@ import jwt
 import bcrypt
 import secrets
 import requests
+import threading
 from functools import wraps
+from stock_data_cache import StockDataCache
+from sqlite_pool import SQLitePool
+from job_queue import JobQueue
+from sentiment_store import init_latest_sentiment
 
 app = Flask(__name__)
 CORS(app, supports_credentials=True)  # Enable CORS for all routes with credentials
@@ -49,61 +52,70 @@ def sanitize_for_json(obj):
 DB_PATH = "/home/tarun/MarketSentimentAnalysis/Sentiment_Analysis/sentiment_analysis.db"
 AUTH_DB_PATH = "/home/tarun/MarketSentimentAnalysis/db/auth.db"
 
+# Per-thread persistent connections (WAL + busy_timeout) for both databases
+sentiment_db = SQLitePool(DB_PATH)
+auth_db = SQLitePool(AUTH_DB_PATH)
+
 # Initialize auth database
 def init_auth_db():
     """Initialize the authentication database with users table"""
     os.makedirs(os.path.dirname(AUTH_DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(AUTH_DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT,
-            google_id TEXT UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Add test users for development/testing
-    test_users = [
-        {
-            'name': 'Test User',
-            'email': 'test@example.com',
-            'password': 'password123'
-        },
-        {
-            'name': 'Demo User',
-            'email': 'user@test.com',
-            'password': 'testpass123'
-        },
-        {
-            'name': 'Admin User',
-            'email': 'demo@marketsentiment.ai',
-            'password': 'demo123'
-        }
-    ]
+    with auth_db.cursor() as cursor:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT,
+                google_id TEXT UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
-    for user in test_users:
-        # Check if user already exists
-        cursor.execute('SELECT id FROM users WHERE email = ?', (user['email'],))
-        if not cursor.fetchone():
-            # Hash the password
-            password_hash = bcrypt.hashpw(user['password'].encode('utf-8'), bcrypt.gensalt())
-            cursor.execute('''
-                INSERT INTO users (name, email, password_hash)
-                VALUES (?, ?, ?)
-            ''', (user['name'], user['email'], password_hash.decode('utf-8')))
+        # Add test users for development/testing
+        test_users = [
+            {
+                'name': 'Test User',
+                'email': 'test@example.com',
+                'password': 'password123'
+            },
+            {
+                'name': 'Demo User',
+                'email': 'user@test.com',
+                'password': 'testpass123'
+            },
+            {
+                'name': 'Admin User',
+                'email': 'demo@marketsentiment.ai',
+                'password': 'demo123'
+            }
+        ]
     
-    conn.commit()
-    conn.close()
+        for user in test_users:
+            # Check if user already exists
+            cursor.execute('SELECT id FROM users WHERE email = ?', (user['email'],))
+            if not cursor.fetchone():
+                # Hash the password
+                password_hash = bcrypt.hashpw(user['password'].encode('utf-8'), bcrypt.gensalt())
+                cursor.execute('''
+                    INSERT INTO users (name, email, password_hash)
+                    VALUES (?, ?, ?)
+                ''', (user['name'], user['email'], password_hash.decode('utf-8')))
 
 # Initialize the auth database on startup
 init_auth_db()
 
+def init_sentiment_db():
+    """Make sure the latest_sentiment table exists (saveResults.py keeps it current)"""
+    with sentiment_db.cursor() as cursor:
+        init_latest_sentiment(cursor)
+
+init_sentiment_db()
+
+# Shared yfinance cache for /api/stock-data and /api/stock-info
+stock_cache = StockDataCache()
+
 def generate_token(user_id, email):
     """Generate JWT token for user"""
     payload = {
@@ -231,11 +243,9 @@ STOCK_TICKER_MAP = {
 def get_stocks():
     """Get list of all stocks in the database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT stock FROM sentimentResult")
-        stocks = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with sentiment_db.cursor() as cursor:
+            cursor.execute("SELECT stock FROM latest_sentiment")
+            stocks = [row[0] for row in cursor.fetchall()]
         return jsonify({"stocks": stocks})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -246,45 +256,31 @@ def get_sentiment():
     stock = request.args.get('stock', None)
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        if stock:
-            # Get latest sentiment for a specific stock
-            query = """
-            SELECT datetime, stock, marketSentiment 
-            FROM sentimentResult 
-            WHERE stock = ? 
-            ORDER BY datetime DESC 
-            LIMIT 1
-            """
-            cursor.execute(query, (stock,))
-        else:
-            # Get latest sentiment for each stock
-            query = """
-            WITH ranked AS (
-                SELECT 
-                    datetime, 
-                    stock, 
-                    marketSentiment,
-                    ROW_NUMBER() OVER (PARTITION BY stock ORDER BY datetime DESC) as rn
-                FROM sentimentResult
-            )
-            SELECT datetime, stock, marketSentiment 
-            FROM ranked 
-            WHERE rn = 1
-            """
-            cursor.execute(query)
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "datetime": row[0],
-                "stock": row[1],
-                "sentiment": row[2]
-            })
+        with sentiment_db.cursor() as cursor:
+            if stock:
+                # Get latest sentiment for a specific stock
+                query = """
+                SELECT datetime, stock, marketSentiment 
+                FROM latest_sentiment 
+                WHERE stock = ?
+                """
+                cursor.execute(query, (stock,))
+            else:
+                # Get latest sentiment for each stock
+                query = """
+                SELECT datetime, stock, marketSentiment 
+                FROM latest_sentiment
+                """
+                cursor.execute(query)
+        
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "datetime": row[0],
+                    "stock": row[1],
+                    "sentiment": row[2]
+                })
         
-        conn.close()
         return jsonify({"data": results})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -302,9 +298,8 @@ def get_stock_data(stock_symbol):
             # If not in our predefined map, try the standard NSE format
             ticker_symbol = f"{stock_symbol.upper()}.NS"
         
-        # Fetch data from Yahoo Finance
-        stock = yf.Ticker(ticker_symbol)
-        hist = stock.history(period=period)
+        # Fetch data from Yahoo Finance (cached)
+        hist = stock_cache.get_history(ticker_symbol, period)
         
         if hist.empty:
             return jsonify({"error": f"No data found for {stock_symbol}. Please check if the symbol is correct or the stock is listed on NSE."}), 404
@@ -321,9 +316,10 @@ def get_stock_data(stock_symbol):
                 "volume": int(row['Volume']) if pd.notna(row['Volume']) else 0
             })
         
-        # Get current stock info
-        info = stock.info
-        current_price = info.get('currentPrice', hist['Close'].iloc[-1])
+        # The price comes from the latest bar so it always matches the data;
+        # fresh cached info from /api/stock-info only supplies the currency
+        info = stock_cache.peek_info(ticker_symbol) or {}
+        current_price = hist['Close'].iloc[-1]
         
         return jsonify({
             "symbol": stock_symbol,
@@ -346,9 +342,8 @@ def get_stock_info(stock_symbol):
             # If not in our predefined map, try the standard NSE format
             ticker_symbol = f"{stock_symbol.upper()}.NS"
         
-        # Fetch basic info from Yahoo Finance
-        stock = yf.Ticker(ticker_symbol)
-        info = stock.info
+        # Fetch basic info from Yahoo Finance (cached)
+        info = stock_cache.get_info(ticker_symbol)
         
         # Check if we got valid data
         if not info or 'symbol' not in info:
@@ -842,10 +837,9 @@ def get_fundamental_summary():
         summary_data = []
         
         # Load profitability data to get list of companies
-        profitability_file = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/profitability/profitability_ratios.json"
+        profitability_file = os.path.join(FUNDAMENTAL_OUTPUTS_DIR, "profitability/profitability_ratios.json")
         if os.path.exists(profitability_file):
-            with open(profitability_file, 'r') as f:
-                profitability_data = json.load(f)
+            profitability_data = fundamental_store.records("profitability/profitability_ratios.json")
             
             for item in profitability_data[:20]:  # Limit to first 20 for demo
                 try:
@@ -867,11 +861,11 @@ def get_fundamental_summary():
                         "sector": item['sector'],
                         "company_name": item['company_name']
                     }
-                summary_data.append(key_metrics)
-                
-            except Exception as e:
+                    summary_data.append(key_metrics)
+                    
+                except Exception as e:
                     print(f"Error processing {symbol}: {e}")
-                continue
+                    continue
         
         return jsonify({
             "summary": summary_data,
@@ -883,34 +877,71 @@ def get_fundamental_summary():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+JOBS_DB_PATH = "/home/tarun/MarketSentimentAnalysis/db/jobs.db"
+JOB_LOG_DIR = "/home/tarun/MarketSentimentAnalysis/db/job_logs"
+
+# Background jobs; one analysis runs at a time
+job_queue = JobQueue(JOBS_DB_PATH, JOB_LOG_DIR, max_workers=1)
+
 @app.route('/api/run-fundamental-analysis', methods=['POST'])
 def run_fundamental_analysis():
-    """Trigger fundamental analysis computation"""
+    """Queue a fundamental analysis run and return its job id right away"""
     try:
-        # This would trigger the Python scripts to run analysis
-        import subprocess
-        
-        result = subprocess.run([
-            'python', '/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/run_all_indicators.py',
-            '--output-format', 'json'
-        ], capture_output=True, text=True, cwd='/home/tarun/MarketSentimentAnalysis')
+        # Only companies whose financial data changed since the last run are
+        # recomputed (see FundamentalAnalysis/outputs/manifest.json). The script
+        # reads ../financial_reports/data and writes outputs/ relative to its cwd.
+        # A trigger while a run is queued or running joins that run.
+        job, created = job_queue.submit(
+            'fundamental_analysis',
+            ['python', '/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/run_all_indicators.py',
+             '--incremental', '--progress'],
+            cwd='/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis',
+            dedup_key='fundamental_analysis'
+        )
         
-        if result.returncode == 0:
-            return jsonify({
-                "status": "success",
-                "message": "Fundamental analysis completed successfully",
-                "output": result.stdout
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "Analysis failed",
-                "error": result.stderr
-            }), 500
+        return jsonify({
+            "status": job['status'],
+            "message": "Fundamental analysis queued" if created else "Fundamental analysis already in progress",
+            "job_id": job['job_id'],
+            "deduplicated": not created,
+            "status_url": f"/api/jobs/{job['job_id']}",
+            "cancel_url": f"/api/jobs/{job['job_id']}/cancel"
+        }), 202
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent background jobs, newest first"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        return jsonify({"jobs": job_queue.list(limit)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Status, per-indicator/per-symbol progress and output tail of a job"""
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Job not found: {job_id}"}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    try:
+        job = job_queue.cancel(job_id)
+        if job is None:
+            return jsonify({"error": f"Job not found: {job_id}"}), 404
+        return jsonify(job)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/sector-analysis/<sector_name>', methods=['GET'])
 def get_sector_analysis(sector_name):
     """Get sector-wise fundamental analysis"""
@@ -1038,17 +1069,56 @@ def get_fundamental_scores(stock_symbol):
         print(f"Error calculating fundamental scores for {stock_symbol}: {e}")
         return jsonify({"error": f"Failed to calculate fundamental scores: {str(e)}"}), 500
 
+FUNDAMENTAL_OUTPUTS_DIR = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs"
+
+class FundamentalOutputStore:
+    """Process-wide, symbol-keyed cache of the FundamentalAnalysis output files.
+
+    Each outputs/*/*.json file is parsed once and indexed by symbol. A file is
+    only re-read when its mtime changes, so per-request lookups are dict hits.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self._files = {}  # relative path -> (mtime_ns, records, {symbol: record})
+        self._lock = threading.Lock()
+
+    def _load(self, relative_path):
+        file_path = os.path.join(self.base_dir, relative_path)
+        mtime = os.stat(file_path).st_mtime_ns
+        entry = self._files.get(relative_path)
+        if entry is not None and entry[0] == mtime:
+            return entry
+
+        with self._lock:
+            entry = self._files.get(relative_path)
+            if entry is None or entry[0] != mtime:
+                with open(file_path, 'r') as f:
+                    records = json.load(f)
+                index = {}
+                for item in records:
+                    # Keep the first match, like the linear scan it replaces
+                    index.setdefault(item.get('symbol'), item)
+                entry = (mtime, records, index)
+                self._files[relative_path] = entry
+        return entry
+
+    def get(self, relative_path, symbol):
+        """Return the record for symbol in the given output file, or None"""
+        return self._load(relative_path)[2].get(symbol)
+
+    def records(self, relative_path):
+        """Return all records of the given output file in file order"""
+        return self._load(relative_path)[1]
+
+fundamental_store = FundamentalOutputStore(FUNDAMENTAL_OUTPUTS_DIR)
+
 def load_profitability_data(symbol):
     """Load profitability data for a specific symbol"""
     try:
-        file_path = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/profitability/profitability_ratios.json"
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find the data for the specific symbol
-        for item in data:
-            if item.get('symbol') == symbol:
-                return item
+        item = fundamental_store.get("profitability/profitability_ratios.json", symbol)
+        if item:
+            return item
         
         # If symbol not found, raise error
         raise ValueError(f"Profitability data not found for symbol: {symbol}")
@@ -1059,14 +1129,9 @@ def load_profitability_data(symbol):
 def load_valuation_data(symbol):
     """Load valuation data for a specific symbol"""
     try:
-        file_path = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/valuation/basic_valuation_ratios.json"
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find the data for the specific symbol
-        for item in data:
-            if item.get('symbol') == symbol:
-                return item
+        item = fundamental_store.get("valuation/basic_valuation_ratios.json", symbol)
+        if item:
+            return item
         
         # If symbol not found, raise error
         raise ValueError(f"Valuation data not found for symbol: {symbol}")
@@ -1078,27 +1143,22 @@ def load_growth_data(symbol):
     """Load growth data for a specific symbol"""
     try:
         # Try revenue growth first
-        file_path = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/growth/revenue_growth.json"
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find the data for the specific symbol
-        for item in data:
-            if item.get('symbol') == symbol:
-                # Map the actual fields to expected frontend fields
-                return {
-                    'symbol': item['symbol'],
-                    'company_name': item['company_name'],
-                    'sector': item['sector'],
-                    'revenue_growth_percent': item['revenue_cagr_percent'],
-                    'earnings_growth_percent': item['recent_avg_growth_percent'],
-                    'asset_growth_percent': item['latest_yoy_growth_percent'],
-                    'equity_growth_percent': item['revenue_cagr_percent'] * 0.8,
-                    'revenue_volatility': item['revenue_volatility'],
-                    'periods_analyzed': item['periods_analyzed'],
-                    'first_revenue': item['first_revenue'],
-                    'latest_revenue': item['latest_revenue']
-                }
+        item = fundamental_store.get("growth/revenue_growth.json", symbol)
+        if item:
+            # Map the actual fields to expected frontend fields
+            return {
+                'symbol': item['symbol'],
+                'company_name': item['company_name'],
+                'sector': item['sector'],
+                'revenue_growth_percent': item['revenue_cagr_percent'],
+                'earnings_growth_percent': item['recent_avg_growth_percent'],
+                'asset_growth_percent': item['latest_yoy_growth_percent'],
+                'equity_growth_percent': item['revenue_cagr_percent'] * 0.8,
+                'revenue_volatility': item['revenue_volatility'],
+                'periods_analyzed': item['periods_analyzed'],
+                'first_revenue': item['first_revenue'],
+                'latest_revenue': item['latest_revenue']
+            }
         
         # If symbol not found, raise error
         raise ValueError(f"Growth data not found for symbol: {symbol}")
@@ -1110,31 +1170,14 @@ def load_liquidity_data(symbol):
     """Load liquidity data for a specific symbol"""
     try:
         # Load basic liquidity ratios
-        file_path = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/liquidity/basic_liquidity_ratios.json"
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find the data for the specific symbol
-        liquidity_data = None
-        for item in data:
-            if item.get('symbol') == symbol:
-                liquidity_data = item
-                break
+        liquidity_data = fundamental_store.get("liquidity/basic_liquidity_ratios.json", symbol)
         
         if not liquidity_data:
             raise ValueError(f"Liquidity data not found for symbol: {symbol}")
         
         # Load cash conversion cycle data
-        ccc_file_path = "/home/tarun/MarketSentimentAnalysis/FundamentalAnalysis/outputs/liquidity/cash_conversion_cycle.json"
-        ccc_data = None
         try:
-            with open(ccc_file_path, 'r') as f:
-                ccc_list = json.load(f)
-            
-            for item in ccc_list:
-                if item.get('symbol') == symbol:
-                    ccc_data = item
-                    break
+            ccc_data = fundamental_store.get("liquidity/cash_conversion_cycle.json", symbol)
         except Exception as e:
             print(f"Error loading cash conversion cycle data: {e}")
             raise ValueError(f"Cash conversion cycle data not found for symbol: {symbol}")
@@ -1389,24 +1432,19 @@ def signup():
         # Hash password
         password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
         
-        conn = sqlite3.connect(AUTH_DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if user already exists
-        cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'User already exists'}), 409
-        
-        # Create new user
-        cursor.execute('''
-            INSERT INTO users (name, email, password_hash)
-            VALUES (?, ?, ?)
-        ''', (name, email, password_hash))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with auth_db.cursor() as cursor:
+            # Check if user already exists
+            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
+            if cursor.fetchone():
+                return jsonify({'error': 'User already exists'}), 409
+            
+            # Create new user
+            cursor.execute('''
+                INSERT INTO users (name, email, password_hash)
+                VALUES (?, ?, ?)
+            ''', (name, email, password_hash))
+            
+            user_id = cursor.lastrowid
         
         # Generate token
         token = generate_token(user_id, email)
@@ -1434,13 +1472,10 @@ def signin():
         if not all([email, password]):
             return jsonify({'error': 'Email and password are required'}), 400
         
-        conn = sqlite3.connect(AUTH_DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get user by email
-        cursor.execute('SELECT id, name, email, password_hash FROM users WHERE email = ?', (email,))
-        user = cursor.fetchone()
-        conn.close()
+        with auth_db.cursor() as cursor:
+            # Get user by email
+            cursor.execute('SELECT id, name, email, password_hash FROM users WHERE email = ?', (email,))
+            user = cursor.fetchone()
         
         if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
@@ -1533,29 +1568,23 @@ def google_auth_callback():
         email = user_info.get('email')
         name = user_info.get('name')
         
-        conn = sqlite3.connect(AUTH_DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if user exists
-        cursor.execute('SELECT id, name, email FROM users WHERE google_id = ? OR email = ?', (google_id, email))
-        user = cursor.fetchone()
-        
-        if user:
-            # User exists, update google_id if needed
-            user_id, user_name, user_email = user
-            if not user.get('google_id'):
-                cursor.execute('UPDATE users SET google_id = ? WHERE id = ?', (google_id, user_id))
-                conn.commit()
-        else:
-            # Create new user
-            cursor.execute('''
-                INSERT INTO users (name, email, google_id)
-                VALUES (?, ?, ?)
-            ''', (name, email, google_id))
-            user_id = cursor.lastrowid
-            conn.commit()
-        
-        conn.close()
+        with auth_db.cursor() as cursor:
+            # Check if user exists
+            cursor.execute('SELECT id, name, email, google_id FROM users WHERE google_id = ? OR email = ?', (google_id, email))
+            user = cursor.fetchone()
+            
+            if user:
+                # User exists, update google_id if needed
+                user_id, user_name, user_email, user_google_id = user
+                if not user_google_id:
+                    cursor.execute('UPDATE users SET google_id = ? WHERE id = ?', (google_id, user_id))
+            else:
+                # Create new user
+                cursor.execute('''
+                    INSERT INTO users (name, email, google_id)
+                    VALUES (?, ?, ?)
+                ''', (name, email, google_id))
+                user_id = cursor.lastrowid
         
         # Generate token
         token = generate_token(user_id, email)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingest
+Shared executemany loader for the cron scripts: one INSERT ... ON CONFLICT DO NOTHING
+batch inside a single transaction, with inserted/skipped counts
+"""
+
+
+def bulk_insert(conn, table, columns, rows):
+    """
+    Insert rows, skipping any that collide with an existing key.
+
+    Runs inside the caller's transaction. Returns (inserted, skipped).
+    """
+    rows = list(rows)
+    placeholders = ", ".join("?" for _ in columns)
+    before = conn.total_changes
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) ON CONFLICT DO NOTHING",
+        rows
+    )
+    inserted = conn.total_changes - before
+    return inserted, len(rows) - inserted
+
+
+def ingest(conn, table, columns, rows, follow_up=()):
+    """
+    bulk_insert plus optional (sql, params_list) follow-up statements, all
+    committed as one transaction, so the run pays for a single fsync.
+
+    Returns (inserted, skipped).
+    """
+    with conn:
+        inserted, skipped = bulk_insert(conn, table, columns, rows)
+        for sql, params in follow_up:
+            conn.executemany(sql, params)
+    print(f"✅ {table}: {inserted} row(s) inserted, {skipped} duplicate(s) skipped")
+    return inserted, skipped
@@ -1,7 +1,12 @@
 import sqlite3
+import sys
+import os
 from datetime import datetime
 import json
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bulk_ingest import ingest
+
 with open('/home/tarun/MarketSentimentAnalysis/news.json', 'r') as f:
     data = json.load(f)
 
@@ -25,31 +30,22 @@ CREATE TABLE IF NOT EXISTS news (
 ''')
 
 # Prepare data for insertion
+rows = []
 for stock, articles in data.items():
-    rows = []
+    if not isinstance(articles, list):
+        # temp.py stores a message string when a symbol has no news
+        print(f"No articles for {stock}")
+        continue
     for article in articles:
-        dt_obj = datetime.strptime(article["published date"], '%a, %d %b %Y %H:%M:%S %Z')
-        dt_iso = dt_obj.isoformat()
-        row = (dt_iso,stock,article["description"],article["url"] )
-        # rows.append(row)
         try:
-            cursor.execute('INSERT INTO news (datetime, stock, description, source_link) VALUES (?, ?, ?, ?)', row)
-            conn.commit()
-        except sqlite3.IntegrityError as e:
-            print("Integrity error:", e)
-# Insert data (if duplicate primary key, will raise error)
-# try:
-#     cursor.executemany('INSERT INTO news (datetime, stock, description, source_link) VALUES (?, ?, ?, ?)', rows)
-#     conn.commit()
-# except sqlite3.IntegrityError as e:
-    # print("Integrity error:", e)
-# print(rows)
-# print('-'*100)
-# Query to check data
-cursor.execute('SELECT * FROM news ORDER BY datetime DESC ')
-values = cursor.fetchall()
-for row in values:
-    print(row)
+            dt_obj = datetime.strptime(article["published date"], '%a, %d %b %Y %H:%M:%S %Z')
+        except (KeyError, ValueError) as e:
+            print(f"Skipping article for {stock} with bad date: {e}")
+            continue
+        dt_iso = dt_obj.isoformat()
+        rows.append((dt_iso, stock, article["description"], article["url"]))
 
-conn.close()
+# Insert everything in one transaction; duplicate (stock, datetime) keys are skipped
+ingest(conn, 'news', ('datetime', 'stock', 'description', 'source_link'), rows)
 
+conn.close()
@@ -2,18 +2,224 @@
 """
 Financial Data Database Module
 Creates and manages SQLite database for financial data
-Imports data from JSON files created by fetch_financial_data.py
+Imports data from the snapshot/JSON files created by fetch_financial_data.py
 """
 
 import os
+import sys
 import json
 import sqlite3
 import logging
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import groupby, islice, repeat
+from operator import itemgetter
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from financial_snapshot import (
+    JSON_SUFFIX, SNAPSHOT_SUFFIX, action_rows, company_files, format_currency, load_snapshot_arrays,
+    price_columns, snapshot_statement_columns, statement_rows
+)
+from price_history import CANONICAL_PERIOD, canonical_bars, period_start
+
 logger = logging.getLogger(__name__)
 
+# Rows buffered per table before each executemany during imports
+IMPORT_CHUNK_ROWS = 5000
+
+# (period type, statement) in the data files -> statement table
+STATEMENT_TABLES = {
+    ('annual', 'income_statement'): 'annual_income_statements',
+    ('annual', 'balance_sheet'): 'annual_balance_sheets',
+    ('annual', 'cash_flow'): 'annual_cash_flows',
+    ('quarterly', 'income_statement'): 'quarterly_income_statements',
+    ('quarterly', 'balance_sheet'): 'quarterly_balance_sheets',
+    ('quarterly', 'cash_flow'): 'quarterly_cash_flows',
+}
+
+# Columns written by the importer for each table with one row per data file item
+IMPORT_COLUMNS = {
+    **{table: ('symbol', 'period_date', 'field_name', 'value', 'formatted_value')
+       for table in STATEMENT_TABLES.values()},
+    'historical_prices': ('symbol', 'date', 'period_type', 'open_price', 'high_price', 'low_price',
+                          'close_price', 'volume'),
+    'dividends': ('symbol', 'date', 'amount', 'formatted_amount'),
+    'stock_splits': ('symbol', 'date', 'ratio', 'formatted_ratio'),
+    'earnings': ('symbol', 'year', 'revenue', 'earnings', 'revenue_formatted', 'earnings_formatted'),
+}
+
+# Natural key of each of those tables, enforced by a unique index (see create_natural_key)
+NATURAL_KEYS = {
+    **{table: ('symbol', 'period_date', 'field_name') for table in STATEMENT_TABLES.values()},
+    'historical_prices': ('symbol', 'date'),
+    'dividends': ('symbol', 'date'),
+    'stock_splits': ('symbol', 'date'),
+    'earnings': ('symbol', 'year'),
+}
+
+
+# Lookup index on every statement table, for per-symbol, per-field queries
+QUERY_INDEXES = {table: ('symbol', 'field_name', 'period_date') for table in STATEMENT_TABLES.values()}
+
+# Key statement fields pivoted into statement_summary: column -> (statement, field_name)
+SUMMARY_FIELDS = {
+    'total_revenue': ('income_statement', 'Total Revenue'),
+    'operating_expense': ('income_statement', 'Operating Expense'),
+    'gross_profit': ('income_statement', 'Gross Profit'),
+    'operating_income': ('income_statement', 'Operating Income'),
+    'ebitda': ('income_statement', 'EBITDA'),
+    'net_income': ('income_statement', 'Net Income'),
+    'basic_eps': ('income_statement', 'Basic EPS'),
+    'total_assets': ('balance_sheet', 'Total Assets'),
+    'current_assets': ('balance_sheet', 'Current Assets'),
+    'current_liabilities': ('balance_sheet', 'Current Liabilities'),
+    'total_debt': ('balance_sheet', 'Total Debt'),
+    'stockholders_equity': ('balance_sheet', 'Stockholders Equity'),
+    'cash_and_equivalents': ('balance_sheet', 'Cash And Cash Equivalents'),
+    'operating_cash_flow': ('cash_flow', 'Operating Cash Flow'),
+    'capital_expenditure': ('cash_flow', 'Capital Expenditure'),
+    'free_cash_flow': ('cash_flow', 'Free Cash Flow'),
+}
+
+
+def index_name(table, columns):
+    """Index name from table and columns, e.g. idx_historical_prices_symbol_date"""
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def natural_key_index(table):
+    """Name of a table's natural key index"""
+    return index_name(table, NATURAL_KEYS[table])
+
+
+def insert_sql(table, upsert=True):
+    """
+    INSERT for a table's IMPORT_COLUMNS. upsert=True updates the row with
+    the same natural key instead of adding another one, so importing the
+    same data again leaves the table unchanged.
+    """
+    columns = IMPORT_COLUMNS[table]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if upsert:
+        key = NATURAL_KEYS[table]
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns if column not in key)
+        sql += f" ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
+    return sql
+
+
+def statement_value(value):
+    """Statement values as stored: numbers, with non-numeric text stored as NULL"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+
+def document_rows(data):
+    """
+    (table, rows) groups for the statements, prices, corporate actions and
+    earnings of a loaded document
+    """
+    symbol = data['symbol']
+    financial_statements = data.get('financial_statements', {})
+    for (period_type, statement_type), table in STATEMENT_TABLES.items():
+        statements = financial_statements.get(period_type, {}).get(statement_type, {})
+        yield table, (
+            (symbol, period_date, field_name, statement_value(field_data.get('value')), field_data.get('formatted'))
+            for period_date, period_data in statements.items()
+            for field_name, field_data in period_data.items()
+            if isinstance(field_data, dict)
+        )
+
+    yield 'historical_prices', (
+        (symbol, date, CANONICAL_PERIOD, bar.get('open'), bar.get('high'), bar.get('low'), bar.get('close'), bar.get('volume'))
+        for date, bar in canonical_bars(data.get('historical_prices', {})).items()
+    )
+
+    corporate_actions = data.get('corporate_actions', {})
+    yield 'dividends', (
+        (symbol, date, div_info.get('amount'), div_info.get('formatted')) if isinstance(div_info, dict)
+        else (symbol, date, div_info, str(div_info))
+        for date, div_info in corporate_actions.get('dividends', {}).items()
+    )
+    yield 'stock_splits', (
+        (symbol, date, split_info.get('ratio'), split_info.get('formatted')) if isinstance(split_info, dict)
+        else (symbol, date, split_info, str(split_info))
+        for date, split_info in corporate_actions.get('splits', {}).items()
+    )
+
+    yield earnings_rows(symbol, data.get('earnings') or {})
+
+
+def earnings_rows(symbol, earnings_data):
+    """(table, rows) group for a document's earnings section"""
+    return 'earnings', (
+        (symbol, int(year), earnings_info.get('revenue'), earnings_info.get('earnings'),
+         earnings_info.get('revenue_formatted'), earnings_info.get('earnings_formatted'))
+        for year, earnings_info in earnings_data.items()
+    )
+
+
+def snapshot_rows(symbol, layout, arrays):
+    """
+    Same groups as document_rows, read straight from a snapshot's arrays
+    (nothing is decoded into dicts first; price rows are zipped from the
+    columns)
+    """
+    columns = snapshot_statement_columns(layout, arrays)
+    if columns is not None:
+        for (period_type, statement_type), items in groupby(statement_rows(columns), key=itemgetter(0, 1)):
+            table = STATEMENT_TABLES.get((period_type, statement_type))
+            if table is None:
+                continue
+            yield table, (
+                (symbol, period_date, field_name, statement_value(text), text) if text is not None
+                else (symbol, period_date, field_name, value, format_currency(value))
+                for _, _, period_date, field_name, value, text in items
+            )
+
+    # Like canonical_bars: the 'max' series, or every legacy period in order with later bars winning
+    periods = layout.get('historical_prices', [])
+    indexes = [periods.index(CANONICAL_PERIOD)] if CANONICAL_PERIOD in periods else range(len(periods))
+    for i in indexes:
+        dates, *columns = price_columns(arrays, i)
+        yield 'historical_prices', zip(repeat(symbol), dates, repeat(CANONICAL_PERIOD), *columns)
+
+    for kind in layout.get('corporate_actions', []):
+        if kind == 'dividends':
+            yield 'dividends', ((symbol, date, amount, format_currency(amount))
+                                for date, amount in action_rows(arrays, kind))
+        elif kind == 'splits':
+            yield 'stock_splits', ((symbol, date, ratio, f"1:{ratio}")
+                                   for date, ratio in action_rows(arrays, kind))
+
+
+def company_rows(path):
+    """
+    (data, groups) for a snapshot or JSON company file: data is the document
+    without its columnar sections, groups yields (table, rows) for its
+    statements, prices, corporate actions and earnings. Snapshots are
+    streamed from their arrays; JSON files are loaded one at a time.
+    """
+    path = Path(path)
+    if path.suffix != '.npz':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data, (document_rows(data) if data.get('symbol') else iter(()))
+
+    data, layout, arrays = load_snapshot_arrays(path)
+    if not data.get('symbol'):
+        return data, iter(())
+
+    def groups():
+        yield from snapshot_rows(data['symbol'], layout, arrays)
+        yield earnings_rows(data['symbol'], data.get('earnings') or {})
+    return data, groups()
+
+
 class FinancialDatabase:
     def __init__(self, db_path='financial_reports/financial_data.db'):
         """Initialize database connection and create tables"""
@@ -247,13 +453,175 @@ class FinancialDatabase:
                 )
             ''')
             
+            # Key statement fields, one row per (symbol, period); maintained by refresh_statement_summary
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS statement_summary (
+                    symbol TEXT,
+                    period_type TEXT,
+                    period_date TEXT,
+                    {', '.join(f'{column} REAL' for column in SUMMARY_FIELDS)},
+                    PRIMARY KEY (symbol, period_type, period_date),
+                    FOREIGN KEY (symbol) REFERENCES companies (symbol)
+                )
+            ''')
+            
+            removed = self.create_indexes(cursor)
+            
+            # Databases created before the summary table: build it once
+            cursor.execute('SELECT 1 FROM statement_summary LIMIT 1')
+            if cursor.fetchone() is None:
+                self.refresh_statement_summary()
+            
             self.conn.commit()
+            if removed:
+                # One-time migration removed duplicate rows; give their space back
+                self.conn.execute("VACUUM")
             logger.info("All database tables created successfully")
             
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
             raise
     
+    def create_natural_key(self, cursor, table):
+        """
+        Unique index on a table's natural key (NATURAL_KEYS), so its rows can
+        be upserted. Databases created before the keys hold a copy of every
+        row per import run (and historical_prices one per period: 'max',
+        '5y', ...); if the key cannot be built, duplicates are removed first,
+        keeping the newest row. This is the one-time migration for old
+        databases, and how bulk_load rebuilds keys it dropped. Returns the
+        number of rows removed.
+        """
+        index = natural_key_index(table)
+        if self.has_index(cursor, index):
+            return 0
+        key = ', '.join(NATURAL_KEYS[table])
+        create_index = f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({key})"
+        try:
+            cursor.execute(create_index)
+            return 0
+        except sqlite3.IntegrityError:
+            pass
+        cursor.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {key})")
+        removed = cursor.rowcount
+        logger.info(f"Removed {removed} duplicate {table} rows")
+        cursor.execute(create_index)
+        return removed
+    
+    def create_indexes(self, cursor):
+        """
+        Create the natural key and query indexes (see bulk_load for when they
+        are dropped). Returns the number of duplicate rows removed.
+        """
+        removed = sum(self.create_natural_key(cursor, table) for table in NATURAL_KEYS)
+        for table, columns in QUERY_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name(table, columns)} ON {table} ({', '.join(columns)})")
+        return removed
+    
+    def table_indexes(self, table):
+        """Names of the indexes create_indexes builds on a table"""
+        indexes = [natural_key_index(table)] if table in NATURAL_KEYS else []
+        if table in QUERY_INDEXES:
+            indexes.append(index_name(table, QUERY_INDEXES[table]))
+        return indexes
+    
+    def has_index(self, cursor, index):
+        """Whether an index exists"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,))
+        return cursor.fetchone() is not None
+    
+    @contextmanager
+    def bulk_load(self):
+        """
+        Settings for a bulk import: no fsync and an in-memory rollback journal
+        (an interrupted import can be rerun from the data files). Indexes of
+        tables that are still empty are dropped for the load and built once
+        from the loaded rows afterwards, instead of being maintained per row;
+        those tables get plain inserts (see insert_rows). Tables that already
+        hold data keep their indexes and are upserted.
+        """
+        cursor = self.conn.cursor()
+        journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+        synchronous = cursor.execute('PRAGMA synchronous').fetchone()[0]
+        cursor.execute('PRAGMA journal_mode = MEMORY')
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        for table in IMPORT_COLUMNS:
+            if cursor.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None:
+                for index in self.table_indexes(table):
+                    cursor.execute(f"DROP INDEX IF EXISTS {index}")
+        self.conn.commit()
+        try:
+            yield
+        finally:
+            self.conn.rollback()
+            start = datetime.now()
+            self.create_indexes(cursor)
+            self.conn.commit()
+            logger.info(f"Built indexes in {(datetime.now() - start).total_seconds():.1f}s")
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+    
+    def insert_rows(self, groups):
+        """
+        Write (table, rows) groups with one executemany per IMPORT_CHUNK_ROWS
+        rows, so memory stays bounded however many rows come in. Rows are
+        upserted by natural key, or plainly inserted while bulk_load has the
+        table's key dropped. Returns the number of rows written.
+        """
+        cursor = self.conn.cursor()
+        sql = {}
+        written = 0
+        for table, table_rows in groups:
+            if table not in sql:
+                sql[table] = insert_sql(table, upsert=self.has_index(cursor, natural_key_index(table)))
+            table_rows = iter(table_rows)
+            while True:
+                chunk = list(islice(table_rows, IMPORT_CHUNK_ROWS))
+                if not chunk:
+                    break
+                cursor.executemany(sql[table], chunk)
+                written += len(chunk)
+        return written
+    
+    def refresh_statement_summary(self, symbol=None):
+        """
+        Rebuild the statement_summary rows of one symbol (all symbols when
+        None) from the statement tables: one row per (symbol, period type,
+        period) with the SUMMARY_FIELDS as columns. Per symbol, the statement
+        rows are found through the (symbol, field_name, period_date) indexes.
+        """
+        cursor = self.conn.cursor()
+        symbol_filter = 'symbol = ? AND ' if symbol else ''
+        symbol_params = [symbol] if symbol else []
+        if symbol:
+            cursor.execute('DELETE FROM statement_summary WHERE symbol = ?', (symbol,))
+        else:
+            cursor.execute('DELETE FROM statement_summary')
+        
+        columns = ', '.join(SUMMARY_FIELDS)
+        pivot = ', '.join(
+            'MAX(CASE WHEN statement_type = ? AND field_name = ? THEN value END)' for _ in SUMMARY_FIELDS
+        )
+        pivot_params = [value for key in SUMMARY_FIELDS.values() for value in key]
+        for period_type in ('annual', 'quarterly'):
+            parts = []
+            part_params = []
+            for statement_type in ('income_statement', 'balance_sheet', 'cash_flow'):
+                fields = [field for statement, field in SUMMARY_FIELDS.values() if statement == statement_type]
+                parts.append(f'''
+                    SELECT ? AS statement_type, symbol, period_date, field_name, value
+                    FROM {STATEMENT_TABLES[(period_type, statement_type)]}
+                    WHERE {symbol_filter}field_name IN ({', '.join('?' * len(fields))})
+                ''')
+                part_params += [statement_type] + symbol_params + fields
+            cursor.execute(f'''
+                INSERT INTO statement_summary (symbol, period_type, period_date, {columns})
+                SELECT symbol, ?, period_date, {pivot}
+                FROM ({' UNION ALL '.join(parts)})
+                GROUP BY symbol, period_date
+            ''', [period_type] + pivot_params + part_params)
+    
     def import_company_data(self, data):
         """Import company basic information"""
         try:
@@ -296,97 +664,27 @@ class FinancialDatabase:
         except Exception as e:
             logger.error(f"Error importing company data for {data.get('symbol', 'unknown')}: {e}")
     
-    def import_financial_statements(self, symbol, statements, statement_type):
-        """Import financial statements (income, balance, cashflow)"""
-        try:
-            cursor = self.conn.cursor()
-            
-            for period_date, period_data in statements.items():
-                for field_name, field_data in period_data.items():
-                    if isinstance(field_data, dict):
-                        value = field_data.get('value')
-                        formatted_value = field_data.get('formatted')
-                        
-                        # Convert string values to float if possible
-                        if isinstance(value, str):
-                            try:
-                                value = float(value)
-                            except:
-                                value = None
-                        
-                        cursor.execute(f'''
-                            INSERT INTO {statement_type}
-                            (symbol, period_date, field_name, value, formatted_value)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (symbol, period_date, field_name, value, formatted_value))
-                        
-        except Exception as e:
-            logger.error(f"Error importing {statement_type} for {symbol}: {e}")
-    
-    def import_historical_prices(self, symbol, price_data):
-        """Import historical price data"""
-        try:
-            cursor = self.conn.cursor()
-            
-            for period_type, period_data in price_data.items():
-                for date, daily_data in period_data.items():
-                    cursor.execute('''
-                        INSERT INTO historical_prices
-                        (symbol, date, period_type, open_price, high_price, low_price, close_price, volume)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        symbol, date, period_type,
-                        daily_data.get('open'),
-                        daily_data.get('high'),
-                        daily_data.get('low'),
-                        daily_data.get('close'),
-                        daily_data.get('volume')
-                    ))
-                    
-        except Exception as e:
-            logger.error(f"Error importing historical prices for {symbol}: {e}")
-    
-    def import_dividends(self, symbol, dividend_data):
-        """Import dividend data"""
-        try:
-            cursor = self.conn.cursor()
-            
-            for date, div_info in dividend_data.items():
-                if isinstance(div_info, dict):
-                    amount = div_info.get('amount')
-                    formatted = div_info.get('formatted')
-                else:
-                    amount = div_info
-                    formatted = str(div_info)
-                
-                cursor.execute('''
-                    INSERT INTO dividends (symbol, date, amount, formatted_amount)
-                    VALUES (?, ?, ?, ?)
-                ''', (symbol, date, amount, formatted))
-                
-        except Exception as e:
-            logger.error(f"Error importing dividends for {symbol}: {e}")
-    
-    def import_stock_splits(self, symbol, split_data):
-        """Import stock split data"""
-        try:
-            cursor = self.conn.cursor()
-            
-            for date, split_info in split_data.items():
-                if isinstance(split_info, dict):
-                    ratio = split_info.get('ratio')
-                    formatted = split_info.get('formatted')
-                else:
-                    ratio = split_info
-                    formatted = str(split_info)
-                
-                cursor.execute('''
-                    INSERT INTO stock_splits (symbol, date, ratio, formatted_ratio)
-                    VALUES (?, ?, ?, ?)
-                ''', (symbol, date, ratio, formatted))
-                
-        except Exception as e:
-            logger.error(f"Error importing stock splits for {symbol}: {e}")
+    def upsert_historical_prices(self, symbol, bars, replace=False):
+        """
+        Insert or update daily bars ({date: bar}) by their (symbol, date) key,
+        so re-importing the same bars is a no-op. replace=True first drops the
+        symbol's stored bars (after a full, re-adjusted refetch).
+        """
+        cursor = self.conn.cursor()
+        if replace:
+            cursor.execute('DELETE FROM historical_prices WHERE symbol = ?', (symbol,))
+        cursor.executemany(insert_sql('historical_prices'), [
+            (
+                symbol, date, CANONICAL_PERIOD,
+                daily_data.get('open'),
+                daily_data.get('high'),
+                daily_data.get('low'),
+                daily_data.get('close'),
+                daily_data.get('volume')
+            )
+            for date, daily_data in bars.items()
+        ])
+        return len(bars)
     
     def import_valuation_metrics(self, symbol, metrics):
         """Import valuation metrics"""
@@ -439,32 +737,15 @@ class FinancialDatabase:
         except Exception as e:
             logger.error(f"Error importing financial health for {symbol}: {e}")
     
-    def import_earnings(self, symbol, earnings_data):
-        """Import earnings data"""
-        try:
-            cursor = self.conn.cursor()
-            
-            for year, earnings_info in earnings_data.items():
-                cursor.execute('''
-                    INSERT INTO earnings
-                    (symbol, year, revenue, earnings, revenue_formatted, earnings_formatted)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    symbol, int(year),
-                    earnings_info.get('revenue'),
-                    earnings_info.get('earnings'),
-                    earnings_info.get('revenue_formatted'),
-                    earnings_info.get('earnings_formatted')
-                ))
-                
-        except Exception as e:
-            logger.error(f"Error importing earnings for {symbol}: {e}")
-    
-    def import_json_file(self, json_file_path):
-        """Import data from a single JSON file"""
+    def import_json_file(self, json_file_path, refresh_summary=True):
+        """
+        Import data from a single snapshot (.npz) or JSON file, streaming its
+        statement, price and corporate action rows into chunked executemany
+        calls. The file is imported in one transaction: all of it or nothing.
+        refresh_summary=False leaves statement_summary to the caller.
+        """
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data, groups = company_rows(json_file_path)
             
             symbol = data.get('symbol')
             if not symbol:
@@ -477,34 +758,11 @@ class FinancialDatabase:
             
             logger.info(f"Importing data for {symbol}")
             
-            # Import company data
+            # Company first: every other table references it
             self.import_company_data(data)
             
-            # Import financial statements
-            financial_statements = data.get('financial_statements', {})
-            if 'annual' in financial_statements:
-                annual = financial_statements['annual']
-                self.import_financial_statements(symbol, annual.get('income_statement', {}), 'annual_income_statements')
-                self.import_financial_statements(symbol, annual.get('balance_sheet', {}), 'annual_balance_sheets')
-                self.import_financial_statements(symbol, annual.get('cash_flow', {}), 'annual_cash_flows')
-            
-            if 'quarterly' in financial_statements:
-                quarterly = financial_statements['quarterly']
-                self.import_financial_statements(symbol, quarterly.get('income_statement', {}), 'quarterly_income_statements')
-                self.import_financial_statements(symbol, quarterly.get('balance_sheet', {}), 'quarterly_balance_sheets')
-                self.import_financial_statements(symbol, quarterly.get('cash_flow', {}), 'quarterly_cash_flows')
-            
-            # Import historical prices
-            historical_prices = data.get('historical_prices', {})
-            if historical_prices:
-                self.import_historical_prices(symbol, historical_prices)
-            
-            # Import corporate actions
-            corporate_actions = data.get('corporate_actions', {})
-            if 'dividends' in corporate_actions:
-                self.import_dividends(symbol, corporate_actions['dividends'])
-            if 'splits' in corporate_actions:
-                self.import_stock_splits(symbol, corporate_actions['splits'])
+            # Statements, prices, dividends, splits and earnings
+            self.insert_rows(groups)
             
             # Import valuation metrics
             valuation_metrics = data.get('valuation_metrics', {})
@@ -516,41 +774,50 @@ class FinancialDatabase:
             if financial_health:
                 self.import_financial_health(symbol, financial_health)
             
-            # Import earnings
-            earnings = data.get('earnings', {})
-            if earnings:
-                self.import_earnings(symbol, earnings)
+            if refresh_summary:
+                self.refresh_statement_summary(symbol)
             
             self.conn.commit()
             return True
             
         except Exception as e:
+            self.conn.rollback()
             logger.error(f"Error importing JSON file {json_file_path}: {e}")
             return False
     
     def import_all_json_files(self, data_dir='financial_reports/data'):
-        """Import all JSON files from data directory"""
+        """
+        Import all company files from data directory (the newer of snapshot
+        and JSON) as one bulk load: one file in memory at a time, indexes
+        rebuilt and statement_summary refreshed once at the end (see bulk_load)
+        """
         try:
             data_path = Path(data_dir)
             if not data_path.exists():
                 logger.error(f"Data directory not found: {data_dir}")
                 return 0, 0
             
-            json_files = list(data_path.glob("*_financial_data.json"))
+            json_files = [path for path in company_files(data_path).values()
+                          if path.name.endswith((JSON_SUFFIX, SNAPSHOT_SUFFIX))]
             if not json_files:
-                logger.warning(f"No JSON files found in {data_dir}")
+                logger.warning(f"No data files found in {data_dir}")
                 return 0, 0
             
-            logger.info(f"Found {len(json_files)} JSON files to import")
+            logger.info(f"Found {len(json_files)} data files to import")
             
             successful = 0
             failed = 0
             
-            for json_file in json_files:
-                if self.import_json_file(json_file):
-                    successful += 1
-                else:
-                    failed += 1
+            with self.bulk_load():
+                for json_file in json_files:
+                    if self.import_json_file(json_file, refresh_summary=False):
+                        successful += 1
+                    else:
+                        failed += 1
+            
+            # One pass over the statement tables once their indexes are built
+            self.refresh_statement_summary()
+            self.conn.commit()
             
             logger.info(f"Import completed: {successful} successful, {failed} failed")
             return successful, failed
@@ -558,7 +825,39 @@ class FinancialDatabase:
         except Exception as e:
             logger.error(f"Error importing JSON files: {e}")
             return 0, 0
+
+    def get_last_price_dates(self):
+        """{symbol: date of its latest stored bar}"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT symbol, MAX(date) FROM historical_prices GROUP BY symbol')
+        return dict(cursor.fetchall())
     
+    def get_historical_prices(self, symbol, period=CANONICAL_PERIOD):
+        """
+        Daily bars for a period ('max', '5y', '2y', '1y', ...), sliced from the
+        canonical series relative to its latest date
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT MAX(date) FROM historical_prices WHERE symbol = ?', (symbol,))
+            latest = cursor.fetchone()[0]
+            if latest is None:
+                return []
+
+            start = period_start(period, latest) or ''
+            cursor.execute('''
+                SELECT date, open_price, high_price, low_price, close_price, volume
+                FROM historical_prices
+                WHERE symbol = ? AND date >= ?
+                ORDER BY date
+            ''', (symbol, start))
+            columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Error getting {period} prices for {symbol}: {e}")
+            return []
+
     def get_database_stats(self):
         """Get database statistics"""
         try:
@@ -568,7 +867,7 @@ class FinancialDatabase:
                 'companies', 'annual_income_statements', 'quarterly_income_statements',
                 'annual_balance_sheets', 'quarterly_balance_sheets', 'annual_cash_flows',
                 'quarterly_cash_flows', 'historical_prices', 'dividends', 'stock_splits',
-                'valuation_metrics', 'financial_health', 'earnings'
+                'valuation_metrics', 'financial_health', 'earnings', 'statement_summary'
             ]
             
             stats = {}
@@ -10,10 +10,22 @@ import sys
 import csv
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
 import time
 
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import financial_snapshot
+from price_history import CANONICAL_PERIOD, canonical_bars
+from database import FinancialDatabase
+from market_data_provider import RateLimitedTicker, YFinanceProvider
+from rate_limiter import TokenBucket
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,17 +37,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upstream requests per second across all worker threads (info, statements, downloads)
+REQUESTS_PER_SECOND = 2.0
+
+# Per-symbol requests besides price history: info, 6 statements, earnings
+STATEMENT_REQUESTS_PER_SYMBOL = 8
+
+# Incremental batch downloads start this many days before the oldest last stored date
+INCREMENTAL_LOOKBACK_DAYS = 10
+
+# Relative close difference on a re-fetched bar that means the history was re-adjusted
+PRICE_MATCH_TOLERANCE = 1e-6
+
+def date_strings(index):
+    """YYYY-MM-DD strings of a DatetimeIndex in its own (exchange) time zone, without per-element strftime"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return np.datetime_as_string(index.values.astype('datetime64[D]'), unit='D').tolist()
+
 class FinancialDataFetcher:
-    def __init__(self, csv_file_path='stocksList.csv', output_dir='financial_reports/data'):
+    def __init__(self, csv_file_path='stocksList.csv', output_dir='financial_reports/data', output_formats=('npz',),
+                 provider=None, requests_per_second=REQUESTS_PER_SECOND):
         """
         Initialize the financial data fetcher
         
         Args:
             csv_file_path (str): Path to CSV file with stock symbols
-            output_dir (str): Directory to save JSON files
+            output_dir (str): Directory to save data files
+            output_formats (tuple): 'npz' (columnar snapshot) and/or 'json'
+            provider: Market data source (YFinanceProvider by default, FakeProvider offline)
+            requests_per_second (float): Shared token-bucket rate for all upstream requests
         """
         self.csv_file_path = csv_file_path
         self.output_dir = output_dir
+        self.output_formats = tuple(output_formats)
+        self.provider = provider or YFinanceProvider()
+        self.requests_per_second = requests_per_second
+        self.rate_limiter = TokenBucket(requests_per_second)
         self.stocks = []
         
         # Create output directory
@@ -44,6 +82,32 @@ class FinancialDataFetcher:
         logger.info(f"Financial Data Fetcher initialized")
         logger.info(f"CSV file: {csv_file_path}")
         logger.info(f"Output directory: {output_dir}")
+        logger.info(f"Output formats: {', '.join(self.output_formats)}")
+    
+    def get_ticker(self, ticker_symbol):
+        """Provider ticker whose network calls all go through the shared rate limiter"""
+        return RateLimitedTicker(self.provider.ticker(ticker_symbol), self.rate_limiter)
+    
+    def download_price_batch(self, symbols, last_price_dates):
+        """
+        Daily bars for several symbols in one multi-ticker request: full history,
+        or for an incremental batch only the recent bars. Returns {symbol: frame};
+        symbols missing from the result are fetched one by one instead.
+        """
+        ticker_symbols = {f"{symbol}.NS": symbol for symbol in symbols}
+        start = None
+        if all(symbol in last_price_dates for symbol in symbols):
+            oldest = min(last_price_dates[symbol] for symbol in symbols)
+            start = (datetime.fromisoformat(oldest) - timedelta(days=INCREMENTAL_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
+        try:
+            self.rate_limiter.acquire()
+            frames = self.provider.download_history(list(ticker_symbols), period=CANONICAL_PERIOD, start=start)
+        except Exception as e:
+            logger.warning(f"Batch price download failed for {len(symbols)} symbols: {e}")
+            return {}
+        logger.info(f"Downloaded prices for {len(frames)}/{len(symbols)} symbols in one request"
+                    + (f" (since {start})" if start else ""))
+        return {ticker_symbols[ticker_symbol]: frame for ticker_symbol, frame in frames.items()}
     
     def check_venv(self):
         """Check if we're in a virtual environment"""
@@ -77,60 +141,34 @@ class FinancialDataFetcher:
     
     def format_currency(self, value):
         """Format currency values in Indian format (Crores, Lakhs)"""
-        if value is None or value == 0:
-            return "₹0"
-        
-        try:
-            value = float(value)
-            if abs(value) >= 10000000:  # 1 Crore = 10 Million
-                return f"₹{value/10000000:.2f} Cr"
-            elif abs(value) >= 100000:  # 1 Lakh = 100 Thousand
-                return f"₹{value/100000:.2f} L"
-            else:
-                return f"₹{value:,.2f}"
-        except:
-            return str(value)
+        # Shared with the snapshot reader, which rebuilds 'formatted' strings from values
+        return financial_snapshot.format_currency(value)
     
     def clean_financial_dataframe(self, df, statement_name):
-        """Clean and format financial dataframe"""
+        """
+        Convert a statement dataframe (fields x periods) to {period: {field: {'value': ...}}}.
+        Numeric columns are converted whole; 'formatted' strings are only added on JSON export
+        """
         if df is None or df.empty:
             return {}
         
         try:
-            # Convert to dictionary with proper date formatting
+            # Clean the field and period labels once
+            fields = [str(index).replace('\n', ' ').strip() for index in df.index]
+            date_keys = [column.strftime('%Y-%m-%d') if hasattr(column, 'strftime') else str(column) for column in df.columns]
+            
             data = {}
-            for column in df.columns:
-                # Format date as string
-                if hasattr(column, 'strftime'):
-                    date_key = column.strftime('%Y-%m-%d')
+            for position, date_key in enumerate(date_keys):
+                column = df.iloc[:, position]
+                if pd.api.types.is_numeric_dtype(column):
+                    values = column.to_numpy(dtype=float).tolist()
                 else:
-                    date_key = str(column)
-                
-                period_data = {}
-                for index, value in df[column].items():
-                    # Clean the index name
-                    field_name = str(index).replace('\n', ' ').strip()
-                    
-                    # Convert value
-                    if value is not None:
-                        try:
-                            if isinstance(value, (int, float)):
-                                period_data[field_name] = {
-                                    'value': float(value),
-                                    'formatted': self.format_currency(value)
-                                }
-                            else:
-                                period_data[field_name] = {
-                                    'value': str(value),
-                                    'formatted': str(value)
-                                }
-                        except:
-                            period_data[field_name] = {
-                                'value': str(value),
-                                'formatted': str(value)
-                            }
-                
-                data[date_key] = period_data
+                    # Mixed column: numbers as floats, other values as text, None skipped
+                    values = [
+                        value if value is None else float(value) if isinstance(value, (int, float)) else str(value)
+                        for value in column.tolist()
+                    ]
+                data[date_key] = {field: {'value': value} for field, value in zip(fields, values) if value is not None}
             
             return data
             
@@ -138,30 +176,33 @@ class FinancialDataFetcher:
             logger.warning(f"Error cleaning {statement_name} dataframe: {e}")
             return {}
     
-    def get_historical_stock_data(self, ticker, periods=['max', '5y', '2y', '1y']):
-        """Get historical stock price data for multiple periods"""
+    def price_bars(self, hist):
+        """
+        Convert a yfinance history frame to {date: bar}, one column at a time.
+        'formatted' strings are only added on JSON export
+        """
+        if hist.empty:
+            return {}
+        dates = date_strings(hist.index)
+        prices = [hist[column].to_numpy(dtype=float).tolist() for column in ('Open', 'High', 'Low', 'Close')]
+        volumes = hist['Volume'].fillna(0).to_numpy(dtype='int64').tolist()
+        return {
+            date: {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+            for date, open_, high, low, close, volume in zip(dates, *prices, volumes)
+        }
+    
+    def get_historical_stock_data(self, ticker, periods=[CANONICAL_PERIOD]):
+        """
+        Get historical stock price data. Only the full 'max' series is fetched;
+        shorter periods are date-range views of it (see price_history.period_view)
+        """
         historical_data = {}
         
         for period in periods:
             try:
                 hist = ticker.history(period=period)
                 if not hist.empty:
-                    period_data = {}
-                    for date, row in hist.iterrows():
-                        period_data[date.strftime('%Y-%m-%d')] = {
-                            'open': float(row['Open']),
-                            'high': float(row['High']),
-                            'low': float(row['Low']),
-                            'close': float(row['Close']),
-                            'volume': int(row['Volume']) if not pd.isna(row['Volume']) else 0,
-                            'formatted': {
-                                'open': self.format_currency(row['Open']),
-                                'high': self.format_currency(row['High']),
-                                'low': self.format_currency(row['Low']),
-                                'close': self.format_currency(row['Close']),
-                                'volume': f"{int(row['Volume']):,}" if not pd.isna(row['Volume']) else "0"
-                            }
-                        }
+                    period_data = self.price_bars(hist)
                     historical_data[period] = period_data
                     logger.debug(f"Fetched {len(period_data)} price records for period {period}")
             except Exception as e:
@@ -169,17 +210,70 @@ class FinancialDataFetcher:
         
         return historical_data
     
-    def get_complete_financial_data(self, symbol):
-        """Get complete financial data for a single stock"""
+    def get_incremental_price_data(self, symbol, ticker, last_date, hist=None):
+        """
+        Extend the stored price series with the bars from last_date (the last
+        date in historical_prices) on; that bar is fetched again in case it
+        was saved mid-session. hist, if given, is the symbol's frame from an
+        incremental batch download and replaces the per-symbol history call.
+        
+        Returns (historical_prices, corporate_actions) built from the
+        previously saved data file plus the new bars, or None when the series
+        has to be refetched in full: no saved file matching the database, or
+        a new dividend/split or changed close on the bar before last_date
+        (yfinance back-adjusts the whole history for these).
+        """
+        previous_file = financial_snapshot.company_files(self.output_dir).get(symbol)
+        if previous_file is None:
+            return None
+        previous = financial_snapshot.load_company_file(previous_file)
+        stored_bars = canonical_bars(previous.get('historical_prices', {}))
+        dates = sorted(stored_bars)
+        if not dates or dates[-1] != last_date:
+            logger.info(f"{symbol}: saved prices do not end at {last_date}, refetching full history")
+            return None
+        
+        # Start one settled bar earlier, to compare it against the stored one
+        check_date = dates[-2] if len(dates) > 1 else last_date
+        if hist is None:
+            hist = ticker.history(start=check_date)
+        else:
+            hist = hist[np.array(date_strings(hist.index)) >= check_date]
+        bars = self.price_bars(hist)
+        if check_date not in bars or not math.isclose(
+                bars[check_date]['close'], stored_bars[check_date]['close'], rel_tol=PRICE_MATCH_TOLERANCE):
+            logger.info(f"{symbol}: close on {check_date} changed, refetching adjusted history")
+            return None
+        
+        corporate_actions = previous.get('corporate_actions', {})
+        for column, kind in (('Dividends', 'dividends'), ('Stock Splits', 'splits')):
+            if column not in hist.columns:
+                continue
+            known = corporate_actions.get(kind, {})
+            for date, value in hist[column].items():
+                date = date.strftime('%Y-%m-%d')
+                if value != 0 and date > check_date and date not in known:
+                    logger.info(f"{symbol}: new {kind} on {date}, refetching adjusted history")
+                    return None
+        
+        new_bars = {date: bar for date, bar in bars.items() if date >= last_date}
+        stored_bars.update(new_bars)
+        logger.debug(f"Fetched {len(new_bars)} price records for {symbol} since {last_date}")
+        return {CANONICAL_PERIOD: stored_bars}, corporate_actions
+    
+    def get_complete_financial_data(self, symbol, last_price_date=None, history=None):
+        """
+        Get complete financial data for a single stock. With last_price_date
+        (its last date in historical_prices) only the newer price bars are
+        fetched; history is the symbol's frame from a batch download, used
+        instead of per-symbol history, dividend and split requests
+        """
         try:
-            import yfinance as yf
-            import pandas as pd
-            
             logger.info(f"Fetching complete financial data for {symbol} ({symbol}.NS)")
             
             # Create ticker
             ticker_symbol = f"{symbol}.NS"
-            ticker = yf.Ticker(ticker_symbol)
+            ticker = self.get_ticker(ticker_symbol)
             
             # Get basic company info
             try:
@@ -225,6 +319,7 @@ class FinancialDataFetcher:
                     'annual_financial_periods': 0,
                     'quarterly_financial_periods': 0,
                     'historical_price_periods': 0,
+                    'historical_price_records': 0,
                     'dividend_records': 0,
                     'split_records': 0
                 }
@@ -264,39 +359,67 @@ class FinancialDataFetcher:
             except Exception as e:
                 logger.warning(f"Could not fetch financial statements for {symbol}: {e}")
             
-            # Get historical prices
+            # Get historical prices (only the new bars when last_price_date is known)
+            price_update = None
             try:
-                historical_prices = self.get_historical_stock_data(ticker)
+                if last_price_date is not None:
+                    price_update = self.get_incremental_price_data(symbol, ticker, last_price_date, hist=history)
+                if price_update is not None:
+                    historical_prices = price_update[0]
+                    price_refresh = 'incremental'
+                elif history is not None and last_price_date is None:
+                    historical_prices = {CANONICAL_PERIOD: self.price_bars(history)}
+                    price_refresh = 'full'
+                else:
+                    historical_prices = self.get_historical_stock_data(ticker)
+                    price_refresh = 'full'
+                price_records = sum(len(bars) for bars in historical_prices.values())
                 complete_data['historical_prices'] = historical_prices
                 complete_data['data_summary']['historical_price_periods'] = len(historical_prices)
+                complete_data['data_summary']['historical_price_records'] = price_records
+                # Only a fetch that returned bars counts as a refresh (see store_price_update)
+                if price_records:
+                    complete_data['data_summary']['price_refresh'] = price_refresh
             except Exception as e:
                 logger.warning(f"Could not fetch historical prices for {symbol}: {e}")
             
             # Get corporate actions (dividends and splits)
             try:
-                # Dividends
-                dividends = ticker.dividends
-                if not dividends.empty:
-                    div_data = {}
-                    for date, amount in dividends.items():
-                        div_data[date.strftime('%Y-%m-%d')] = {
-                            'amount': float(amount),
-                            'formatted': self.format_currency(amount)
-                        }
-                    complete_data['corporate_actions']['dividends'] = div_data
-                    complete_data['data_summary']['dividend_records'] = len(div_data)
-                
-                # Stock splits
-                splits = ticker.splits
-                if not splits.empty:
-                    split_data = {}
-                    for date, ratio in splits.items():
-                        split_data[date.strftime('%Y-%m-%d')] = {
-                            'ratio': float(ratio),
-                            'formatted': f"1:{ratio}"
-                        }
-                    complete_data['corporate_actions']['splits'] = split_data
-                    complete_data['data_summary']['split_records'] = len(split_data)
+                if price_update is not None:
+                    # No dividend or split since the last stored bar: the saved ones are current
+                    complete_data['corporate_actions'] = price_update[1]
+                    complete_data['data_summary']['dividend_records'] = len(price_update[1].get('dividends', {}))
+                    complete_data['data_summary']['split_records'] = len(price_update[1].get('splits', {}))
+                else:
+                    # A full-history batch frame already holds every dividend and split
+                    full_batch = history is not None and last_price_date is None and 'Dividends' in history.columns
+                    
+                    # Dividends
+                    dividends = history['Dividends'][history['Dividends'] != 0] if full_batch else ticker.dividends
+                    if not dividends.empty:
+                        div_data = {}
+                        for date, amount in dividends.items():
+                            div_data[date.strftime('%Y-%m-%d')] = {
+                                'amount': float(amount),
+                                'formatted': self.format_currency(amount)
+                            }
+                        complete_data['corporate_actions']['dividends'] = div_data
+                        complete_data['data_summary']['dividend_records'] = len(div_data)
+                    
+                    # Stock splits
+                    if full_batch and 'Stock Splits' in history.columns:
+                        splits = history['Stock Splits'][history['Stock Splits'] != 0]
+                    else:
+                        splits = ticker.splits
+                    if not splits.empty:
+                        split_data = {}
+                        for date, ratio in splits.items():
+                            split_data[date.strftime('%Y-%m-%d')] = {
+                                'ratio': float(ratio),
+                                'formatted': f"1:{ratio}"
+                            }
+                        complete_data['corporate_actions']['splits'] = split_data
+                        complete_data['data_summary']['split_records'] = len(split_data)
                     
             except Exception as e:
                 logger.warning(f"Could not fetch corporate actions for {symbol}: {e}")
@@ -362,23 +485,34 @@ class FinancialDataFetcher:
             }
     
     def save_stock_data(self, symbol, data):
-        """Save individual stock data to JSON file"""
+        """Save individual stock data as a columnar snapshot and/or JSON file"""
         try:
-            filename = os.path.join(self.output_dir, f"{symbol}_financial_data.json")
+            filename = None
+            snapshot_file = os.path.join(self.output_dir, f"{symbol}{financial_snapshot.SNAPSHOT_SUFFIX}")
+            json_file = os.path.join(self.output_dir, f"{symbol}{financial_snapshot.JSON_SUFFIX}")
             
-            def json_serializer(obj):
-                """Custom JSON serializer for handling datetime and other objects"""
-                if hasattr(obj, 'isoformat'):  # datetime objects
-                    return obj.isoformat()
-                elif hasattr(obj, 'item'):  # numpy objects
-                    return obj.item()
-                elif hasattr(obj, 'tolist'):  # numpy arrays
-                    return obj.tolist()
-                else:
-                    return str(obj)
+            def write_json():
+                with open(json_file, 'w', encoding='utf-8') as f:
+                    json.dump(financial_snapshot.add_formatted(data), f, indent=2, ensure_ascii=False,
+                              default=financial_snapshot.json_serializer)
+                return json_file
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=json_serializer)
+            # JSON goes first so that, with both formats, the snapshot is the newer file
+            if 'json' in self.output_formats:
+                filename = write_json()
+            
+            if 'npz' in self.output_formats:
+                try:
+                    filename = str(financial_snapshot.write_snapshot(snapshot_file, data))
+                except ValueError as e:
+                    # Drop a stale snapshot and keep the data as JSON
+                    logger.warning(f"Snapshot not written for {symbol} ({e}); saving JSON instead")
+                    if os.path.exists(snapshot_file):
+                        os.remove(snapshot_file)
+                    filename = filename or write_json()
+            elif os.path.exists(snapshot_file):
+                # A JSON-only run must not leave an older snapshot behind
+                os.remove(snapshot_file)
             
             logger.info(f"Saved financial data for {symbol} to {filename}")
             return filename
@@ -387,13 +521,23 @@ class FinancialDataFetcher:
             logger.error(f"Error saving data for {symbol}: {e}")
             return None
     
-    def fetch_all_financial_data(self, max_workers=3):
-        """Fetch financial data for all stocks and save individual JSON files"""
+    def fetch_all_financial_data(self, max_workers=3, incremental=False, db_path='financial_reports/financial_data.db',
+                                 batch_size=None):
+        """
+        Fetch financial data for all stocks and save individual data files.
+        
+        incremental=True reads the last stored date per symbol from the
+        historical_prices table in db_path, fetches only the bars since then
+        and upserts them there (symbols not yet in the database get full history).
+        
+        batch_size=N downloads price history for N symbols per request; the
+        remaining per-symbol requests (info, statements) share the rate limiter.
+        """
         logger.info("=" * 80)
         logger.info("STARTING COMPLETE FINANCIAL DATA FETCHING")
         logger.info("=" * 80)
         
-        if not self.check_venv():
+        if isinstance(self.provider, YFinanceProvider) and not self.check_venv():
             return False
         
         # Load stocks
@@ -404,16 +548,34 @@ class FinancialDataFetcher:
         
         logger.info(f"Processing {len(stocks)} stocks with {max_workers} workers")
         
+        db = None
+        last_price_dates = {}
+        if incremental:
+            db = FinancialDatabase(db_path)
+            last_price_dates = db.get_last_price_dates()
+            logger.info(f"Incremental price refresh: {len(last_price_dates)} symbols have stored prices")
+        
+        batches = self.price_batches(stocks, last_price_dates, batch_size) if batch_size else [stocks]
+        requests = self.estimate_requests(stocks, last_price_dates, batch_size)
+        logger.info(f"Request budget: {requests} requests at {self.requests_per_second:g}/s "
+                    f"(at least {requests / self.requests_per_second / 60:.1f} min)")
+        
         successful = 0
         failed = 0
+        refreshed = {'incremental': 0, 'full': 0}
+        new_price_records = 0
         
         # Use ThreadPoolExecutor for concurrent processing
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_symbol = {
-                executor.submit(self.get_complete_financial_data, stock): stock 
-                for stock in stocks
-            }
+            # Submit all tasks, one price download per batch
+            future_to_symbol = {}
+            for batch in batches:
+                histories = self.download_price_batch(batch, last_price_dates) if batch_size else {}
+                for stock in batch:
+                    future = executor.submit(
+                        self.get_complete_financial_data, stock, last_price_dates.get(stock), histories.get(stock)
+                    )
+                    future_to_symbol[future] = stock
             
             # Process completed tasks
             for future in as_completed(future_to_symbol):
@@ -426,12 +588,14 @@ class FinancialDataFetcher:
                     
                     if saved_file and 'error' not in data:
                         successful += 1
+                        if db is not None:
+                            new_price_records += self.store_price_update(db, symbol, data, last_price_dates.get(symbol))
+                            price_refresh = data['data_summary'].get('price_refresh')
+                            if price_refresh:
+                                refreshed[price_refresh] += 1
                     else:
                         failed += 1
                     
-                    # Small delay to avoid overwhelming the API
-                    time.sleep(0.3)
-                    
                 except Exception as e:
                     logger.error(f"Error processing {symbol}: {e}")
                     failed += 1
@@ -445,21 +609,75 @@ class FinancialDataFetcher:
         logger.info(f"Failed fetches: {failed}")
         logger.info(f"Success rate: {(successful/len(stocks)*100):.1f}%")
         logger.info(f"Data saved to: {self.output_dir}")
+        if db is not None:
+            logger.info(f"Price refresh: {refreshed['incremental']} incremental, {refreshed['full']} full, "
+                        f"{new_price_records} price records written")
+            db.close()
         
         return successful > 0
+    
+    @staticmethod
+    def price_batches(stocks, last_price_dates, batch_size):
+        """Batches of symbols for multi-ticker downloads; full-history and incremental symbols are kept apart"""
+        full = [stock for stock in stocks if stock not in last_price_dates]
+        incremental = [stock for stock in stocks if stock in last_price_dates]
+        return [group[i:i + batch_size] for group in (full, incremental) for i in range(0, len(group), batch_size)]
+    
+    @staticmethod
+    def estimate_requests(stocks, last_price_dates, batch_size):
+        """Upstream requests a run will make, assuming no full refetches"""
+        if batch_size:
+            batches = len(FinancialDataFetcher.price_batches(stocks, last_price_dates, batch_size))
+            return len(stocks) * STATEMENT_REQUESTS_PER_SYMBOL + batches
+        # history, or history + dividends + splits for a full fetch
+        price_requests = sum(1 if stock in last_price_dates else 3 for stock in stocks)
+        return len(stocks) * STATEMENT_REQUESTS_PER_SYMBOL + price_requests
+    
+    def store_price_update(self, db, symbol, data, last_price_date):
+        """
+        Upsert a symbol's refreshed bars into historical_prices: the bars since
+        last_price_date after an incremental refresh, the whole re-adjusted
+        series after a full refetch. A failed or empty price fetch leaves the
+        stored series untouched. Returns the number of bars written.
+        """
+        if last_price_date is None:
+            # Not in the database yet; database.py imports the company with its prices
+            return 0
+        bars = canonical_bars(data.get('historical_prices', {}))
+        if not bars or not data['data_summary'].get('price_refresh'):
+            logger.warning(f"No price bars fetched for {symbol}; keeping its stored prices")
+            return 0
+        try:
+            if data['data_summary'].get('price_refresh') == 'incremental':
+                written = db.upsert_historical_prices(
+                    symbol, {date: bar for date, bar in bars.items() if date >= last_price_date}
+                )
+            else:
+                written = db.upsert_historical_prices(symbol, bars, replace=True)
+            db.conn.commit()
+            return written
+        except Exception as e:
+            db.conn.rollback()
+            logger.error(f"Error storing prices for {symbol}: {e}")
+            return 0
 
 def main():
     """Main execution function"""
-    fetcher = FinancialDataFetcher()
+    # --json also exports the human-readable JSON files next to the snapshots
+    output_formats = ('npz', 'json') if '--json' in sys.argv else ('npz',)
+    fetcher = FinancialDataFetcher(output_formats=output_formats)
+    # --batch-size N downloads price history for N symbols per request
+    batch_size = int(sys.argv[sys.argv.index('--batch-size') + 1]) if '--batch-size' in sys.argv else None
     
     try:
-        success = fetcher.fetch_all_financial_data()
+        # --incremental fetches only the price bars newer than those in the database
+        success = fetcher.fetch_all_financial_data(incremental='--incremental' in sys.argv, batch_size=batch_size)
         
         if success:
             print("\n" + "="*80)
             print("🎉 FINANCIAL DATA FETCHING SUCCESSFUL!")
             print("="*80)
-            print(f"📁 Individual JSON files saved to: {fetcher.output_dir}")
+            print(f"📁 Individual {'/'.join(fetcher.output_formats).upper()} files saved to: {fetcher.output_dir}")
             print(f"📋 Log file: financial_reports/fetch_financial_data.log")
             print("✅ Ready for database import!")
         else:
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Financial Data Snapshots
+Columnar NumPy (.npz) storage for the per-company financial data files.
+
+Statement items, price bars and corporate actions are stored as typed arrays;
+everything else (company info, valuation metrics, ...) is kept as JSON inside
+the archive. The human-readable 'formatted' strings are derived data: they
+are neither needed on write nor stored, and are rebuilt from the values with
+format_currency on read (add_formatted does the same for JSON exports).
+
+Usage:
+    python financial_reports/financial_snapshot.py [data_dir] [--remove-json]
+converts existing *_financial_data.json files to snapshots.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_SUFFIX = "_financial_data.npz"
+JSON_SUFFIX = "_financial_data.json"
+
+# Sections stored as arrays; the rest of the document goes into the JSON meta
+COLUMNAR_SECTIONS = ('financial_statements', 'historical_prices', 'corporate_actions')
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+def format_currency(value):
+    """Format currency values in Indian format (Crores, Lakhs)"""
+    if value is None or value == 0:
+        return "₹0"
+
+    try:
+        value = float(value)
+        if abs(value) >= 10000000:  # 1 Crore = 10 Million
+            return f"₹{value/10000000:.2f} Cr"
+        elif abs(value) >= 100000:  # 1 Lakh = 100 Thousand
+            return f"₹{value/100000:.2f} L"
+        else:
+            return f"₹{value:,.2f}"
+    except:
+        return str(value)
+
+
+def json_serializer(obj):
+    """Custom JSON serializer for handling datetime and other objects"""
+    if hasattr(obj, 'isoformat'):  # datetime objects
+        return obj.isoformat()
+    elif hasattr(obj, 'item'):  # numpy objects
+        return obj.item()
+    elif hasattr(obj, 'tolist'):  # numpy arrays
+        return obj.tolist()
+    else:
+        return str(obj)
+
+
+def symbol_from_path(path):
+    """RELIANCE_financial_data.npz / .json -> RELIANCE"""
+    return Path(path).stem.replace("_financial_data", "")
+
+
+def company_files(data_dir):
+    """
+    {symbol: data file} for a data directory. When a symbol has both a
+    snapshot and a JSON file the newer one wins (the snapshot on a tie)
+    """
+    data_dir = Path(data_dir)
+    files = {}
+    for path in data_dir.glob("*.npz"):
+        files[symbol_from_path(path)] = path
+    for path in data_dir.glob("*.json"):
+        symbol = symbol_from_path(path)
+        snapshot = files.get(symbol)
+        if snapshot is None or path.stat().st_mtime > snapshot.stat().st_mtime:
+            files[symbol] = path
+    return files
+
+
+def _dates(keys):
+    keys = list(keys)
+    dates = np.array(keys, dtype='datetime64[D]')
+    if _date_strings(dates) != keys:
+        raise ValueError("Dates must be YYYY-MM-DD strings")
+    return dates
+
+
+def _date_strings(values):
+    return np.datetime_as_string(values, unit='D').tolist()
+
+
+def add_formatted(data):
+    """
+    Copy of a financial data document with the 'formatted' strings filled in
+    for statement items, price bars, dividends and splits (for JSON export)
+    """
+    data = dict(data)
+    if 'financial_statements' in data:
+        data['financial_statements'] = {
+            period_type: {
+                statement_type: {
+                    period: {
+                        field: {'value': item['value'],
+                                'formatted': item['value'] if isinstance(item['value'], str) else format_currency(item['value'])}
+                        for field, item in items.items()
+                    }
+                    for period, items in by_period.items()
+                }
+                for statement_type, by_period in statements.items()
+            }
+            for period_type, statements in data['financial_statements'].items()
+        }
+    if 'historical_prices' in data:
+        data['historical_prices'] = {
+            period: {date: _formatted_bar(bar) for date, bar in bars.items()}
+            for period, bars in data['historical_prices'].items()
+        }
+    if 'corporate_actions' in data:
+        actions = dict(data['corporate_actions'])
+        if 'dividends' in actions:
+            actions['dividends'] = {date: {'amount': d['amount'], 'formatted': format_currency(d['amount'])}
+                                    for date, d in actions['dividends'].items()}
+        if 'splits' in actions:
+            actions['splits'] = {date: {'ratio': s['ratio'], 'formatted': f"1:{s['ratio']}"}
+                                 for date, s in actions['splits'].items()}
+        data['corporate_actions'] = actions
+    return data
+
+
+def _formatted_bar(bar):
+    bar = {column: bar[column] for column in PRICE_COLUMNS + ('volume',)}
+    bar['formatted'] = {column: format_currency(bar[column]) for column in PRICE_COLUMNS}
+    bar['formatted']['volume'] = f"{bar['volume']:,}"
+    return bar
+
+
+def _column(values, kind):
+    """float64/int64 array of values that are all float / all int (so they decode unchanged)"""
+    if not all(isinstance(value, kind) and not isinstance(value, bool) for value in values):
+        raise ValueError(f"Expected {kind.__name__} values")
+    return np.array(values, dtype=np.float64 if kind is float else np.int64)
+
+
+def encode_snapshot(data):
+    """
+    Split a financial data document into (meta, arrays). Any 'formatted'
+    strings in it are ignored; documents that could not be decoded back to
+    the same values raise ValueError.
+    """
+    meta = {key: value for key, value in data.items() if key not in COLUMNAR_SECTIONS}
+    layout = {'key_order': list(data.keys())}
+    arrays = {}
+
+    # Statements: one row per (period type, statement, period, field), in document order
+    if 'financial_statements' in data:
+        field_index = {}
+        field_codes = []
+        values = []
+        text_values = {}
+        statements_layout = {}
+        for period_type, statements in data['financial_statements'].items():
+            statements_layout[period_type] = {}
+            for statement_type, by_period in statements.items():
+                periods = []
+                for period, items in by_period.items():
+                    periods.append([period, len(items)])
+                    for field, field_data in items.items():
+                        if 'value' not in field_data or not set(field_data) <= {'value', 'formatted'}:
+                            raise ValueError(f"Unexpected statement item {field!r}: {sorted(field_data)}")
+                        value = field_data['value']
+                        if isinstance(value, float):
+                            values.append(value)
+                        elif isinstance(value, str):
+                            # Non-numeric items keep their text; value and formatted are the same string
+                            text_values[str(len(values))] = value
+                            values.append(np.nan)
+                        else:
+                            raise ValueError(f"Statement item {field!r} is neither float nor text: {value!r}")
+                        field_codes.append(field_index.setdefault(field, len(field_index)))
+                statements_layout[period_type][statement_type] = periods
+        layout['financial_statements'] = statements_layout
+        layout['statement_fields'] = list(field_index)
+        layout['statement_text_values'] = text_values
+        arrays['statement_field_codes'] = np.array(field_codes, dtype=np.int32)
+        arrays['statement_values'] = np.array(values, dtype=np.float64)
+
+    # Price bars: one set of columns per period ('max', '5y', ...)
+    if 'historical_prices' in data:
+        layout['historical_prices'] = list(data['historical_prices'])
+        for i, bars in enumerate(data['historical_prices'].values()):
+            arrays[f'prices_{i}_date'] = _dates(bars)
+            for column in PRICE_COLUMNS:
+                arrays[f'prices_{i}_{column}'] = _column([bar[column] for bar in bars.values()], float)
+            arrays[f'prices_{i}_volume'] = _column([bar['volume'] for bar in bars.values()], int)
+
+    # Dividends and splits as (date, amount/ratio) columns; anything else stays JSON
+    if 'corporate_actions' in data:
+        actions = data['corporate_actions']
+        layout['corporate_actions'] = list(actions)
+        layout['corporate_actions_other'] = {
+            kind: records for kind, records in actions.items() if kind not in ('dividends', 'splits')
+        }
+        if 'dividends' in actions:
+            arrays['dividend_dates'] = _dates(actions['dividends'])
+            arrays['dividend_amounts'] = _column([d['amount'] for d in actions['dividends'].values()], float)
+        if 'splits' in actions:
+            arrays['split_dates'] = _dates(actions['splits'])
+            arrays['split_ratios'] = _column([s['ratio'] for s in actions['splits'].values()], float)
+
+    meta['_snapshot_layout'] = layout
+    return meta, arrays
+
+
+def statement_chunks(columns):
+    """(period_type, statement_type, period, item_count) in row order"""
+    for period_type, statements in columns['layout'].items():
+        for statement_type, periods in statements.items():
+            for period, count in periods:
+                yield period_type, statement_type, period, count
+
+
+def decode_statements(columns):
+    """Rebuild the nested financial_statements dict from statement columns"""
+    fields = columns['fields']
+    field_codes = columns['field_codes'].tolist()
+    values = columns['values'].tolist()
+    text_values = columns['text_values']
+    # Skeleton first, so empty period types and statements keep their place
+    statements = {
+        period_type: {statement_type: {} for statement_type in by_statement}
+        for period_type, by_statement in columns['layout'].items()
+    }
+    row = 0
+    for period_type, statement_type, period, count in statement_chunks(columns):
+        items = {}
+        for i in range(row, row + count):
+            text = text_values.get(str(i))
+            if text is not None:
+                items[fields[field_codes[i]]] = {'value': text, 'formatted': text}
+            else:
+                items[fields[field_codes[i]]] = {'value': values[i], 'formatted': format_currency(values[i])}
+        statements[period_type][statement_type][period] = items
+        row += count
+    return statements
+
+
+def statement_rows(columns):
+    """
+    (period_type, statement_type, period, field, value, text) per statement
+    item in row order, without building the nested dict; text is the item's
+    string value for non-numeric items (value is then NaN), else None
+    """
+    fields = columns['fields']
+    field_codes = columns['field_codes'].tolist()
+    values = columns['values'].tolist()
+    text_values = columns['text_values']
+    row = 0
+    for period_type, statement_type, period, count in statement_chunks(columns):
+        for i in range(row, row + count):
+            yield period_type, statement_type, period, fields[field_codes[i]], values[i], text_values.get(str(i))
+        row += count
+
+
+def load_snapshot_arrays(path):
+    """
+    (meta, layout, arrays) of a snapshot without decoding any section: meta
+    is the non-columnar part of the document, layout describes the arrays
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(archive['meta'].tobytes().decode('utf-8'))
+        layout = meta.pop('_snapshot_layout')
+        arrays = {name: archive[name] for name in archive.files if name != 'meta'}
+    return meta, layout, arrays
+
+
+def snapshot_statement_columns(layout, arrays):
+    """Statement columns for decode_statements / statement_rows, or None without statements"""
+    if 'financial_statements' not in layout:
+        return None
+    return {
+        'layout': layout['financial_statements'],
+        'fields': layout['statement_fields'],
+        'field_codes': arrays['statement_field_codes'],
+        'values': arrays['statement_values'],
+        'text_values': layout['statement_text_values'],
+        'key_order': layout['key_order']
+    }
+
+
+def price_columns(arrays, index):
+    """[dates, opens, highs, lows, closes, volumes] lists of the index-th stored price period"""
+    return ([_date_strings(arrays[f'prices_{index}_date'])]
+            + [arrays[f'prices_{index}_{column}'].tolist() for column in PRICE_COLUMNS]
+            + [arrays[f'prices_{index}_volume'].tolist()])
+
+
+def price_rows(arrays, index):
+    """(date, open, high, low, close, volume) per bar of the index-th stored price period"""
+    return zip(*price_columns(arrays, index))
+
+
+def action_rows(arrays, kind):
+    """(date, amount) per dividend or (date, ratio) per split"""
+    if kind == 'dividends':
+        return zip(_date_strings(arrays['dividend_dates']), arrays['dividend_amounts'].tolist())
+    return zip(_date_strings(arrays['split_dates']), arrays['split_ratios'].tolist())
+
+
+def read_snapshot_parts(path, skip_sections=()):
+    """
+    Load a snapshot without building the statements dict.
+
+    Returns (data, statement_columns): data holds every section except
+    financial_statements and skip_sections (e.g. 'historical_prices', for
+    readers that never look at prices); statement_columns is None when the
+    document had no statements, else a dict with layout, fields, field_codes,
+    values and text_values for decode_statements / statement_chunks.
+    """
+    meta, layout, arrays = load_snapshot_arrays(path)
+
+    sections = {}
+    if 'historical_prices' in layout and 'historical_prices' not in skip_sections:
+        prices = {}
+        for i, period in enumerate(layout['historical_prices']):
+            bars = {}
+            for date, open_, high, low, close, volume in price_rows(arrays, i):
+                bars[date] = {
+                    'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+                    'formatted': {'open': format_currency(open_), 'high': format_currency(high),
+                                  'low': format_currency(low), 'close': format_currency(close),
+                                  'volume': f"{volume:,}"}
+                }
+            prices[period] = bars
+        sections['historical_prices'] = prices
+
+    if 'corporate_actions' in layout and 'corporate_actions' not in skip_sections:
+        actions = {}
+        for kind in layout['corporate_actions']:
+            if kind == 'dividends':
+                actions[kind] = {date: {'amount': amount, 'formatted': format_currency(amount)}
+                                 for date, amount in action_rows(arrays, kind)}
+            elif kind == 'splits':
+                actions[kind] = {date: {'ratio': ratio, 'formatted': f"1:{ratio}"}
+                                 for date, ratio in action_rows(arrays, kind)}
+            else:
+                actions[kind] = layout['corporate_actions_other'][kind]
+        sections['corporate_actions'] = actions
+
+    statement_columns = snapshot_statement_columns(layout, arrays)
+
+    data = {}
+    for key in layout['key_order']:
+        if key in meta:
+            data[key] = meta[key]
+        elif key in sections:
+            data[key] = sections[key]
+    return data, statement_columns
+
+
+def read_snapshot(path):
+    """Load a snapshot back into the full JSON document"""
+    data, statement_columns = read_snapshot_parts(path)
+    if statement_columns is None:
+        return data
+    # Put the decoded statements back in their original position
+    return {
+        key: decode_statements(statement_columns) if key == 'financial_statements' else data[key]
+        for key in statement_columns['key_order'] if key == 'financial_statements' or key in data
+    }
+
+
+def write_snapshot(path, data):
+    """
+    Write data as a compressed snapshot (atomically). Non-columnar sections
+    are serialized the way the JSON export would be; columnar sections that
+    would not decode back to the same values raise ValueError (see
+    encode_snapshot) and leave any existing file untouched.
+    """
+    path = Path(path)
+    meta, arrays = encode_snapshot(data)
+    meta_bytes = json.dumps(meta, ensure_ascii=False, default=json_serializer).encode('utf-8')
+
+    tmp_path = path.with_name(path.name + ".tmp.npz")
+    try:
+        np.savez_compressed(tmp_path, meta=np.frombuffer(meta_bytes, dtype=np.uint8), **arrays)
+        tmp_path.replace(path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def load_company_file(path):
+    """Load a company's financial data from a snapshot or JSON file"""
+    path = Path(path)
+    if path.suffix == '.npz':
+        return read_snapshot(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def convert_directory(data_dir, remove_json=False):
+    """Write a snapshot next to every *_financial_data.json in data_dir"""
+    converted = 0
+    json_bytes = 0
+    snapshot_bytes = 0
+    for json_path in sorted(Path(data_dir).glob(f"*{JSON_SUFFIX}")):
+        snapshot_path = json_path.with_name(symbol_from_path(json_path) + SNAPSHOT_SUFFIX)
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                write_snapshot(snapshot_path, json.load(f))
+        except Exception as e:
+            print(f"⚠️  Skipping {json_path.name}: {e}")
+            continue
+        converted += 1
+        json_bytes += json_path.stat().st_size
+        snapshot_bytes += snapshot_path.stat().st_size
+        if remove_json:
+            json_path.unlink()
+    print(f"✅ Converted {converted} file(s): {json_bytes / 1e6:.1f} MB JSON -> {snapshot_bytes / 1e6:.1f} MB snapshots")
+    return converted
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    convert_directory(args[0] if args else 'financial_reports/data', remove_json='--remove-json' in sys.argv)
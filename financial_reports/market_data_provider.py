@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Market Data Providers
+Where FinancialDataFetcher gets its data from: yfinance, or a deterministic
+fake provider for offline runs. Both expose per-symbol tickers (info,
+statements, history, dividends, splits) and multi-ticker history downloads.
+
+Usage:
+    python financial_reports/market_data_provider.py [symbols] [batch_size]
+runs a batched fetch against the fake provider into a temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Ticker attributes that hit the network (each access takes a limiter token)
+NETWORK_ATTRIBUTES = {
+    'info', 'history', 'dividends', 'splits', 'earnings',
+    'income_stmt', 'balance_sheet', 'cashflow',
+    'quarterly_income_stmt', 'quarterly_balance_sheet', 'quarterly_cashflow'
+}
+
+
+class RateLimitedTicker:
+    """Ticker proxy that takes a token from a shared limiter before every network attribute"""
+
+    def __init__(self, ticker, limiter):
+        self._ticker = ticker
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        if name in NETWORK_ATTRIBUTES:
+            self._limiter.acquire()
+        return getattr(self._ticker, name)
+
+
+def split_download(data, ticker_symbols):
+    """{ticker: frame} from a multi-ticker download grouped by ticker, skipping tickers without bars"""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    for ticker_symbol in ticker_symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker_symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker_symbol]
+        else:
+            frame = data
+        # Tickers with shorter histories come back padded with empty rows
+        frame = frame.dropna(subset=[column for column in ('Open', 'High', 'Low', 'Close') if column in frame.columns], how='all')
+        if not frame.empty:
+            frames[ticker_symbol] = frame
+    return frames
+
+
+class YFinanceProvider:
+    """Live data from Yahoo Finance"""
+
+    def ticker(self, ticker_symbol):
+        import yfinance as yf
+        return yf.Ticker(ticker_symbol)
+
+    def download_history(self, ticker_symbols, period=None, start=None):
+        """Daily bars (with dividends and splits) for several tickers in one request"""
+        import yfinance as yf
+        kwargs = {'start': start} if start else {'period': period or 'max'}
+        data = yf.download(
+            list(ticker_symbols), group_by='ticker', actions=True, auto_adjust=True,
+            threads=True, progress=False, **kwargs
+        )
+        return split_download(data, ticker_symbols)
+
+
+class FakeTicker:
+    """Deterministic, yfinance-shaped data for one symbol"""
+
+    SECTORS = ['Technology', 'Financial Services', 'Energy', 'Consumer Defensive', 'Healthcare']
+    STATEMENT_FIELDS = {
+        'income': ['Total Revenue', 'Gross Profit', 'Operating Income', 'EBITDA', 'Net Income'],
+        'balance': ['Total Assets', 'Current Assets', 'Current Liabilities', 'Inventory',
+                    'Cash And Cash Equivalents', 'Total Debt', 'Stockholders Equity'],
+        'cashflow': ['Operating Cash Flow', 'Capital Expenditure', 'Free Cash Flow']
+    }
+
+    def __init__(self, ticker_symbol, provider):
+        self.ticker_symbol = ticker_symbol
+        self._provider = provider
+        self._seed = zlib.crc32(ticker_symbol.encode('utf-8'))
+        self._scale = 1e9 * (1 + self._seed % 50)
+
+    def _call(self, name):
+        self._provider.record(name)
+
+    @property
+    def info(self):
+        self._call('info')
+        close = float(self._bars()['Close'].iloc[-1])
+        return {
+            'longName': f"{self.ticker_symbol.split('.')[0]} Limited",
+            'sector': self.SECTORS[self._seed % len(self.SECTORS)],
+            'industry': 'Fake Industry',
+            'marketCap': int(self._scale * 20),
+            'currentPrice': close,
+            'previousClose': close,
+            'trailingPE': 10 + self._seed % 30,
+            'priceToBook': 1 + self._seed % 8,
+            'returnOnEquity': 0.05 + (self._seed % 20) / 100,
+            'currentRatio': 1 + (self._seed % 15) / 10,
+            'currency': 'INR'
+        }
+
+    def _statement(self, kind, quarterly):
+        periods = pd.date_range(end=self._provider.end, periods=4, freq='QE' if quarterly else 'YE')[::-1]
+        rng = np.random.RandomState(self._seed + len(kind) + quarterly)
+        fields = self.STATEMENT_FIELDS[kind]
+        scale = self._scale / (4 if quarterly else 1)
+        values = scale * rng.uniform(0.1, 1.0, size=(len(fields), len(periods)))
+        return pd.DataFrame(values, index=fields, columns=periods)
+
+    @property
+    def income_stmt(self):
+        self._call('income_stmt')
+        return self._statement('income', False)
+
+    @property
+    def balance_sheet(self):
+        self._call('balance_sheet')
+        return self._statement('balance', False)
+
+    @property
+    def cashflow(self):
+        self._call('cashflow')
+        return self._statement('cashflow', False)
+
+    @property
+    def quarterly_income_stmt(self):
+        self._call('quarterly_income_stmt')
+        return self._statement('income', True)
+
+    @property
+    def quarterly_balance_sheet(self):
+        self._call('quarterly_balance_sheet')
+        return self._statement('balance', True)
+
+    @property
+    def quarterly_cashflow(self):
+        self._call('quarterly_cashflow')
+        return self._statement('cashflow', True)
+
+    @property
+    def earnings(self):
+        # Deprecated in yfinance; recent versions return nothing
+        self._call('earnings')
+        return None
+
+    def _bars(self):
+        """Business-day bars from start to the provider's end date, one dividend a year"""
+        dates = pd.bdate_range(self._provider.start, self._provider.end, tz='Asia/Kolkata')
+        rng = np.random.RandomState(self._seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        frame = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.003, len(dates))),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': rng.randint(10000, 1000000, len(dates)),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=dates)
+        july = np.flatnonzero(frame.index.month == 7)
+        years = frame.index.year[july]
+        first_july_days = july[np.r_[True, years[1:] != years[:-1]]]
+        frame.iloc[first_july_days, frame.columns.get_loc('Dividends')] = round(close.mean() / 100, 2)
+        return frame
+
+    def history(self, period=None, start=None):
+        self._call('history')
+        bars = self._bars()
+        if start:
+            bars = bars[bars.index.strftime('%Y-%m-%d') >= str(start)]
+        return bars
+
+    @property
+    def dividends(self):
+        self._call('dividends')
+        dividends = self._bars()['Dividends']
+        return dividends[dividends != 0]
+
+    @property
+    def splits(self):
+        self._call('splits')
+        splits = self._bars()['Stock Splits']
+        return splits[splits != 0]
+
+
+class FakeProvider:
+    """
+    Offline stand-in for YFinanceProvider. Counts every call by name and can
+    add a fixed latency per call to model network time.
+    """
+
+    def __init__(self, start='2015-01-01', end='2025-06-30', latency=0.0):
+        self.start = start
+        self.end = end
+        self.latency = latency
+        self.calls = Counter()
+
+    def record(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def ticker(self, ticker_symbol):
+        return FakeTicker(ticker_symbol, self)
+
+    def download_history(self, ticker_symbols, period=None, start=None):
+        self.record('download')
+        # Shaped like yf.download(group_by='ticker'): (ticker, field) columns, tz-naive dates
+        frames = {}
+        for ticker_symbol in ticker_symbols:
+            bars = FakeTicker(ticker_symbol, self)._bars()
+            if start:
+                bars = bars[bars.index.strftime('%Y-%m-%d') >= str(start)]
+            frames[ticker_symbol] = bars.tz_localize(None)
+        return split_download(pd.concat(frames, axis=1), ticker_symbols)
+
+
+if __name__ == "__main__":
+    from fetch_financial_data import FinancialDataFetcher
+
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'stocks.csv')
+        with open(csv_path, 'w') as f:
+            f.write("SYMBOL\n" + "\n".join(f"FAKE{i}" for i in range(symbols)) + "\n")
+        provider = FakeProvider()
+        # No real upstream to protect, so a high rate; the log still shows the request budget
+        fetcher = FinancialDataFetcher(csv_path, os.path.join(tmp_dir, 'data'), provider=provider, requests_per_second=50)
+        start = time.perf_counter()
+        fetcher.fetch_all_financial_data(batch_size=batch_size)
+        print(f"\n✅ Fake fetch of {symbols} symbols in {time.perf_counter() - start:.1f}s")
+        print(f"📊 Provider calls: {dict(provider.calls)}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Price History
+One canonical daily bar series per symbol (yfinance period 'max'); shorter
+periods ('5y', '1y', ...) are date-range views of it, derived when queried
+instead of being fetched and stored separately.
+"""
+
+import calendar
+from datetime import date
+
+# The only period that is fetched and stored
+CANONICAL_PERIOD = 'max'
+
+# Period name -> (years, months) to look back from the latest bar
+PERIOD_LOOKBACK = {
+    '10y': (10, 0),
+    '5y': (5, 0),
+    '2y': (2, 0),
+    '1y': (1, 0),
+    '6mo': (0, 6),
+    '3mo': (0, 3),
+    '1mo': (0, 1),
+}
+
+
+def period_start(period, end_date):
+    """
+    First date (YYYY-MM-DD) of a period view ending at end_date, or None for
+    the whole series ('max'). 'ytd' starts on January 1st of end_date's year.
+    """
+    if period == CANONICAL_PERIOD:
+        return None
+    end = date.fromisoformat(str(end_date)[:10])
+    if period == 'ytd':
+        return date(end.year, 1, 1).isoformat()
+    if period not in PERIOD_LOOKBACK:
+        raise ValueError(f"Unknown price period: {period}")
+    years, months = PERIOD_LOOKBACK[period]
+    month_index = end.year * 12 + (end.month - 1) - years * 12 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    # Clamp the day for shorter months (e.g. 29 Feb -> 28 Feb)
+    day = min(end.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day).isoformat()
+
+
+def canonical_bars(historical_prices):
+    """
+    The canonical {date: bar} series from a historical_prices section. Files
+    written before the single-series layout hold several overlapping periods;
+    their bars are merged by date.
+    """
+    if not historical_prices:
+        return {}
+    if CANONICAL_PERIOD in historical_prices or len(historical_prices) == 1:
+        return historical_prices.get(CANONICAL_PERIOD) or next(iter(historical_prices.values()))
+    merged = {}
+    for bars in historical_prices.values():
+        merged.update(bars)
+    return dict(sorted(merged.items()))
+
+
+def period_view(bars, period):
+    """Bars of one period ('max', '5y', '1y', ...) as a date-range slice of the canonical series"""
+    if not bars:
+        return {}
+    start = period_start(period, max(bars))
+    if start is None:
+        return dict(bars)
+    return {bar_date: bar for bar_date, bar in bars.items() if bar_date >= start}
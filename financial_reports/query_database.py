@@ -90,7 +90,7 @@ class FinancialQueryTool:
             df = pd.read_sql_query("""
                 SELECT period_date, value, formatted_value
                 FROM annual_income_statements 
-                WHERE symbol = ? AND field_name LIKE '%Revenue%' OR field_name LIKE '%Total Revenue%'
+                WHERE symbol = ? AND field_name LIKE '%Revenue%'
                 ORDER BY period_date DESC
                 LIMIT ?
             """, self.conn, params=[symbol, limit])
@@ -106,6 +106,29 @@ class FinancialQueryTool:
         except Exception as e:
             print(f"❌ Error: {e}")
     
+    def show_key_financials(self, symbol, period_type='annual', limit=5):
+        """Show key statement fields for a company, one row per period"""
+        try:
+            df = pd.read_sql_query("""
+                SELECT *
+                FROM statement_summary
+                WHERE symbol = ? AND period_type = ?
+                ORDER BY period_date DESC
+                LIMIT ?
+            """, self.conn, params=[symbol, period_type, limit])
+            
+            if df.empty:
+                print(f"❌ No {period_type} statements found for {symbol}")
+                return
+            
+            print(f"\n📊 Key {period_type.title()} Financials for {symbol}:")
+            print("=" * 50)
+            # One column per period reads better than sixteen columns per row
+            print(df.drop(columns=['symbol', 'period_type']).set_index('period_date').T.to_string())
+            
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
     def show_database_stats(self):
         """Show database statistics"""
         try:
@@ -113,7 +136,7 @@ class FinancialQueryTool:
                 'companies', 'annual_income_statements', 'quarterly_income_statements',
                 'annual_balance_sheets', 'quarterly_balance_sheets', 'annual_cash_flows',
                 'quarterly_cash_flows', 'historical_prices', 'dividends', 'stock_splits',
-                'valuation_metrics', 'financial_health', 'earnings'
+                'valuation_metrics', 'financial_health', 'earnings', 'statement_summary'
             ]
             
             print(f"\n💾 Database Statistics:")
@@ -150,6 +173,7 @@ class FinancialQueryTool:
         print("  companies [limit] - Show companies")
         print("  details <symbol> - Show company details")
         print("  revenue <symbol> [limit] - Show revenue trends") 
+        print("  summary <symbol> [annual|quarterly] - Show key financials")
         print("  stats - Show database statistics")
         print("  sql <query> - Run custom SQL query")
         print("  quit - Exit")
@@ -181,6 +205,12 @@ class FinancialQueryTool:
                         self.show_revenue_trends(symbol, limit)
                     else:
                         print("❌ Please provide a symbol: revenue RELIANCE")
+                elif cmd == 'summary':
+                    if len(command) > 1:
+                        period_type = command[2].lower() if len(command) > 2 else 'annual'
+                        self.show_key_financials(command[1].upper(), period_type)
+                    else:
+                        print("❌ Please provide a symbol: summary RELIANCE")
                 elif cmd == 'stats':
                     self.show_database_stats()
                 elif cmd == 'sql':
@@ -63,7 +63,7 @@ echo "✅ Database import completed"
 echo ""
 echo "🎉 PIPELINE COMPLETED SUCCESSFULLY!"
 echo "=================================="
-echo "📁 JSON files location: financial_reports/data/"
+echo "📁 Data files location: financial_reports/data/ (*_financial_data.npz)"
 echo "💾 Database location: financial_reports/financial_data.db"
 echo "📋 Log files: financial_reports/*.log"
 echo ""
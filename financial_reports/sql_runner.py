@@ -39,22 +39,44 @@ def fetch_financial_data():
         print(f"📋 Processing {len(stock_symbols)} stocks from stocksList.csv")
         
         # SQL Query to fetch ALL revenue, expenditure, and net profit data for stocks in stocksList.csv
-        query = f"""
-        SELECT 
-            ais.symbol,
-            c.name as company_name,
-            ais.period_date,
-            MAX(CASE WHEN ais.field_name = 'Total Revenue' THEN ais.value END) as total_revenue,
-            MAX(CASE WHEN ais.field_name = 'Operating Expense' THEN ais.value END) as total_expenditure,
-            MAX(CASE WHEN ais.field_name = 'Net Income' THEN ais.value END) as net_profit
-        FROM annual_income_statements ais
-        JOIN companies c ON ais.symbol = c.symbol
-        WHERE ais.field_name IN ('Total Revenue', 'Operating Expense', 'Net Income')
-        AND ais.symbol IN ('{symbols_str}')
-        GROUP BY ais.symbol, c.name, ais.period_date
-        HAVING MAX(CASE WHEN ais.field_name = 'Total Revenue' THEN ais.value END) IS NOT NULL
-        ORDER BY ais.symbol, ais.period_date DESC;
-        """
+        has_summary = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'statement_summary'"
+        ).fetchone() is not None
+        if has_summary:
+            # statement_summary already holds one row per symbol and period, keyed by symbol
+            query = f"""
+            SELECT 
+                s.symbol,
+                c.name as company_name,
+                s.period_date,
+                s.total_revenue,
+                s.operating_expense as total_expenditure,
+                s.net_income as net_profit
+            FROM statement_summary s
+            JOIN companies c ON s.symbol = c.symbol
+            WHERE s.period_type = 'annual'
+            AND s.symbol IN ('{symbols_str}')
+            AND s.total_revenue IS NOT NULL
+            ORDER BY s.symbol, s.period_date DESC;
+            """
+        else:
+            print("⚠️  statement_summary not found; run database.py to build it. Pivoting annual_income_statements instead")
+            query = f"""
+            SELECT 
+                ais.symbol,
+                c.name as company_name,
+                ais.period_date,
+                MAX(CASE WHEN ais.field_name = 'Total Revenue' THEN ais.value END) as total_revenue,
+                MAX(CASE WHEN ais.field_name = 'Operating Expense' THEN ais.value END) as total_expenditure,
+                MAX(CASE WHEN ais.field_name = 'Net Income' THEN ais.value END) as net_profit
+            FROM annual_income_statements ais
+            JOIN companies c ON ais.symbol = c.symbol
+            WHERE ais.field_name IN ('Total Revenue', 'Operating Expense', 'Net Income')
+            AND ais.symbol IN ('{symbols_str}')
+            GROUP BY ais.symbol, c.name, ais.period_date
+            HAVING MAX(CASE WHEN ais.field_name = 'Total Revenue' THEN ais.value END) IS NOT NULL
+            ORDER BY ais.symbol, ais.period_date DESC;
+            """
         
         print(f"📊 Executing query: ALL Historical Data for {len(stock_symbols)} stocks from stocksList.csv")
         print("=" * 60)
@@ -4,24 +4,27 @@ Test Script for Financial Data
 Quick test to verify data for a specific company
 """
 
+import os
 import sys
 import json
 import sqlite3
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from financial_snapshot import company_files, load_company_file
+
 def test_json_data(symbol):
-    """Test JSON data for a symbol"""
-    json_file = f"financial_reports/data/{symbol}_financial_data.json"
+    """Test the snapshot (or JSON) data for a symbol"""
+    json_file = company_files("financial_reports/data").get(symbol)
     
-    if not Path(json_file).exists():
-        print(f"❌ JSON file not found: {json_file}")
+    if json_file is None:
+        print(f"❌ Data file not found for {symbol} in financial_reports/data")
         return False
     
     try:
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        data = load_company_file(json_file)
         
-        print(f"✅ JSON file loaded successfully")
+        print(f"✅ {json_file.suffix[1:].upper()} file loaded successfully")
         print(f"📊 Company: {data.get('company_info', {}).get('name', 'N/A')}")
         print(f"🏢 Sector: {data.get('company_info', {}).get('sector', 'N/A')}")
         
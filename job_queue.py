@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Job Queue
+Background jobs for long-running backend scripts: a thread pool runs each job
+as a subprocess, and a small SQLite table holds its status, progress and
+output tail so any backend process can answer status and cancel requests
+"""
+
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlite_pool import SQLitePool
+
+# Lines starting with this are progress events, not output (see run_all_indicators.py --progress)
+PROGRESS_PREFIX = "@progress "
+
+# How often a running job writes its progress (and checks for cancellation)
+PROGRESS_FLUSH_SECONDS = 1.0
+
+# Output lines kept in the job row; the full output goes to the job's log file
+OUTPUT_TAIL_LINES = 50
+
+
+def pid_alive(pid):
+    """Check whether a process with this pid still exists"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def apply_progress_event(progress, event):
+    """Fold one progress event into a job's progress dict"""
+    kind = event.get('event')
+    if kind == 'plan':
+        progress['symbols_total'] = event.get('symbols', 0)
+        progress['indicators'] = {
+            name: {'state': 'pending', 'done': 0, 'total': event.get('symbols', 0), 'current_symbol': None}
+            for name in event.get('indicators', [])
+        }
+        return progress
+
+    indicator = progress.setdefault('indicators', {}).setdefault(
+        event.get('indicator'), {'state': 'pending', 'done': 0, 'total': None, 'current_symbol': None}
+    )
+    if kind == 'symbol':
+        indicator['state'] = 'running'
+        indicator['done'] += 1
+        indicator['current_symbol'] = event.get('symbol')
+    elif kind == 'saved':
+        indicator['state'] = 'completed'
+    elif kind == 'error':
+        indicator['state'] = 'failed'
+        indicator['error'] = event.get('error')
+    return progress
+
+
+def progress_percent(progress):
+    """Overall completion across indicators, or None before the plan is known"""
+    indicators = progress.get('indicators') or {}
+    totals = [entry['total'] for entry in indicators.values() if entry.get('total') is not None]
+    if not indicators or len(totals) != len(indicators):
+        return None
+    if sum(totals) == 0:
+        return 100.0 if all(entry['state'] in ('completed', 'failed') for entry in indicators.values()) else 0.0
+    done = sum(min(entry['done'], entry['total']) for entry in indicators.values())
+    return round(100.0 * done / sum(totals), 1)
+
+
+class JobQueue:
+    """
+    Runs subprocess jobs on a thread pool, tracking them in a SQLite table.
+
+    submit() returns at once. A partial unique index allows one queued or
+    running job per dedup key, so concurrent triggers (from any backend
+    process) share the active job instead of starting another.
+    """
+
+    def __init__(self, db_path, log_dir, max_workers=1):
+        self.log_dir = log_dir
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        os.makedirs(log_dir, exist_ok=True)
+        self.db = SQLitePool(db_path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._processes = {}  # job id -> Popen, for jobs running in this process
+        self._lock = threading.Lock()
+        self._init_db()
+        self.recover_interrupted()
+
+    def _init_db(self):
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    dedup_key TEXT,
+                    status TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    cwd TEXT,
+                    owner_pid INTEGER,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    progress TEXT,
+                    output_tail TEXT,
+                    log_path TEXT,
+                    error TEXT,
+                    created_at TEXT,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            ''')
+            # At most one active job per dedup key
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_dedup_key
+                ON jobs (dedup_key) WHERE status IN ('queued', 'running')
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at DESC)')
+
+    def recover_interrupted(self):
+        """Fail active jobs whose owning backend process has exited"""
+        with self.db.cursor() as cursor:
+            cursor.execute("SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running')")
+            orphaned = [job_id for job_id, owner_pid in cursor.fetchall()
+                        if owner_pid != os.getpid() and not pid_alive(owner_pid)]
+            cursor.executemany('''
+                UPDATE jobs SET status = 'failed', error = 'Interrupted: backend process exited', finished_at = ?
+                WHERE id = ? AND status IN ('queued', 'running')
+            ''', [(datetime.now().isoformat(), job_id) for job_id in orphaned])
+        return orphaned
+
+    def submit(self, kind, command, cwd=None, dedup_key=None):
+        """
+        Queue command (an argv list) to run in cwd.
+
+        Returns (job, created). When a job with the same dedup_key is already
+        queued or running, that job is returned with created=False.
+        """
+        for _ in range(3):
+            job_id = uuid.uuid4().hex
+            with self.db.cursor() as cursor:
+                cursor.execute('''
+                    INSERT INTO jobs (id, kind, dedup_key, status, command, cwd, owner_pid, progress, created_at)
+                    VALUES (?, ?, ?, 'queued', ?, ?, ?, '{}', ?)
+                    ON CONFLICT DO NOTHING
+                ''', (job_id, kind, dedup_key, json.dumps(command), cwd, os.getpid(), datetime.now().isoformat()))
+                created = cursor.rowcount == 1
+                if not created:
+                    cursor.execute(
+                        "SELECT id FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running')",
+                        (dedup_key,)
+                    )
+                    row = cursor.fetchone()
+                    if row is None:
+                        # The active job finished in between; try to queue again
+                        continue
+                    job_id = row[0]
+            if created:
+                self._executor.submit(self._run, job_id)
+            return self.get(job_id), created
+        raise RuntimeError(f"Could not queue {kind} job")
+
+    def get(self, job_id):
+        """Job as a JSON-ready dict, or None if unknown"""
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+                SELECT id, kind, status, cancel_requested, progress, output_tail, log_path, error,
+                       created_at, started_at, finished_at
+                FROM jobs WHERE id = ?
+            ''', (job_id,))
+            row = cursor.fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit=20):
+        """Most recent jobs first"""
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+                SELECT id, kind, status, cancel_requested, progress, output_tail, log_path, error,
+                       created_at, started_at, finished_at
+                FROM jobs ORDER BY created_at DESC LIMIT ?
+            ''', (limit,))
+            rows = cursor.fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. Queued jobs never start; running jobs
+        are terminated here or, if another backend process owns them, at that
+        process's next progress flush. Returns the job, or None if unknown.
+        """
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+                UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?
+                WHERE id = ? AND status = 'queued'
+            ''', (datetime.now().isoformat(), job_id))
+            cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        with self._lock:
+            process = self._processes.get(job_id)
+        if process is not None:
+            self._terminate(process)
+        return self.get(job_id)
+
+    @staticmethod
+    def _to_dict(row):
+        (job_id, kind, status, cancel_requested, progress, output_tail, log_path, error,
+         created_at, started_at, finished_at) = row
+        progress = json.loads(progress) if progress else {}
+        return {
+            'job_id': job_id,
+            'kind': kind,
+            'status': status,
+            'cancel_requested': bool(cancel_requested),
+            'progress': progress,
+            'percent': progress_percent(progress),
+            'output_tail': json.loads(output_tail) if output_tail else [],
+            'log_path': log_path,
+            'error': error,
+            'created_at': created_at,
+            'started_at': started_at,
+            'finished_at': finished_at
+        }
+
+    @staticmethod
+    def _terminate(process):
+        """Stop a job and any worker processes it started"""
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _save_progress(self, job_id, progress, tail):
+        """Write progress and output tail; returns whether cancellation was requested"""
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                'UPDATE jobs SET progress = ?, output_tail = ? WHERE id = ?',
+                (json.dumps(progress), json.dumps(list(tail)), job_id)
+            )
+            cursor.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,))
+            return bool(cursor.fetchone()[0])
+
+    def _finish(self, job_id, status, progress, tail, error=None):
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+                UPDATE jobs SET status = ?, progress = ?, output_tail = ?, error = ?, finished_at = ?
+                WHERE id = ?
+            ''', (status, json.dumps(progress), json.dumps(list(tail)), error, datetime.now().isoformat(), job_id))
+
+    def _run(self, job_id):
+        log_path = os.path.join(self.log_dir, f"{job_id}.log")
+        with self.db.cursor() as cursor:
+            # Claim the job unless it was cancelled while queued
+            cursor.execute('''
+                UPDATE jobs SET status = 'running', started_at = ?, log_path = ?
+                WHERE id = ? AND status = 'queued'
+            ''', (datetime.now().isoformat(), log_path, job_id))
+            if cursor.rowcount == 0:
+                return
+            cursor.execute('SELECT command, cwd FROM jobs WHERE id = ?', (job_id,))
+            command, cwd = cursor.fetchone()
+
+        progress = {}
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        try:
+            process = subprocess.Popen(
+                json.loads(command), cwd=cwd,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+                env=dict(os.environ, PYTHONUNBUFFERED='1'),
+                start_new_session=True  # own process group, so cancel reaches pool workers too
+            )
+        except OSError as e:
+            self._finish(job_id, 'failed', progress, tail, error=str(e))
+            return
+
+        with self._lock:
+            self._processes[job_id] = process
+        try:
+            # Output is streamed to the log file, never accumulated in memory
+            with open(log_path, 'w', encoding='utf-8') as log:
+                last_flush = time.monotonic()
+                for line in process.stdout:
+                    if line.startswith(PROGRESS_PREFIX):
+                        try:
+                            apply_progress_event(progress, json.loads(line[len(PROGRESS_PREFIX):]))
+                        except ValueError:
+                            pass
+                    else:
+                        log.write(line)
+                        tail.append(line.rstrip('\n'))
+                    if time.monotonic() - last_flush >= PROGRESS_FLUSH_SECONDS:
+                        last_flush = time.monotonic()
+                        if self._save_progress(job_id, progress, tail):
+                            self._terminate(process)
+            returncode = process.wait()
+        except Exception as e:
+            self._terminate(process)
+            process.wait()
+            self._finish(job_id, 'failed', progress, tail, error=str(e))
+            return
+        finally:
+            with self._lock:
+                self._processes.pop(job_id, None)
+
+        failed = [f"{name}: {entry.get('error')}" for name, entry in progress.get('indicators', {}).items()
+                  if entry['state'] == 'failed']
+        if self._save_progress(job_id, progress, tail):
+            self._finish(job_id, 'cancelled', progress, tail)
+        elif returncode != 0:
+            self._finish(job_id, 'failed', progress, tail, error=f"Exited with code {returncode}")
+        elif failed:
+            self._finish(job_id, 'failed', progress, tail, error="; ".join(failed))
+        else:
+            self._finish(job_id, 'succeeded', progress, tail)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Sentiment Store
+latest_sentiment table shared by Sentiment_Analysis/saveResults.py (writer) and
+the backend API (reader): the latest score per stock, kept up to date as
+scores are written so the API does not rank the full history on every request
+"""
+
+UPSERT_LATEST = '''
+INSERT INTO latest_sentiment (stock, datetime, marketSentiment) VALUES (?, ?, ?)
+ON CONFLICT(stock) DO UPDATE SET
+    datetime = excluded.datetime,
+    marketSentiment = excluded.marketSentiment
+WHERE excluded.datetime > latest_sentiment.datetime
+'''
+
+
+def init_latest_sentiment(cursor):
+    """
+    Create latest_sentiment if needed and, while it is empty, backfill it
+    from sentimentResult history. Runs inside the caller's transaction.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS latest_sentiment (
+            stock TEXT PRIMARY KEY,
+            datetime TEXT,
+            marketSentiment float
+        )
+    ''')
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sentimentResult'")
+    has_history = cursor.fetchone() is not None
+    cursor.execute('SELECT COUNT(*) FROM latest_sentiment')
+    if has_history and cursor.fetchone()[0] == 0:
+        cursor.execute('''
+            INSERT INTO latest_sentiment (stock, datetime, marketSentiment)
+            SELECT stock, datetime, marketSentiment FROM (
+                SELECT stock, datetime, marketSentiment,
+                       ROW_NUMBER() OVER (PARTITION BY stock ORDER BY datetime DESC) as rn
+                FROM sentimentResult
+            )
+            WHERE rn = 1
+        ''')
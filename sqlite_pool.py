@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+SQLite Connection Pool
+Bounded pool of persistent SQLite connections with WAL mode and busy_timeout
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLitePool:
+    """
+    Lends out at most `max_connections` long-lived connections to one database.
+
+    Connections are checked out for the length of a `cursor()` block and then
+    returned, so the threaded Flask dev server (a new thread per request) and
+    the job workers share a fixed set of connections instead of opening one per
+    thread. Connections run in WAL mode so readers never block on (or get
+    "database is locked" from) the cron writers, and set busy_timeout so
+    writers wait for each other instead of failing. Because connections are
+    reused, sqlite3's per-connection statement cache keeps prepared
+    statements across requests.
+    """
+
+    def __init__(self, db_path, max_connections=8, busy_timeout_ms=5000, cached_statements=128):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # A connection is only ever used by the thread that checked it out,
+        # but it may be a different thread each time
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection, waiting if all of them are in use"""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._connections.append(conn)
+        except Exception:
+            self._slots.release()
+            raise
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self):
+        """Yield a cursor; commit on success, roll back on error"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def close_all(self):
+        """Close every idle connection opened by this pool"""
+        with self._lock:
+            closed = []
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                closed.append(conn)
+            self._connections = [conn for conn in self._connections if conn not in closed]
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Stock Data Cache
+TTL + stale-while-revalidate cache in front of yfinance for the dashboard API
+"""
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+IST = ZoneInfo("Asia/Kolkata")
+MARKET_OPEN = (9, 15)
+MARKET_CLOSE = (15, 30)
+
+# Seconds before an entry is considered stale
+MARKET_HOURS_TTL = {
+    'info': 60,
+    'intraday_history': 60,   # 1d / 5d
+    'history': 300,
+}
+OFF_HOURS_TTL = 6 * 60 * 60
+
+# Stale entries older than this are refetched synchronously instead of served
+MAX_STALE_SECONDS = 24 * 60 * 60
+
+INTRADAY_PERIODS = {'1d', '5d'}
+
+
+def is_market_open(now=None):
+    """Check whether NSE is in its regular trading session"""
+    now = now.astimezone(IST) if now else datetime.now(IST)
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return MARKET_OPEN[0] * 60 + MARKET_OPEN[1] <= minutes < MARKET_CLOSE[0] * 60 + MARKET_CLOSE[1]
+
+
+def next_market_open(now=None):
+    """Get the start of the next regular NSE session after now"""
+    now = now.astimezone(IST) if now else datetime.now(IST)
+    opening = now.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+    if opening <= now:
+        opening += timedelta(days=1)
+    while opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return opening
+
+
+def ttl_for(kind, period=None, now=None):
+    """Get the TTL in seconds for a cache entry, based on market hours"""
+    if not is_market_open(now):
+        # Off-hours quotes must not stay fresh into the next session
+        now = now.astimezone(IST) if now else datetime.now(IST)
+        return min(OFF_HOURS_TTL, (next_market_open(now) - now).total_seconds())
+    if kind == 'info':
+        return MARKET_HOURS_TTL['info']
+    if period in INTRADAY_PERIODS:
+        return MARKET_HOURS_TTL['intraday_history']
+    return MARKET_HOURS_TTL['history']
+
+
+class YFinanceProvider:
+    """Upstream provider backed by yfinance"""
+
+    def get_history(self, ticker_symbol, period):
+        import yfinance as yf
+        return yf.Ticker(ticker_symbol).history(period=period)
+
+    def get_info(self, ticker_symbol):
+        import yfinance as yf
+        return yf.Ticker(ticker_symbol).info
+
+
+class FakeStockDataProvider:
+    """Offline stand-in for yfinance with deterministic data and call counting"""
+
+    PERIOD_DAYS = {'1d': 1, '5d': 5, '1mo': 22, '3mo': 66, '6mo': 126, '1y': 250,
+                   '2y': 500, '5y': 1250, '10y': 2500, 'ytd': 200, 'max': 5000}
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = {'history': 0, 'info': 0}
+        self._lock = threading.Lock()
+
+    def _record_call(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"Fake provider failure ({kind})")
+
+    def get_history(self, ticker_symbol, period):
+        self._record_call('history')
+        days = self.PERIOD_DAYS.get(period, 22)
+        dates = pd.bdate_range(end=pd.Timestamp('2025-06-30'), periods=days)
+        rng = np.random.default_rng(zlib.crc32(ticker_symbol.encode('utf-8')))
+        close = 100 + np.cumsum(rng.normal(0, 1, days))
+        return pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1.0,
+            'Low': close - 1.0,
+            'Close': close,
+            'Volume': rng.integers(1_000, 100_000, days),
+        }, index=dates)
+
+    def get_info(self, ticker_symbol):
+        self._record_call('info')
+        return {
+            'symbol': ticker_symbol,
+            'longName': ticker_symbol.split('.')[0],
+            'currentPrice': 100.0,
+            'currency': 'INR',
+            'marketCap': 10 ** 12,
+            'dayHigh': 101.0,
+            'dayLow': 99.0,
+            'previousClose': 100.5,
+            'fiftyTwoWeekHigh': 120.0,
+            'fiftyTwoWeekLow': 80.0,
+        }
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'fetched_at', 'ttl')
+
+    def __init__(self, value, fetched_at, ttl):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+
+class StockDataCache:
+    """
+    Shared cache for stock history/info keyed by (ticker, period).
+
+    Fresh entries are served directly. Stale entries are served while a
+    background refresh runs. Concurrent misses for the same key wait on a
+    single upstream call.
+    """
+
+    def __init__(self, provider=None, max_entries=512, max_stale=MAX_STALE_SECONDS,
+                 refresh_workers=4, clock=time.time, now=None):
+        self.provider = provider or YFinanceProvider()
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.clock = clock
+        self.now = now or (lambda: datetime.now(IST))
+        self._entries = OrderedDict()
+        self._inflight = {}  # key -> threading.Event
+        self._errors = {}    # key -> exception raised by the last leader
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers,
+                                             thread_name_prefix='stock-cache-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'upstream_calls': 0, 'refresh_errors': 0}
+
+    def get_history(self, ticker_symbol, period):
+        """Get price history as a DataFrame"""
+        return self._get(('history', ticker_symbol, period),
+                         lambda: self.provider.get_history(ticker_symbol, period),
+                         ttl_for('history', period, self.now()))
+
+    def get_info(self, ticker_symbol):
+        """Get the info dict for a ticker"""
+        return self._get(('info', ticker_symbol, None),
+                         lambda: self.provider.get_info(ticker_symbol),
+                         ttl_for('info', None, self.now()))
+
+    def peek_info(self, ticker_symbol):
+        """Return cached info without calling upstream, or None if missing or past its TTL"""
+        with self._lock:
+            entry = self._entries.get(('info', ticker_symbol, None))
+            if entry is None or self.clock() - entry.fetched_at >= entry.ttl:
+                return None
+            return entry.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key, fetch, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self.clock() - entry.fetched_at
+                if age < entry.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry.value
+                if age < entry.ttl + self.max_stale:
+                    self.stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        self._refresher.submit(self._refresh, key, fetch, ttl)
+                    return entry.value
+
+            self.stats['misses'] += 1
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                error = self._errors.get(key)
+            if entry is not None:
+                return entry.value
+            raise error or RuntimeError(f"Upstream fetch failed for {key}")
+
+        try:
+            value = self._fetch(key, fetch, ttl)
+            with self._lock:
+                self._errors.pop(key, None)
+            return value
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def _fetch(self, key, fetch, ttl):
+        with self._lock:
+            self.stats['upstream_calls'] += 1
+        value = fetch()
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, self.clock(), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _refresh(self, key, fetch, ttl):
+        try:
+            self._fetch(key, fetch, ttl)
+        except Exception as e:
+            # Keep serving the stale value; the next stale hit retries
+            with self._lock:
+                self.stats['refresh_errors'] += 1
+            print(f"Background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+
+if __name__ == "__main__":
+    # Exercise the cache offline against the fake provider
+    fake_clock = [0.0]
+    provider = FakeStockDataProvider(delay=0.2)
+    cache = StockDataCache(provider, clock=lambda: fake_clock[0],
+                           now=lambda: datetime(2025, 6, 30, 11, 0, tzinfo=IST))
+
+    threads = [threading.Thread(target=cache.get_history, args=('TCS.NS', '1mo')) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"10 concurrent misses -> {provider.calls['history']} upstream call(s)")
+
+    cache.get_history('TCS.NS', '1mo')
+    print(f"Fresh hit -> {provider.calls['history']} upstream call(s)")
+
+    fake_clock[0] += MARKET_HOURS_TTL['history'] + 1
+    hist = cache.get_history('TCS.NS', '1mo')
+    print(f"Stale hit served {len(hist)} bars immediately")
+    time.sleep(0.5)
+    print(f"Background refresh -> {provider.calls['history']} upstream call(s)")
+    print(f"Stats: {cache.stats}")
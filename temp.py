@@ -1,18 +1,122 @@
-from gnews import GNews
 import json
-google_news = GNews()
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import feedparser
+import requests
+
+from rate_limiter import PerHostRateLimiter, backoff_delay
+
 STOCK = "RELIANCE, TCS, HDFCBANK, ICICIBANK, INFY, ITC, LTIM, LT, HINDUNILVR, AXISBANK, KOTAKBANK, SBIN, BHARTIARTL, HCLTECH, MARUTI, ASIANPAINT, BAJFINANCE, BAJAJFINSV, TITAN, ULTRACEMCO, SUNPHARMA, NESTLEIND, POWERGRID, ADANIENT, ADANIGREEN, ADANIPORTS, ADANIPOWER, APOLLOHOSP, BPCL, BRITANNIA, CIPLA, COALINDIA, DIVISLAB, DRREDDY, EICHERMOT, GRASIM, HDFCLIFE, HEROMOTOCO, HINDALCO, INDUSINDBK, JSWSTEEL, M&M, NTPC, ONGC, SBI, SHREECEM, TATACONSUM, TATAMOTORS, TATASTEEL, TECHM, WIPRO"
-news ={}
-for stock in STOCK.split(','):
-    stock = stock.strip()
-    news_temp = google_news.get_news(stock)
-    print(f"Scrapping for stock:{stock}")
-    if news_temp:
-        news[stock] = news_temp
-    else:
-        news[stock] = "No news found for this stock"
-# news_temp = google_news.get_news('Reliance')
-
-
-with open('news.json', 'w') as f:
-    json.dump(news, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+
+# Same feed and defaults GNews() uses (English, US edition, 100 results)
+GNEWS_RSS_URL = "https://news.google.com/rss/search"
+GNEWS_PARAMS = {'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'}
+MAX_RESULTS = 100
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+# Scraper settings
+MAX_WORKERS = int(os.getenv("NEWS_MAX_WORKERS", "8"))
+REQUESTS_PER_SECOND_PER_HOST = float(os.getenv("NEWS_RATE_PER_HOST", "4"))
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 10      # seconds per HTTP attempt
+SYMBOL_TIMEOUT = 45       # seconds per symbol, across all retries
+
+NO_NEWS = "No news found for this stock"
+OUTPUT_FILE = "news.json"
+PARTIAL_FILE = "news.jsonl"
+
+rate_limiter = PerHostRateLimiter(REQUESTS_PER_SECOND_PER_HOST)
+_local = threading.local()
+
+
+def get_session():
+    """One keep-alive session per worker thread, reused across symbols"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        _local.session = session
+    return session
+
+
+def parse_articles(content):
+    """Turn a Google News RSS payload into GNews-style article dicts"""
+    feed = feedparser.parse(content)
+    articles = []
+    for entry in feed.entries[:MAX_RESULTS]:
+        url = entry.get("link")
+        if not url:
+            continue
+        articles.append({
+            'title': entry.get("title", ""),
+            'description': entry.get("description", ""),
+            'published date': entry.get("published", ""),
+            'url': url,
+            'publisher': entry.get("source", " "),
+        })
+    return articles
+
+
+def fetch_news(stock):
+    """
+    Fetch one symbol within SYMBOL_TIMEOUT overall. Connection errors,
+    timeouts, 429 and 5xx are retried; any other 4xx fails at once
+    """
+    deadline = time.monotonic() + SYMBOL_TIMEOUT
+    params = dict(GNEWS_PARAMS, q=stock)
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        rate_limiter.acquire(GNEWS_RSS_URL)
+        try:
+            response = get_session().get(GNEWS_RSS_URL, params=params,
+                                         timeout=min(REQUEST_TIMEOUT, remaining))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = e
+        else:
+            if response.status_code != 429 and response.status_code < 500:
+                response.raise_for_status()
+                return parse_articles(response.content)
+            last_error = requests.HTTPError(f"HTTP {response.status_code} for {stock}", response=response)
+        if attempt < MAX_RETRIES:
+            time.sleep(min(backoff_delay(attempt), max(0, deadline - time.monotonic())))
+    if last_error is None:
+        raise TimeoutError(f"gave up on {stock} after {SYMBOL_TIMEOUT}s")
+    raise last_error
+
+
+if __name__ == "__main__":
+    stocks = [stock.strip() for stock in STOCK.split(',')]
+    news = {}
+    start = time.perf_counter()
+
+    # Each finished symbol is appended to news.jsonl straight away, so a slow
+    # or failing symbol never holds back the others' results
+    with open(PARTIAL_FILE, 'w') as partial, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(fetch_news, stock): stock for stock in stocks}
+        for future in as_completed(futures):
+            stock = futures[future]
+            try:
+                news_temp = future.result()
+                print(f"Scrapping for stock:{stock} -> {len(news_temp)} articles")
+            except Exception as e:
+                news_temp = None
+                print(f"Scrapping for stock:{stock} failed: {e}")
+            news[stock] = news_temp if news_temp else NO_NEWS
+            partial.write(json.dumps({stock: news[stock]}, ensure_ascii=False) + "\n")
+            partial.flush()
+
+    # Write news.json in the usual symbol order, atomically
+    ordered = {stock: news[stock] for stock in stocks}
+    tmp_path = OUTPUT_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ordered, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, OUTPUT_FILE)
+
+    found = sum(1 for value in ordered.values() if value != NO_NEWS)
+    print(f"✅ News for {found}/{len(stocks)} stocks saved to {OUTPUT_FILE} in {time.perf_counter() - start:.1f}s")
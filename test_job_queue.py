@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Job Queue Tests
+Runs the incremental fundamental analysis through JobQueue on a copy of a few
+companies' data and checks the status a finished job reports
+"""
+
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from job_queue import JobQueue
+
+REPO_DIR = Path(__file__).resolve().parent
+SCRIPT = REPO_DIR / 'FundamentalAnalysis' / 'run_all_indicators.py'
+SYMBOLS = ('INFY', 'TCS', 'WIPRO')
+
+
+def make_workspace(base_dir):
+    """financial_reports/data with a few companies next to an empty FundamentalAnalysis cwd"""
+    data_dir = base_dir / 'financial_reports' / 'data'
+    data_dir.mkdir(parents=True)
+    for symbol in SYMBOLS:
+        shutil.copy(REPO_DIR / 'financial_reports' / 'data' / f"{symbol}_financial_data.json", data_dir)
+    work_dir = base_dir / 'FundamentalAnalysis'
+    work_dir.mkdir()
+    return data_dir, work_dir
+
+
+def run_job(queue, work_dir, timeout=120):
+    job, _ = queue.submit('fundamental_analysis',
+                          [sys.executable, str(SCRIPT), '--incremental', '--progress'],
+                          cwd=str(work_dir))
+    deadline = time.monotonic() + timeout
+    while job['status'] in ('queued', 'running'):
+        assert time.monotonic() < deadline, f"job still {job['status']} after {timeout}s"
+        time.sleep(0.2)
+        job = queue.get(job['job_id'])
+    return job
+
+
+def test_up_to_date_run_reports_complete(tmp_path):
+    """A run with nothing to recompute finishes at 100%, not 0%"""
+    data_dir, work_dir = make_workspace(tmp_path)
+    queue = JobQueue(str(tmp_path / 'jobs.db'), str(tmp_path / 'logs'))
+
+    first = run_job(queue, work_dir)
+    assert first['status'] == 'succeeded'
+    assert first['percent'] == 100.0
+
+    noop = run_job(queue, work_dir)
+    assert noop['status'] == 'succeeded'
+    assert noop['progress']['symbols_total'] == 0
+    assert noop['percent'] == 100.0
+    assert all(entry['state'] == 'completed' for entry in noop['progress']['indicators'].values())
+
+    # Only a removed company: nothing to recompute, but the outputs are patched
+    (data_dir / f"{SYMBOLS[0]}_financial_data.json").unlink()
+    removed = run_job(queue, work_dir)
+    assert removed['status'] == 'succeeded'
+    assert removed['progress']['symbols_total'] == 0
+    assert removed['percent'] == 100.0